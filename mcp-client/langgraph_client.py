@@ -20,14 +20,24 @@ llm = AzureChatOpenAI(model_name=os.environ['MODEL_NAME'],
 
 
 # specify the mcp server
+# with YOUTUBE_SERVER_URL set (eg. http://127.0.0.1:8765/mcp), connect to a shared
+# server started with `server.py --transport streamable-http` instead of spawning one
+
+if os.environ.get("YOUTUBE_SERVER_URL"):
+    youtube_server = {
+        "url": os.environ["YOUTUBE_SERVER_URL"],
+        "transport": os.environ.get("YOUTUBE_SERVER_TRANSPORT", "streamable_http"),
+    }
+else:
+    youtube_server = {
+        "command": "python",
+        "args": ["/home/tamil/work/GenAI-productivity-tools/youtube-summarizer/server.py"],
+        "transport": "stdio",
+    }
 
 client = MultiServerMCPClient(
     {
-        "youtube_server": {
-            "command": "python",
-            "args": ["/home/tamil/work/GenAI-productivity-tools/youtube-summarizer/server.py"],
-            "transport": "stdio",
-        },
+        "youtube_server": youtube_server,
         "filesystem": {
             "command": "docker",
             "args": [
@@ -46,8 +56,10 @@ async def main():
     print("Entering main")
     tools = await client.get_tools()
     print("Bound the tools")
-    def call_model(state: MessagesState):
-        response = llm.bind_tools(tools).invoke(state["messages"])
+    llm_with_tools = llm.bind_tools(tools)
+
+    async def call_model(state: MessagesState):
+        response = await llm_with_tools.ainvoke(state["messages"])
         return {"messages": response}
 
     builder = StateGraph(MessagesState)
@@ -20,6 +20,48 @@ class Settings:
         str(Path(__file__).parent.parent.parent / "youtube-summarizer" / "knowledge_youtube")
     )
 
+    # video_id -> saved summary manifest
+    SUMMARY_MANIFEST_PATH: str = os.environ.get(
+        "SUMMARY_MANIFEST_PATH", str(Path(__file__).parent.parent / ".data" / "summaries_manifest.json")
+    )
+
+    # Summary categories (knowledge base subfolders) as "name: description"
+    # entries separated by ";". The descriptions guide classification in the
+    # summarize prompt; unrecognized answers fall back to the default.
+    SUMMARY_CATEGORIES: str = os.environ.get(
+        "SUMMARY_CATEGORIES",
+        "tech: Coding, software, AI, tutorials, technical demos, technology; "
+        "science: Studies, experiments, scientific explanations, health, research; "
+        "business: Startups, finance, markets, entrepreneurship, investing, productivity; "
+        "culture: Politics, society, history, documentaries, entertainment, interviews about life/society; "
+        "general: Anything that doesn't clearly fit the above categories",
+    )
+    SUMMARY_DEFAULT_CATEGORY: str = os.environ.get("SUMMARY_DEFAULT_CATEGORY", "general")
+
+    # Knowledge base tools given to the agent: "native" (in-process, backed
+    # by KnowledgeBaseService) or "docker" (the mcp/filesystem container)
+    KB_TOOLS_MODE: str = os.environ.get("KB_TOOLS_MODE", "native")
+
+    # Seconds between filesystem scans of the knowledge base index when
+    # no directory watcher is running
+    KB_INDEX_REFRESH_INTERVAL: float = float(
+        os.environ.get("KB_INDEX_REFRESH_INTERVAL", "5")
+    )
+
+    # Semantic retrieval over the knowledge base. EMBEDDING_BACKEND is
+    # "hashing" (no model needed) or "sentence-transformers" (local CPU model)
+    EMBEDDING_BACKEND: str = os.environ.get("EMBEDDING_BACKEND", "hashing")
+    EMBEDDING_MODEL: str = os.environ.get(
+        "EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
+    )
+    EMBEDDING_DIM: int = int(os.environ.get("EMBEDDING_DIM", "512"))  # hashing only
+    RETRIEVAL_INDEX_DIR: str = os.environ.get(
+        "RETRIEVAL_INDEX_DIR", str(Path(__file__).parent.parent / ".retrieval_index")
+    )
+    RETRIEVAL_CHUNK_CHARS: int = int(os.environ.get("RETRIEVAL_CHUNK_CHARS", "1200"))
+    RETRIEVAL_ANN_MIN_SIZE: int = int(os.environ.get("RETRIEVAL_ANN_MIN_SIZE", "20000"))
+    RETRIEVAL_NPROBE: int = int(os.environ.get("RETRIEVAL_NPROBE", "8"))
+
     # YouTube server paths
     YOUTUBE_SERVER_DIR: str = str(
         Path(__file__).parent.parent.parent / "youtube-summarizer"
@@ -28,6 +70,90 @@ class Settings:
         Path(__file__).parent.parent.parent / "youtube-summarizer" / "server.py"
     )
 
+    # How agents reach the YouTube server: "stdio" spawns one server process
+    # per agent; "streamable_http" (or "sse") connects every agent to one
+    # shared server started with `python server.py --transport streamable-http`
+    YOUTUBE_SERVER_TRANSPORT: str = os.environ.get("YOUTUBE_SERVER_TRANSPORT", "stdio")
+    YOUTUBE_SERVER_URL: str = os.environ.get("YOUTUBE_SERVER_URL", "http://127.0.0.1:8765/mcp")
+
+    # Agent pool settings
+    AGENT_POOL_SIZE: int = int(os.environ.get("AGENT_POOL_SIZE", "2"))
+    # Requests (chat turns, summaries) served by one agent at once
+    AGENT_POOL_MAX_CONCURRENCY: int = int(os.environ.get("AGENT_POOL_MAX_CONCURRENCY", "8"))
+    AGENT_POOL_ACQUIRE_TIMEOUT: float = float(
+        os.environ.get("AGENT_POOL_ACQUIRE_TIMEOUT", "120")
+    )
+    AGENT_POOL_HEALTH_CHECK_INTERVAL: float = float(
+        os.environ.get("AGENT_POOL_HEALTH_CHECK_INTERVAL", "60")
+    )
+
+    # Azure OpenAI quota shared by every agent in the process (0 = no limit).
+    # Calls wait their turn by priority (chat, summarize, batch); 429s are
+    # retried after Retry-After plus jittered exponential backoff, and 5xx
+    # responses, timeouts and connection failures after the backoff
+    LLM_REQUESTS_PER_MINUTE: int = int(os.environ.get("LLM_REQUESTS_PER_MINUTE", "0"))
+    LLM_TOKENS_PER_MINUTE: int = int(os.environ.get("LLM_TOKENS_PER_MINUTE", "0"))
+    LLM_MAX_RETRIES: int = int(os.environ.get("LLM_MAX_RETRIES", "6"))
+    LLM_RETRY_BACKOFF: float = float(os.environ.get("LLM_RETRY_BACKOFF", "1"))
+    LLM_RETRY_MAX_BACKOFF: float = float(os.environ.get("LLM_RETRY_MAX_BACKOFF", "60"))
+
+    # Map-reduce summarization of long videos
+    SUMMARY_CHUNK_MAX_TOKENS: int = int(os.environ.get("SUMMARY_CHUNK_MAX_TOKENS", "6000"))
+    SUMMARY_CHUNK_MAX_SECONDS: float = float(
+        os.environ.get("SUMMARY_CHUNK_MAX_SECONDS", "900")
+    )
+    SUMMARY_MAP_CONCURRENCY: int = int(os.environ.get("SUMMARY_MAP_CONCURRENCY", "4"))
+
+    # How "pipeline" summarization asks for structured output: "json_schema"
+    # (strict, needs API version 2024-08-01-preview or later) or
+    # "function_calling" for older deployments
+    SUMMARY_STRUCTURED_OUTPUT_METHOD: str = os.environ.get(
+        "SUMMARY_STRUCTURED_OUTPUT_METHOD", "json_schema"
+    )
+
+    # Chat history token budgeting
+    CHAT_HISTORY_TOKEN_BUDGET: int = int(os.environ.get("CHAT_HISTORY_TOKEN_BUDGET", "12000"))
+    CHAT_HISTORY_KEEP_TURNS: int = int(os.environ.get("CHAT_HISTORY_KEEP_TURNS", "4"))
+    CHAT_TOOL_OUTPUT_MAX_TOKENS: int = int(os.environ.get("CHAT_TOOL_OUTPUT_MAX_TOKENS", "500"))
+
+    # Chat conversation store (SQLite, with an in-memory LRU of hot sessions)
+    CONVERSATION_DB_PATH: str = os.environ.get(
+        "CONVERSATION_DB_PATH", str(Path(__file__).parent.parent / ".data" / "conversations.sqlite3")
+    )
+    CONVERSATION_CACHE_SIZE: int = int(os.environ.get("CONVERSATION_CACHE_SIZE", "200"))
+    CONVERSATION_CACHE_MAX_BYTES: int = int(
+        os.environ.get("CONVERSATION_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+    )
+    CONVERSATION_IDLE_TIMEOUT: float = float(os.environ.get("CONVERSATION_IDLE_TIMEOUT", "1800"))
+    CONVERSATION_RETENTION_DAYS: float = float(os.environ.get("CONVERSATION_RETENTION_DAYS", "30"))
+
+    # LLM response cache: "exact" (identical prompts), "semantic" (also
+    # near-identical questions, by embedding similarity) or "off"
+    LLM_CACHE_MODE: str = os.environ.get("LLM_CACHE_MODE", "exact")
+    LLM_CACHE_DB_PATH: str = os.environ.get(
+        "LLM_CACHE_DB_PATH", str(Path(__file__).parent.parent / ".data" / "llm_cache.sqlite3")
+    )
+    LLM_CACHE_SEMANTIC_THRESHOLD: float = float(os.environ.get("LLM_CACHE_SEMANTIC_THRESHOLD", "0.95"))
+    LLM_CACHE_TTL: float = float(os.environ.get("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "20000"))
+    LLM_CACHE_MAX_BYTES: int = int(os.environ.get("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+    # SQLite database of summary highlights
+    HIGHLIGHTS_DB_PATH: str = os.environ.get(
+        "HIGHLIGHTS_DB_PATH", str(Path(__file__).parent.parent / ".data" / "highlights.sqlite3")
+    )
+
+    # Batch summarization job queue. Workers hold a slot of a pooled agent for
+    # a whole summary, so at most AGENT_POOL_SIZE * AGENT_POOL_MAX_CONCURRENCY
+    # - 1 of them run and chat always has a slot
+    BATCH_WORKERS: int = int(os.environ.get("BATCH_WORKERS", "2"))
+    BATCH_MAX_RETRIES: int = int(os.environ.get("BATCH_MAX_RETRIES", "2"))
+    BATCH_RETRY_BACKOFF: float = float(os.environ.get("BATCH_RETRY_BACKOFF", "5"))
+    BATCH_MAX_JOBS: int = int(os.environ.get("BATCH_MAX_JOBS", "100"))
+
+    # Log one JSON line per span, node, tool and LLM call (logger "backend.metrics")
+    METRICS_LOG_SPANS: bool = os.environ.get("METRICS_LOG_SPANS", "") not in ("", "0", "false")
+
     # Server settings
     HOST: str = os.environ.get("HOST", "0.0.0.0")
     PORT: int = int(os.environ.get("PORT", "8000"))
@@ -0,0 +1,98 @@
+import re
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import Optional
+
+from fastapi import Request, Response
+from fastapi.staticfiles import StaticFiles
+from starlette.types import Scope
+
+# Asset references in index.html that get a content-hash version
+ASSET_RE = re.compile(r'((?:href|src)="/((?:css|js)/[^"?]+))(?:\?v=[^"]*)?"')
+
+# Versioned asset URLs never change content, so browsers may keep them
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> dict[str, str]:
+    """Cache validator headers; no-cache makes browsers revalidate every time"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Whether a conditional GET's validators still match (RFC 9110 precedence)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified.timestamp()) <= since.timestamp()
+    return False
+
+
+def not_modified_response(headers: dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+def etag_for(*parts) -> str:
+    """Weak ETag from arbitrary parts (eg. index version and query parameters)"""
+    digest = hashlib.sha1("\0".join(map(str, parts)).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with cache headers suited to the frontend.
+
+    index.html is served with each css/js reference versioned by a hash of
+    the file's content and must be revalidated; versioned asset requests
+    are cached for a year, so a deploy changes the URLs instead of waiting
+    for caches to expire. Unversioned assets are revalidated by ETag.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._hashes: dict[str, tuple[tuple[int, int], str]] = {}  # asset -> (stat key, hash)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if path in (".", "", "index.html"):
+            return self._index_response(scope)
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            versioned = b"v=" in scope.get("query_string", b"")
+            response.headers["Cache-Control"] = IMMUTABLE if versioned else "no-cache"
+        return response
+
+    def _index_response(self, scope: Scope) -> Response:
+        index_path = Path(self.directory) / "index.html"
+        html = ASSET_RE.sub(
+            lambda m: f'{m.group(1)}?v={self._asset_hash(m.group(2))}"',
+            index_path.read_text(encoding="utf-8"),
+        )
+        etag = etag_for(html)
+        headers = validator_headers(etag)
+        if is_not_modified(Request(scope), etag):
+            return not_modified_response(headers)
+        return Response(html, media_type="text/html", headers=headers)
+
+    def _asset_hash(self, relative: str) -> str:
+        asset = Path(self.directory) / relative
+        try:
+            stat = asset.stat()
+        except FileNotFoundError:
+            return "0"
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._hashes.get(relative)
+        if cached is None or cached[0] != key:
+            cached = (key, hashlib.sha1(asset.read_bytes()).hexdigest()[:10])
+            self._hashes[relative] = cached
+        return cached[1]
@@ -1,14 +1,66 @@
+import time
+import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+
+try:
+    # Optional; without it responses are gzip-compressed only
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # pragma: no cover
+    BrotliMiddleware = None
+
+from .http_cache import CachedStaticFiles
+from .routers import summaries, chat, batch, metrics, highlights
+from .services.agent import agent_pool
+from .services.batch import batch_summarizer
+from .services.conversations import conversation_store
+from .services.highlights import highlight_store
+from .services.knowledge_base import kb_service
+from .services.llm_cache import llm_cache
+from .services.metrics import http_duration
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Index the knowledge base and keep it current via the watcher
+    await kb_service.start_watching()
+    await conversation_store.start()
+    # Import legacy .highlights.json sidecars into the highlights database
+    await highlight_store.start()
+    try:
+        await highlight_store.migrate(kb_service.base_path)
+    except Exception:
+        logger.exception("Migrating highlights failed; older highlights may be missing")
+    if llm_cache is not None:
+        await llm_cache.start()
+    # Build the shared agent pool (MCP sessions, tools, graph) once. If that
+    # fails (eg. no Azure credentials), browsing still works and the pool
+    # retries on the first chat or summarize request.
+    try:
+        await agent_pool.start()
+    except Exception:
+        logger.exception("Agent pool failed to start; chat and summarize are unavailable until it does")
+    await batch_summarizer.start()
+    yield
+    await batch_summarizer.stop()
+    await agent_pool.close()
+    await conversation_store.close()
+    await highlight_store.close()
+    if llm_cache is not None:
+        await llm_cache.close()
+    await kb_service.stop_watching()
 
-from .routers import summaries, chat
 
 app = FastAPI(
     title="GenAI Productivity Tools Dashboard",
     description="Web interface for YouTube summarization and chat",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware (for development)
@@ -20,9 +72,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress markdown, JSON and frontend assets (brotli when installed)
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=1024, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+
+@app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    """Request latency per route template (static files grouped together)"""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    path = getattr(route, "path", None) or "static"
+    http_duration.observe(
+        time.perf_counter() - start, method=request.method, route=path, status=str(response.status_code)
+    )
+    return response
+
+
 # Include routers
 app.include_router(summaries.router)
 app.include_router(chat.router)
+app.include_router(batch.router)
+app.include_router(metrics.router)
+app.include_router(highlights.router)
 
 
 # Health check
@@ -33,4 +108,4 @@ async def health_check():
 
 # Serve static frontend files (mount after API routes)
 frontend_path = Path(__file__).parent.parent / "frontend"
-app.mount("/", StaticFiles(directory=str(frontend_path), html=True), name="frontend")
+app.mount("/", CachedStaticFiles(directory=str(frontend_path), html=True), name="frontend")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 
 
@@ -7,10 +7,12 @@ class SummaryMetadata(BaseModel):
     """Metadata extracted from a summary file"""
     filename: str
     title: str
-    file_path: str
+    file_path: Optional[str] = None  # Omitted from compact listings
     modified_date: datetime
-    preview: str  # First 200 chars of content
-    category: Optional[str] = None  # Folder category (tech, science, business, culture, general)
+    preview: Optional[str] = None  # First 200 chars of content (omitted from compact listings)
+    category: Optional[str] = None  # Folder category (see SUMMARY_CATEGORIES)
+    snippet: Optional[str] = None  # Matching excerpt (search results only)
+    score: Optional[float] = None  # Relevance score (search results only)
 
 
 class SummaryDetail(BaseModel):
@@ -19,13 +21,58 @@ class SummaryDetail(BaseModel):
     title: str
     content: str  # Full markdown content
     modified_date: datetime
-    category: Optional[str] = None  # Folder category (tech, science, business, culture, general)
+    category: Optional[str] = None  # Folder category (see SUMMARY_CATEGORIES)
+
+
+class CategoryInfo(BaseModel):
+    """A configured summary category"""
+    name: str
+    description: str
+    count: int  # Summaries currently in the category
+
+
+class CategoryListResponse(BaseModel):
+    """Configured summary categories, in display order"""
+    categories: List[CategoryInfo]
 
 
 class SummaryListResponse(BaseModel):
     """Response for listing summaries"""
     summaries: List[SummaryMetadata]
     total: int
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the next page
+
+
+class RetrievedPassage(BaseModel):
+    """A passage of a summary returned by semantic retrieval"""
+    filename: str
+    title: str
+    category: Optional[str] = None
+    heading: str  # Section heading the passage belongs to
+    text: str
+    score: float  # Cosine similarity to the query
+
+
+class RetrievalResponse(BaseModel):
+    """Response for semantic retrieval"""
+    passages: List[RetrievedPassage]
+
+
+class Highlight(BaseModel):
+    """A highlighted passage of a summary"""
+    id: Optional[int] = None  # Assigned by the store
+    text: str
+    color: str
+    offset: int = 0  # Character offset of the text in the rendered summary
+    tags: List[str] = []
+    filename: Optional[str] = None  # Set in cross-summary queries
+    path: Optional[str] = None  # Summary path relative to the knowledge base
+    created_at: Optional[datetime] = None
+
+
+class HighlightListResponse(BaseModel):
+    """Highlights of one summary, or matching a query across summaries"""
+    highlights: List[Highlight]
 
 
 class ChatMessage(BaseModel):
@@ -43,11 +90,43 @@ class ChatRequest(BaseModel):
 class SummarizeRequest(BaseModel):
     """Request for summarization endpoint"""
     youtube_url: str
+    # "map_reduce" summarizes transcript chunks in parallel, for long videos;
+    # "pipeline" fetches the transcript in code and makes one structured LLM call
+    mode: Literal["single", "map_reduce", "pipeline"] = "single"
+    # Regenerate even if this video was already summarized with the current prompt
+    force_refresh: bool = False
 
 
 class SummarizeResponse(BaseModel):
     """Response from summarization endpoint"""
     status: str
     message: str
+    summary_path: Optional[str] = None  # Absolute path of the saved summary file
+    category: Optional[str] = None
+
+
+class BatchSummarizeRequest(BaseModel):
+    """Request for batch summarization (video URLs and/or a playlist)"""
+    youtube_urls: List[str] = []
+    playlist_url: Optional[str] = None
+    mode: Literal["single", "map_reduce", "pipeline"] = "single"
+
+
+class BatchItem(BaseModel):
+    """Status of one video in a batch job"""
+    video_id: str
+    status: str = "queued"  # queued, running, retrying, succeeded, failed, skipped
+    attempts: int = 0
+    message: Optional[str] = None
+    error: Optional[str] = None
     summary_path: Optional[str] = None
     category: Optional[str] = None
+
+
+class BatchJob(BaseModel):
+    """A batch summarization job and the status of each of its videos"""
+    job_id: str
+    status: str = "queued"  # queued, running, completed
+    created_at: datetime
+    mode: str = "single"
+    items: List[BatchItem]
@@ -0,0 +1,66 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
+
+from ..services.agent import extract_video_id
+from ..services.batch import batch_summarizer, extract_playlist_id, fetch_playlist_video_ids
+from ..models.schemas import BatchSummarizeRequest, BatchJob
+
+router = APIRouter(prefix="/api/summarize/batch", tags=["batch"])
+
+
+@router.post("", response_model=BatchJob, status_code=202)
+async def submit_batch(request: BatchSummarizeRequest):
+    """Queue a list of YouTube URLs and/or a playlist for summarization"""
+    video_ids = []
+    for url in request.youtube_urls:
+        video_id = extract_video_id(url)
+        if not video_id:
+            raise HTTPException(status_code=400, detail=f"Invalid YouTube URL: {url}")
+        video_ids.append(video_id)
+
+    if request.playlist_url:
+        playlist_id = extract_playlist_id(request.playlist_url)
+        if not playlist_id:
+            raise HTTPException(status_code=400, detail="Invalid YouTube playlist URL")
+        try:
+            video_ids.extend(await fetch_playlist_video_ids(playlist_id))
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Error reading playlist: {str(e)}")
+
+    if not video_ids:
+        raise HTTPException(status_code=400, detail="No videos to summarize")
+
+    return await batch_summarizer.submit(video_ids, request.mode)
+
+
+@router.get("/{job_id}", response_model=BatchJob)
+async def get_batch(job_id: str):
+    """Get the status of a batch job and each of its videos"""
+    job = batch_summarizer.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.websocket("/{job_id}/ws")
+async def watch_batch(websocket: WebSocket, job_id: str):
+    """Push a job snapshot on every status change until the job completes"""
+    job = batch_summarizer.get(job_id)
+    await websocket.accept()
+    if not job:
+        await websocket.send_json({"type": "error", "content": "Job not found"})
+        await websocket.close()
+        return
+
+    updates = batch_summarizer.subscribe(job_id)
+    try:
+        snapshot = job.model_dump(mode="json")
+        while True:
+            await websocket.send_json({"type": "job", "job": snapshot})
+            if snapshot["status"] == "completed":
+                break
+            snapshot = await updates.get()
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        batch_summarizer.unsubscribe(job_id, updates)
@@ -1,90 +1,126 @@
 import uuid
+from typing import Optional
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
-from pydantic import BaseModel
+from langchain_core.messages import AIMessage, HumanMessage
+from pydantic import ValidationError
 
-from ..services.agent import AgentService, extract_video_id
-from ..models.schemas import SummarizeRequest, SummarizeResponse
+from ..services.agent import agent_pool, extract_video_id, cached_summary
+from ..services.conversations import conversation_store
+from ..services.llm_cache import bypass_llm_cache
+from ..models.schemas import ChatRequest, SummarizeRequest, SummarizeResponse
 
 router = APIRouter(prefix="/api", tags=["chat"])
 
-# Store active conversations (in-memory for simplicity)
-conversations: dict[str, dict] = {}
-
 
 class ChatConnectionManager:
-    """Manages WebSocket connections and their associated agents"""
+    """Manages open WebSocket connections and the conversation each is on.
+
+    Connections are keyed by socket, not conversation ID: a client that
+    resumes a conversation while its old socket is still open gets a second
+    entry, and closing either one leaves the other in place. Histories live
+    in the conversation store and agents in the shared agent pool, so a
+    connection holds nothing but its socket.
+    """
 
     def __init__(self):
-        self.active_connections: dict[str, WebSocket] = {}
-        self.agents: dict[str, AgentService] = {}
-        self.histories: dict[str, list] = {}
+        self.active_connections: dict[WebSocket, str] = {}
 
     async def connect(self, websocket: WebSocket, conversation_id: str):
         await websocket.accept()
-        self.active_connections[conversation_id] = websocket
-        self.histories[conversation_id] = []
-        # Create agent for this connection
-        self.agents[conversation_id] = await AgentService.create()
+        self.active_connections[websocket] = conversation_id
+
+    def switch(self, websocket: WebSocket, conversation_id: str):
+        """Move a connection to another conversation"""
+        if websocket in self.active_connections:
+            self.active_connections[websocket] = conversation_id
 
-    def disconnect(self, conversation_id: str):
-        if conversation_id in self.active_connections:
-            del self.active_connections[conversation_id]
-        if conversation_id in self.agents:
-            del self.agents[conversation_id]
-        if conversation_id in self.histories:
-            del self.histories[conversation_id]
+    def disconnect(self, websocket: WebSocket):
+        self.active_connections.pop(websocket, None)
 
-    async def send_message(self, conversation_id: str, message: dict):
-        if conversation_id in self.active_connections:
-            await self.active_connections[conversation_id].send_json(message)
+    async def send_message(self, websocket: WebSocket, message: dict):
+        if websocket in self.active_connections:
+            await websocket.send_json(message)
 
 
 manager = ChatConnectionManager()
 
 
+def visible_messages(history: list) -> list[dict]:
+    """User questions and final assistant answers, for redisplaying a resumed chat"""
+    messages = []
+    for message in history:
+        if not isinstance(message.content, str) or not message.content:
+            continue
+        if isinstance(message, HumanMessage):
+            messages.append({"role": "user", "content": message.content})
+        elif isinstance(message, AIMessage) and not message.tool_calls:
+            messages.append({"role": "assistant", "content": message.content})
+    return messages
+
+
 @router.websocket("/chat/ws")
-async def websocket_chat(websocket: WebSocket):
-    """WebSocket endpoint for real-time chat with the agent"""
-    conversation_id = str(uuid.uuid4())
+async def websocket_chat(websocket: WebSocket, conversation_id: Optional[str] = None):
+    """WebSocket endpoint for real-time chat with the agent.
+
+    Connect with ?conversation_id=... (or send it with a message) to resume
+    a stored conversation; otherwise a new one is started.
+    """
+    history = await conversation_store.load(conversation_id) if conversation_id else None
+    resumed = history is not None
+    if not resumed:
+        conversation_id = str(uuid.uuid4())
 
     try:
         await manager.connect(websocket, conversation_id)
 
-        # Send conversation ID to client
+        # Send conversation ID (and any earlier messages) to client
         await manager.send_message(
-            conversation_id, {"type": "connected", "conversation_id": conversation_id}
+            websocket,
+            {
+                "type": "connected",
+                "conversation_id": conversation_id,
+                "resumed": resumed,
+                "messages": visible_messages(history) if resumed else [],
+            },
         )
 
         while True:
-            data = await websocket.receive_json()
-            user_message = data.get("message", "")
+            try:
+                request = ChatRequest(**await websocket.receive_json())
+            except ValidationError:
+                continue
+            if request.conversation_id and request.conversation_id != conversation_id:
+                if await conversation_store.load(request.conversation_id) is not None:
+                    manager.switch(websocket, request.conversation_id)
+                    conversation_id = request.conversation_id
+            user_message = request.message
 
             if not user_message.strip():
                 continue
 
             # Send typing indicator
-            await manager.send_message(conversation_id, {"type": "typing"})
+            await manager.send_message(websocket, {"type": "typing"})
 
             try:
-                # Get response from agent
-                agent = manager.agents[conversation_id]
-                history = manager.histories[conversation_id]
-                response = await agent.chat(user_message, history)
-
-                # Send response
-                await manager.send_message(
-                    conversation_id, {"type": "message", "content": response}
-                )
+                # Stream tokens, tool progress and the final message from a
+                # pooled agent. The turn works on a copy, so a turn that fails
+                # midway leaves the stored (and cached) history untouched.
+                history = list(await conversation_store.load(conversation_id) or [])
+                async with agent_pool.acquire() as agent:
+                    async for event in agent.chat_stream(user_message, history):
+                        await manager.send_message(websocket, event)
+                await conversation_store.save(conversation_id, history)
             except Exception as e:
                 await manager.send_message(
-                    conversation_id,
+                    websocket,
                     {"type": "error", "content": f"Error processing message: {str(e)}"},
                 )
 
     except WebSocketDisconnect:
-        manager.disconnect(conversation_id)
+        manager.disconnect(websocket)
     except Exception as e:
-        manager.disconnect(conversation_id)
+        manager.disconnect(websocket)
         raise e
 
 
@@ -96,12 +132,21 @@ async def summarize_video(request: SummarizeRequest):
     if not video_id:
         raise HTTPException(status_code=400, detail="Invalid YouTube URL")
 
-    try:
-        # Create a temporary agent for this request
-        agent = await AgentService.create()
+    # Reuse an existing summary unless a refresh is requested
+    if not request.force_refresh:
+        cached = cached_summary(video_id)
+        if cached:
+            return SummarizeResponse(**cached)
 
-        # Use agent to fetch transcript and generate summary
-        result = await agent.summarize_video(video_id)
+    try:
+        # Use a pooled agent to fetch transcript and generate summary
+        async with agent_pool.acquire() as agent:
+            if request.force_refresh:
+                # Regenerate for real instead of replaying cached LLM answers
+                with bypass_llm_cache():
+                    result = await agent.summarize_video(video_id, request.mode)
+            else:
+                result = await agent.summarize_video(video_id, request.mode)
         return SummarizeResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error summarizing video: {str(e)}")
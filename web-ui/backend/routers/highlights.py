@@ -0,0 +1,15 @@
+from typing import Optional
+
+from fastapi import APIRouter
+
+from ..services.highlights import highlight_store
+from ..models.schemas import HighlightListResponse
+
+router = APIRouter(prefix="/api/highlights", tags=["highlights"])
+
+
+@router.get("", response_model=HighlightListResponse)
+async def find_highlights(tag: Optional[str] = None, color: Optional[str] = None):
+    """Highlights across all summaries, newest first, optionally by tag and/or color"""
+    highlights = await highlight_store.find(tag=tag, color=color)
+    return HighlightListResponse(highlights=highlights)
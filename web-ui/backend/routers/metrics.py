@@ -0,0 +1,48 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..services.agent import agent_pool
+from ..services.batch import batch_summarizer
+from ..services.conversations import conversation_store
+from ..services.history import history_stats
+from ..services.llm_scheduler import Priority, llm_scheduler
+from ..services.metrics import registry
+from .chat import manager
+
+router = APIRouter(prefix="/api", tags=["metrics"])
+
+# Point-in-time values, read when /api/metrics is scraped
+registry.gauge(
+    "active_conversations", "Open chat WebSocket connections", lambda: len(manager.active_connections)
+)
+registry.gauge(
+    "conversations_cached", "Conversations held in memory", lambda: conversation_store.cached_count
+)
+registry.gauge(
+    "conversations_cached_bytes",
+    "Serialized size of the conversations held in memory",
+    lambda: conversation_store.cached_bytes,
+)
+registry.gauge("agent_pool_size", "Configured number of pooled agents", lambda: agent_pool.size)
+registry.gauge("agent_pool_in_use", "Requests being served by pooled agents", lambda: agent_pool.in_use)
+registry.gauge("batch_queue_depth", "Batch items waiting for a worker", lambda: batch_summarizer.queue_depth)
+for priority in Priority:
+    name = priority.name.lower()
+    registry.gauge(
+        f"llm_queue_depth_{name}",
+        f"LLM calls of priority {name} waiting for rate limit capacity",
+        lambda priority=priority: llm_scheduler.queue_depth(priority),
+    )
+for key in history_stats:
+    registry.gauge(
+        f"history_{key}_total",
+        f"Chat history compaction: {key.replace('_', ' ')}",
+        lambda key=key: history_stats[key],
+        metric_type="counter",
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
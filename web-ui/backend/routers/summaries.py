@@ -1,45 +1,149 @@
-from fastapi import APIRouter, HTTPException, Query, Body
+from datetime import datetime
+from typing import Optional
 
+from fastapi import APIRouter, HTTPException, Query, Body, Request, Response
+
+from ..http_cache import etag_for, is_not_modified, not_modified_response, validator_headers
+from ..services.categories import category_registry
 from ..services.knowledge_base import kb_service
-from ..models.schemas import SummaryListResponse, SummaryDetail
+from ..models.schemas import (
+    SummaryListResponse,
+    SummaryDetail,
+    CategoryListResponse,
+    CategoryInfo,
+    RetrievalResponse,
+    Highlight,
+    HighlightListResponse,
+)
 
 router = APIRouter(prefix="/api/summaries", tags=["summaries"])
 
 
-@router.get("", response_model=SummaryListResponse)
-async def list_summaries():
-    """List all summaries in the knowledge base"""
-    summaries = await kb_service.list_all()
-    return SummaryListResponse(summaries=summaries, total=len(summaries))
+@router.get("", response_model=SummaryListResponse, response_model_exclude_none=True)
+async def list_summaries(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    category: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    compact: bool = Query(False, description="Omit preview and file_path"),
+):
+    """List summaries in the knowledge base, newest first, one page at a time"""
+    cached = await _check_index_etag(request, response)
+    if cached:
+        return cached
+    try:
+        summaries, total, next_cursor = await kb_service.list_page(
+            limit, cursor=cursor, category=category, date_from=date_from, date_to=date_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if compact:
+        summaries = [s.model_copy(update={"preview": None, "file_path": None}) for s in summaries]
+    return SummaryListResponse(summaries=summaries, total=total, next_cursor=next_cursor)
+
+
+@router.get("/categories", response_model=CategoryListResponse)
+async def list_categories():
+    """Configured summary categories with the number of summaries in each"""
+    counts = dict(await kb_service.list_categories())
+    return CategoryListResponse(
+        categories=[
+            CategoryInfo(name=c.name, description=c.description, count=counts.get(c.name, 0))
+            for c in category_registry
+        ]
+    )
 
 
 @router.get("/search", response_model=SummaryListResponse)
-async def search_summaries(q: str = Query(..., min_length=2)):
-    """Search summaries by title or content"""
-    results = await kb_service.search(q)
+async def search_summaries(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=2),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Search summaries by title, headings or content (ranked, supports "phrases")"""
+    cached = await _check_index_etag(request, response)
+    if cached:
+        return cached
+    results = await kb_service.search(q, limit)
     return SummaryListResponse(summaries=results, total=len(results))
 
 
-@router.get("/{filename}/highlights")
+@router.get("/retrieve", response_model=RetrievalResponse)
+async def retrieve_passages(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=2),
+    k: int = Query(5, ge=1, le=50),
+):
+    """Semantic retrieval: the summary passages most relevant to a question"""
+    cached = await _check_index_etag(request, response)
+    if cached:
+        return cached
+    passages = await kb_service.retrieve(q, k)
+    return RetrievalResponse(passages=passages)
+
+
+@router.get("/{filename:path}/highlights", response_model=HighlightListResponse)
 async def get_highlights(filename: str):
-    """Get saved highlights for a summary"""
+    """Get saved highlights for a summary (by filename, or category/filename)"""
     highlights = await kb_service.get_highlights(filename)
-    return {"highlights": highlights}
+    return HighlightListResponse(highlights=highlights)
 
 
-@router.put("/{filename}/highlights")
-async def save_highlights(filename: str, highlights: list = Body(..., embed=True)):
-    """Save highlights for a summary"""
-    success = await kb_service.save_highlights(filename, highlights)
-    if not success:
+@router.put("/{filename:path}/highlights")
+async def save_highlights(filename: str, highlights: list[Highlight] = Body(..., embed=True)):
+    """Replace all highlights of a summary"""
+    saved = await kb_service.save_highlights(filename, highlights)
+    if saved is None:
         raise HTTPException(status_code=404, detail="Summary not found")
-    return {"status": "saved", "count": len(highlights)}
+    return {"status": "saved", "count": len(saved), "highlights": saved}
+
+
+@router.post("/{filename:path}/highlights", response_model=Highlight, status_code=201)
+async def add_highlight(filename: str, highlight: Highlight):
+    """Add a single highlight to a summary"""
+    saved = await kb_service.add_highlight(filename, highlight)
+    if saved is None:
+        raise HTTPException(status_code=404, detail="Summary not found")
+    return saved
+
+
+@router.delete("/{filename:path}/highlights/{highlight_id}", status_code=204)
+async def delete_highlight(filename: str, highlight_id: int):
+    """Remove a single highlight from a summary"""
+    if not await kb_service.remove_highlight(filename, highlight_id):
+        raise HTTPException(status_code=404, detail="Highlight not found")
 
 
 @router.get("/{filename}", response_model=SummaryDetail)
-async def get_summary(filename: str):
+async def get_summary(filename: str, request: Request, response: Response):
     """Get full content of a specific summary"""
+    # Validate against the file's mtime/size before reading it
+    stat = await kb_service.stat_summary(filename)
+    if stat is not None:
+        last_modified = datetime.fromtimestamp(stat.st_mtime)
+        headers = validator_headers(f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"', last_modified)
+        if is_not_modified(request, headers["ETag"], last_modified):
+            return not_modified_response(headers)
+        response.headers.update(headers)
     summary = await kb_service.get_by_filename(filename)
     if not summary:
         raise HTTPException(status_code=404, detail="Summary not found")
     return summary
+
+
+async def _check_index_etag(request: Request, response: Response) -> Optional[Response]:
+    """304 response if the client's copy matches the current index and query.
+
+    Otherwise set the validators on the response and return None.
+    """
+    await kb_service.refresh()
+    headers = validator_headers(etag_for(kb_service.index_version, request.url.path, request.url.query))
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+    return None
@@ -1,125 +1,60 @@
 import re
-from typing import AsyncGenerator
+import json
+import hashlib
+import time
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from pathlib import Path
+from typing import AsyncGenerator, Awaitable, Callable, Optional
 
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
 from langgraph.graph import StateGraph, MessagesState, START
 from langgraph.prebuilt import ToolNode, tools_condition
 from langchain_openai import AzureChatOpenAI
+from langchain_core.caches import BaseCache
+from langchain_core.messages import HumanMessage
 
 from ..config import settings
+from .history import HistoryManager
+from .tools import local_tools
+from .categories import category_registry
+from .knowledge_base import kb_service
+from .llm_cache import exact_llm_cache_only, llm_cache
+from .llm_scheduler import Priority, llm_priority, scheduled_http_client
+from .summary_cache import summary_manifest
+from .metrics import cache_requests, metrics_callbacks, span
 
 
-class AgentService:
-    """Wrapper for LangGraph agent, adapted for web use"""
-
-    def __init__(self, graph, mcp_client, tools):
-        self.graph = graph
-        self.mcp_client = mcp_client
-        self.tools = tools
-
-    @classmethod
-    async def create(cls) -> "AgentService":
-        """Factory method to create an initialized agent"""
-        # Initialize LLM (same as existing langgraph_client.py)
-        llm = AzureChatOpenAI(
-            model_name=settings.MODEL_NAME,
-            openai_api_version=settings.API_VERSION,
-            azure_deployment=settings.DEPLOYMENT,
-            azure_endpoint=settings.ENDPOINT,
-            openai_api_key=settings.SUBSCRIPTION_KEY,
-        )
-
-        # Initialize MCP client (same config as existing)
-        # Use uv run to ensure dependencies are available
-        mcp_client = MultiServerMCPClient(
-            {
-                "youtube_server": {
-                    "command": "uv",
-                    "args": [
-                        "--directory",
-                        settings.YOUTUBE_SERVER_DIR,
-                        "run",
-                        "python",
-                        settings.YOUTUBE_SERVER_PATH,
-                    ],
-                    "transport": "stdio",
-                },
-                "filesystem": {
-                    "command": "docker",
-                    "args": [
-                        "run",
-                        "-i",
-                        "--rm",
-                        "--mount",
-                        f"type=bind,src={settings.KNOWLEDGE_BASE_PATH},dst=/projects/knowledge_youtube",
-                        "mcp/filesystem",
-                        "/projects/knowledge_youtube",
-                    ],
-                    "transport": "stdio",
-                },
-            }
-        )
-
-        # Get tools and build graph
-        tools = await mcp_client.get_tools()
-
-        def call_model(state: MessagesState):
-            response = llm.bind_tools(tools).invoke(state["messages"])
-            return {"messages": response}
-
-        builder = StateGraph(MessagesState)
-        builder.add_node(call_model)
-        builder.add_node(ToolNode(tools))
-        builder.add_edge(START, "call_model")
-        builder.add_conditional_edges("call_model", tools_condition)
-        builder.add_edge("tools", "call_model")
-        graph = builder.compile()
+# Prompt for the map step of map-reduce summarization (one transcript chunk)
+MAP_PROMPT = """Below is part {part} of {count} ({time_range}) of the transcript of the YouTube video with ID: {video_id}. [mm:ss] markers give timestamps.
 
-        return cls(graph, mcp_client, tools)
+Write detailed notes on this part only: the main points and arguments, facts and figures, names, examples, and up to three notable verbatim quotes with their timestamps. Do not add an introduction or a conclusion.
 
-    async def chat(self, message: str, history: list) -> str:
-        """Send a chat message and get response"""
-        history.append({"role": "user", "content": message})
+Transcript:
+{text}"""
 
-        response = await self.graph.ainvoke({"messages": history})
 
-        # Update history with response
-        if response["messages"]:
-            answer = response["messages"][-1].content
-            history.clear()
-            history.extend(
-                [
-                    {"role": m.type if hasattr(m, "type") else m.get("role", "user"), "content": m.content if hasattr(m, "content") else m.get("content", "")}
-                    for m in response["messages"]
-                    if hasattr(m, "content") or isinstance(m, dict)
-                ]
-            )
-            return answer
-        return "No response generated"
+# Video types the summary is adapted to, with what identifies them
+VIDEO_TYPES = {
+    "Technical/Tutorial": "Coding, software, how-to guides, demos",
+    "Science/Research": "Studies, experiments, scientific explanations",
+    "Interview/Podcast": "Conversations, Q&A, discussions",
+    "Documentary/Narrative": "Stories, journeys, biographical content",
+    "News/Analysis": "Current events, opinion pieces, market analysis",
+    "Motivational/Self-help": "Personal development, mindset, life advice",
+    "Educational/Explainer": "Concept explanations, lectures, courses",
+}
 
-    async def summarize_video(self, video_id: str) -> dict:
-        """Summarize a YouTube video using the agent"""
-        prompt = f"""Please summarize the YouTube video with ID: {video_id}
 
-## Instructions
-
-1. First, fetch the transcript using the fetch_youtube_transcript tool
-
-2. Analyze the transcript and identify the video type from these categories:
-   - **Technical/Tutorial**: Coding, software, how-to guides, demos
-   - **Science/Research**: Studies, experiments, scientific explanations
-   - **Interview/Podcast**: Conversations, Q&A, discussions
-   - **Documentary/Narrative**: Stories, journeys, biographical content
-   - **News/Analysis**: Current events, opinion pieces, market analysis
-   - **Motivational/Self-help**: Personal development, mindset, life advice
-   - **Educational/Explainer**: Concept explanations, lectures, courses
+def _summary_guidelines() -> str:
+    """Steps 2-4 and the format of the summarize prompt (shared by all modes)"""
+    video_type_list = "\n".join(f"   - **{name}**: {hint}" for name, hint in VIDEO_TYPES.items())
+    return f"""2. Analyze the transcript and identify the video type from these categories:
+{video_type_list}
 
 3. Classify the video into exactly ONE of these folder categories:
-   - **tech** — Coding, software, AI, tutorials, technical demos, technology
-   - **science** — Studies, experiments, scientific explanations, health, research
-   - **business** — Startups, finance, markets, entrepreneurship, investing, productivity
-   - **culture** — Politics, society, history, documentaries, entertainment, interviews about life/society
-   - **general** — Anything that doesn't clearly fit the above categories
+{category_registry.prompt_list()}
 
 4. Create a summary adapted to the video type:
 
@@ -178,39 +113,661 @@ class AgentService:
 - Video Type: [Detected type] (in italics, right after title)
 - Overview paragraph
 - Main content sections (H2) appropriate to the type
-- Key Takeaways section
+- Key Takeaways section"""
+
 
-5. Save the summary to the appropriate category subfolder using write_file tool.
+def build_summary_prompt(video_id: str, source_step: str) -> str:
+    """Prompt that has the agent summarize, categorize and save a video"""
+    example = category_registry.names[0]
+    if settings.KB_TOOLS_MODE == "docker":
+        save_step = f"""Save the summary to the appropriate category subfolder using write_file tool.
    Filename: /projects/knowledge_youtube/{{category}}/[Descriptive_Title].md
 
-   For example, if the category is "tech":
-   /projects/knowledge_youtube/tech/Building_AI_Agents.md
+   For example, if the category is "{example}":
+   /projects/knowledge_youtube/{example}/Building_AI_Agents.md"""
+    else:
+        save_step = f"""Save the summary using the write_summary tool, with the category and a
+   descriptive filename: [Descriptive_Title].md
+
+   For example, if the category is "{example}":
+   category "{example}" and filename "Building_AI_Agents.md"."""
+
+    return f"""Please summarize the YouTube video with ID: {video_id}
+
+## Instructions
+
+1. {source_step}
+
+{_summary_guidelines()}
+
+5. {save_step}
 
 6. End your response with this exact line (replace values accordingly):
    CATEGORY: {{category}}"""
 
-        response = await self.graph.ainvoke(
-            {"messages": [{"role": "user", "content": prompt}]}
+
+def build_pipeline_prompt(video_id: str, transcript: str) -> str:
+    """Prompt for one structured-output call that summarizes a fetched transcript"""
+    return f"""Please summarize the YouTube video with ID: {video_id}
+
+## Instructions
+
+1. Read the transcript at the end of this message.
+
+{_summary_guidelines()}
+
+5. Return the summary as structured output: "title" is the H1 title (without the
+   leading #), "video_type" the detected type, "category" the folder category,
+   and "body" the markdown from the overview paragraph to the Key Takeaways
+   section (without the title and Video Type lines).
+
+## Transcript
+
+{transcript}"""
+
+
+def summary_schema() -> dict:
+    """JSON schema of the pipeline's structured output"""
+    return {
+        "title": "video_summary",
+        "description": "Summary of a YouTube video, ready to save to the knowledge base",
+        "type": "object",
+        "properties": {
+            "title": {"type": "string", "description": "Title capturing the video's essence"},
+            "video_type": {"type": "string", "enum": list(VIDEO_TYPES)},
+            "category": {"type": "string", "enum": category_registry.names},
+            "body": {
+                "type": "string",
+                "description": "Markdown: overview paragraph, H2 sections and a Key Takeaways section",
+            },
+        },
+        "required": ["title", "video_type", "category", "body"],
+        "additionalProperties": False,
+    }
+
+
+def summary_prompt_version() -> str:
+    """Hash of the summarize prompt templates and model.
+
+    Saved summaries record it, so they are regenerated when either changes.
+    """
+    template = build_summary_prompt("{video_id}", "{source_step}") + build_pipeline_prompt(
+        "{video_id}", "{transcript}"
+    )
+    key = f"{template}\0{settings.MODEL_NAME}\0{settings.DEPLOYMENT}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+def cached_summary(video_id: str) -> Optional[dict]:
+    """Summarize result for a video already summarized with the current prompt and model"""
+    entry = summary_manifest.lookup(video_id, summary_prompt_version())
+    cache_requests.inc(cache="summary", result="miss" if entry is None else "hit")
+    if entry is None:
+        return None
+    return {
+        "status": "cached",
+        "message": (
+            f"This video was already summarized on {entry.created_at} "
+            f"({entry.summary_path}). Use force_refresh to regenerate it."
+        ),
+        "summary_path": str(summary_manifest.base_path / entry.summary_path),
+        "category": entry.category,
+    }
+
+
+def youtube_server_connection() -> dict:
+    """MCP connection to the YouTube server for the configured transport"""
+    if settings.YOUTUBE_SERVER_TRANSPORT in ("streamable_http", "sse"):
+        # One shared server process, however many agents connect
+        return {"url": settings.YOUTUBE_SERVER_URL, "transport": settings.YOUTUBE_SERVER_TRANSPORT}
+    # Use uv run to ensure dependencies are available
+    return {
+        "command": "uv",
+        "args": [
+            "--directory",
+            settings.YOUTUBE_SERVER_DIR,
+            "run",
+            "python",
+            settings.YOUTUBE_SERVER_PATH,
+        ],
+        "transport": "stdio",
+    }
+
+
+class AgentService:
+    """Wrapper for LangGraph agent, adapted for web use"""
+
+    def __init__(self, graph, mcp_client, tools, llm=None, sessions=None, exit_stack=None):
+        self.graph = graph
+        self.mcp_client = mcp_client
+        self.tools = tools
+        self.llm = llm
+        self.history_manager = HistoryManager(llm)
+        self.sessions = sessions or {}
+        self._exit_stack = exit_stack
+
+    @classmethod
+    async def create(cls) -> "AgentService":
+        """Factory method to create an initialized agent.
+
+        MCP sessions are opened once and kept alive for the lifetime of the
+        agent, so tool calls reuse the same server processes instead of
+        spawning new ones per call. Call close() to shut them down.
+        """
+        # Initialize LLM (same as existing langgraph_client.py). Requests go
+        # through the process-wide scheduler, which also retries 429s.
+        http_client = scheduled_http_client()
+        llm = AzureChatOpenAI(
+            model_name=settings.MODEL_NAME,
+            openai_api_version=settings.API_VERSION,
+            azure_deployment=settings.DEPLOYMENT,
+            azure_endpoint=settings.ENDPOINT,
+            openai_api_key=settings.SUBSCRIPTION_KEY,
+            callbacks=[metrics_callbacks],
+            http_async_client=http_client,
+            max_retries=0,
         )
 
+        connections = {"youtube_server": youtube_server_connection()}
+        if settings.KB_TOOLS_MODE == "docker":
+            # Knowledge base file access through the mcp/filesystem container
+            # instead of the in-process tools
+            connections["filesystem"] = {
+                "command": "docker",
+                "args": [
+                    "run",
+                    "-i",
+                    "--rm",
+                    "--mount",
+                    f"type=bind,src={settings.KNOWLEDGE_BASE_PATH},dst=/projects/knowledge_youtube",
+                    "mcp/filesystem",
+                    "/projects/knowledge_youtube",
+                ],
+                "transport": "stdio",
+            }
+        mcp_client = MultiServerMCPClient(connections)
+
+        # Open a persistent session per server and load its tools
+        exit_stack = AsyncExitStack()
+        exit_stack.push_async_callback(http_client.aclose)
+        sessions = {}
+        tools = []
+        try:
+            for server_name in mcp_client.connections:
+                session = await exit_stack.enter_async_context(
+                    mcp_client.session(server_name)
+                )
+                sessions[server_name] = session
+                tools.extend(await load_mcp_tools(session))
+        except BaseException:
+            await exit_stack.aclose()
+            raise
+        tools.extend(local_tools())
+
+        return cls.from_components(llm, tools, mcp_client, sessions, exit_stack, cache=llm_cache)
+
+    @classmethod
+    def from_components(
+        cls,
+        llm,
+        tools: list,
+        mcp_client=None,
+        sessions=None,
+        exit_stack=None,
+        cache: Optional[BaseCache] = None,
+    ) -> "AgentService":
+        """Build the agent graph around a chat model and a list of tools.
+
+        create() uses this with Azure OpenAI, the MCP tools and the LLM
+        response cache; benchmarks pass a scripted model and local tools
+        instead. Any LangChain cache can be plugged in with `cache`.
+        """
+        if cache is not None:
+            llm.cache = cache
+        # Bind tools once; the node awaits the model so completions never
+        # block the event loop shared by all chats and requests
+        llm_with_tools = llm.bind_tools(tools)
+
+        async def call_model(state: MessagesState):
+            response = await llm_with_tools.ainvoke(state["messages"])
+            return {"messages": response}
+
+        builder = StateGraph(MessagesState)
+        builder.add_node(call_model)
+        builder.add_node(ToolNode(tools))
+        builder.add_edge(START, "call_model")
+        builder.add_conditional_edges("call_model", tools_condition)
+        builder.add_edge("tools", "call_model")
+        # Per-node, per-tool and LLM latency for /api/metrics
+        graph = builder.compile().with_config(callbacks=[metrics_callbacks])
+
+        return cls(graph, mcp_client, tools, llm, sessions, exit_stack)
+
+    async def is_healthy(self, timeout: float = 5.0) -> bool:
+        """Ping every MCP session; False if any server is unresponsive"""
+        try:
+            for session in self.sessions.values():
+                await asyncio.wait_for(session.send_ping(), timeout=timeout)
+        except Exception:
+            return False
+        return True
+
+    async def close(self):
+        """Shut down the MCP sessions (and their server processes)"""
+        if self._exit_stack is not None:
+            exit_stack, self._exit_stack = self._exit_stack, None
+            await exit_stack.aclose()
+
+    async def chat(self, message: str, history: list) -> str:
+        """Send a chat message and get response"""
+        history.append(HumanMessage(content=message))
+        await self.history_manager.compact(history)
+
+        with span("agent.chat"):
+            response = await self.graph.ainvoke({"messages": history})
+
+        # Update history with response
+        if response["messages"]:
+            answer = response["messages"][-1].content
+            history[:] = response["messages"]
+            return answer
+        return "No response generated"
+
+    async def chat_stream(self, message: str, history: list) -> AsyncGenerator[dict, None]:
+        """Send a chat message and stream progress events.
+
+        Yields "token" events as the model generates text, "tool_start" and
+        "tool_end" events (with durations) around each tool call, and a
+        final "message" event with the complete answer.
+        """
+        history.append(HumanMessage(content=message))
+        await self.history_manager.compact(history)
+
+        final_state = None
+        tool_started: dict[str, float] = {}
+        with span("agent.chat_stream"):
+            async for event in self.graph.astream_events({"messages": history}, version="v2"):
+                kind = event["event"]
+                if kind == "on_chat_model_stream":
+                    content = event["data"]["chunk"].content
+                    if isinstance(content, str) and content:
+                        yield {"type": "token", "content": content}
+                elif kind == "on_tool_start":
+                    tool_started[event["run_id"]] = time.perf_counter()
+                    yield {"type": "tool_start", "id": event["run_id"], "name": event["name"]}
+                elif kind == "on_tool_end":
+                    started = tool_started.pop(event["run_id"], time.perf_counter())
+                    yield {
+                        "type": "tool_end",
+                        "id": event["run_id"],
+                        "name": event["name"],
+                        "duration_ms": round((time.perf_counter() - started) * 1000),
+                    }
+                elif kind == "on_chain_end" and not event["parent_ids"]:
+                    final_state = event["data"].get("output")
+
+        if final_state and final_state.get("messages"):
+            answer = final_state["messages"][-1].content
+            history[:] = final_state["messages"]
+        else:
+            answer = "No response generated"
+        yield {"type": "message", "content": answer}
+
+    async def summarize_video(self, video_id: str, mode: str = "single") -> dict:
+        """Summarize a YouTube video using the agent.
+
+        In "single" mode the agent reads the whole transcript in one turn.
+        In "map_reduce" mode the transcript is split into chunks that are
+        summarized concurrently, and the agent writes the final summary
+        from those section notes (for videos too long for one context).
+        "pipeline" mode skips the tool loop altogether (see _summarize_pipeline).
+        Its LLM calls are scheduled behind chat (see llm_priority) and only
+        replayed from the LLM cache for identical prompts: one video's prompts
+        are semantically near-identical to another's.
+        """
+        with llm_priority(Priority.SUMMARIZE), exact_llm_cache_only():
+            if mode == "pipeline":
+                return await self._summarize_pipeline(video_id)
+            return await self._summarize_agent(video_id, mode)
+
+    async def _summarize_agent(self, video_id: str, mode: str) -> dict:
+        """Summarize through the agent's tool loop ("single" or "map_reduce")"""
+        notes = None
+        if mode == "map_reduce":
+            with span("agent.map_transcript", video_id=video_id):
+                notes = await self._map_transcript(video_id)
+            source_step = (
+                "The transcript has already been fetched and condensed into the "
+                "timestamped section notes at the end of this message. Work from "
+                "these notes; do not fetch the transcript again"
+            )
+        else:
+            source_step = "First, fetch the transcript using the fetch_youtube_transcript tool"
+
+        prompt = build_summary_prompt(video_id, source_step)
+        if notes:
+            prompt += f"\n\n## Section Notes\n\n{notes}"
+
+        with span("agent.summarize", video_id=video_id, mode=mode):
+            response = await self.graph.ainvoke(
+                {"messages": [{"role": "user", "content": prompt}]}
+            )
+
         final_message = response["messages"][-1].content if response["messages"] else "Processing complete"
 
         # Parse category from LLM response
         category = None
         for line in final_message.split("\n"):
             if line.strip().startswith("CATEGORY:"):
-                category = line.strip().split(":", 1)[1].strip().lower()
-                if category not in ("tech", "science", "business", "culture", "general"):
-                    category = "general"
+                category = category_registry.normalize(line.strip().split(":", 1)[1])
                 break
 
+        # Record where the summary was saved so repeat requests can reuse it
+        summary_path = _saved_summary_path(response["messages"])
+        if summary_path is not None:
+            if category is None:
+                category = Path(summary_path).parent.name or None
+            summary_manifest.record(
+                video_id, summary_path, category, summary_prompt_version(), settings.DEPLOYMENT
+            )
+            summary_path = str(summary_manifest.base_path / summary_path)
+
         return {
             "status": "success",
             "message": final_message,
-            "summary_path": None,
+            "summary_path": summary_path,
             "category": category,
         }
 
+    async def _summarize_pipeline(self, video_id: str) -> dict:
+        """Fetch the transcript, summarize it in one LLM call and save it.
+
+        The transcript is fetched in code and sent once, the model answers
+        with structured output (title, video type, category, body), and the
+        file is written through the knowledge base service. That replaces
+        the agent's three or more round-trips, each of which resends the
+        transcript, with a single call.
+        """
+        with span("agent.fetch_transcript", video_id=video_id):
+            result = await self._tool("fetch_youtube_transcript").ainvoke({"video_id": video_id})
+        transcript = _tool_text(result)
+
+        llm = self.llm.with_structured_output(
+            summary_schema(), method=settings.SUMMARY_STRUCTURED_OUTPUT_METHOD
+        )
+        with span("agent.summarize", video_id=video_id, mode="pipeline"):
+            draft = await llm.ainvoke(
+                [{"role": "user", "content": build_pipeline_prompt(video_id, transcript)}]
+            )
+
+        title = " ".join(str(draft.get("title") or "Untitled").split())
+        category = category_registry.normalize(draft.get("category"))
+        body = str(draft.get("body") or "").strip()
+        content = f"# {title}\n\n*Video Type: {draft.get('video_type', '')}*\n\n{body}\n"
+        file_path = await kb_service.write_summary(
+            category, await _summary_filename(video_id, title), content
+        )
+
+        summary_path = file_path.relative_to(kb_service.base_path).as_posix()
+        summary_manifest.record(
+            video_id, summary_path, category, summary_prompt_version(), settings.DEPLOYMENT
+        )
+        return {
+            "status": "success",
+            "message": f"Saved {summary_path}",
+            "summary_path": str(summary_manifest.base_path / summary_path),
+            "category": category,
+        }
+
+    async def _map_transcript(self, video_id: str) -> str:
+        """Summarize transcript chunks concurrently and join the notes in order"""
+        result = await self._tool("fetch_youtube_transcript_chunks").ainvoke(
+            {
+                "video_id": video_id,
+                "max_tokens": settings.SUMMARY_CHUNK_MAX_TOKENS,
+                "max_seconds": settings.SUMMARY_CHUNK_MAX_SECONDS,
+            }
+        )
+        chunks = json.loads(_tool_text(result))
+        semaphore = asyncio.Semaphore(settings.SUMMARY_MAP_CONCURRENCY)
+
+        async def summarize_chunk(chunk: dict) -> str:
+            time_range = f"{_format_timestamp(chunk['start'])}–{_format_timestamp(chunk['end'])}"
+            prompt = MAP_PROMPT.format(
+                video_id=video_id,
+                time_range=time_range,
+                part=chunk["index"] + 1,
+                count=len(chunks),
+                text=chunk["text"],
+            )
+            async with semaphore:
+                response = await self.llm.ainvoke([{"role": "user", "content": prompt}])
+            return f"### {time_range}\n\n{response.content}"
+
+        notes = await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks))
+        return "\n\n".join(notes)
+
+    def _tool(self, name: str):
+        """Look up a loaded MCP tool by name"""
+        for tool in self.tools:
+            if tool.name == name:
+                return tool
+        raise LookupError(f"Tool {name!r} is not available")
+
+
+class AgentPool:
+    """Fixed-size pool of AgentService instances shared by all requests.
+
+    Agents are created once at application startup. The compiled graph and
+    the MCP sessions handle concurrent calls, so each chat turn or
+    summarization borrows the least busy agent (round-robin among equals)
+    without taking it from anyone else; only `max_concurrency` requests
+    share one agent, beyond that they wait for a slot. Conversation state
+    is passed in per request, so any agent can serve any conversation.
+    Agents are pinged periodically and replaced if their MCP servers died.
+    """
+
+    def __init__(
+        self,
+        size: int = settings.AGENT_POOL_SIZE,
+        acquire_timeout: float = settings.AGENT_POOL_ACQUIRE_TIMEOUT,
+        health_check_interval: float = settings.AGENT_POOL_HEALTH_CHECK_INTERVAL,
+        factory: Optional[Callable[[], Awaitable[AgentService]]] = None,
+        max_concurrency: int = settings.AGENT_POOL_MAX_CONCURRENCY,
+    ):
+        self.size = size
+        self.factory = factory or AgentService.create
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self.max_concurrency = max(1, max_concurrency)
+        self._agents: list[AgentService] = []  # In rotation
+        self._load: dict[AgentService, int] = {}  # Requests per open agent
+        self._next = 0
+        self._available = asyncio.Condition()
+        self._start_lock = asyncio.Lock()
+        self._started = False
+        self._health_task: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def capacity(self) -> int:
+        """Requests the pool serves at once"""
+        return self.size * self.max_concurrency
+
+    @property
+    def in_use(self) -> int:
+        return sum(self._load.values())
+
+    async def start(self):
+        """Create all agents and start the background health check"""
+        async with self._start_lock:
+            if self._started:
+                return
+            results = await asyncio.gather(
+                *(self.factory() for _ in range(self.size)), return_exceptions=True
+            )
+            agents = [r for r in results if not isinstance(r, BaseException)]
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                # Don't leak the MCP servers of the agents that did start
+                await asyncio.gather(*(agent.close() for agent in agents), return_exceptions=True)
+                raise errors[0]
+            for agent in agents:
+                self._agents.append(agent)
+                self._load[agent] = 0
+            if self.health_check_interval > 0:
+                self._health_task = asyncio.create_task(self._health_loop())
+            self._started = True
+
+    async def close(self):
+        """Stop the health check and shut down every agent"""
+        tasks = list(self._tasks)
+        if self._health_task is not None:
+            tasks.append(self._health_task)
+            self._health_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        agents = list(self._load)
+        self._agents, self._load = [], {}
+        self._started = False
+        await asyncio.gather(*(agent.close() for agent in agents), return_exceptions=True)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncGenerator[AgentService, None]:
+        """Borrow an agent for one request, waiting while every agent is at
+        max_concurrency"""
+        if not self._started:
+            await self.start()
+        async with self._available:
+            try:
+                agent = await asyncio.wait_for(
+                    self._available.wait_for(self._pick), timeout=self.acquire_timeout
+                )
+            except asyncio.TimeoutError:
+                raise TimeoutError(
+                    f"No agent became free within {self.acquire_timeout:g}s "
+                    f"({self.in_use} requests on {len(self._agents)} agents)"
+                ) from None
+            self._load[agent] += 1
+        healthy = True
+        try:
+            yield agent
+        except Exception:
+            healthy = await agent.is_healthy()
+            raise
+        finally:
+            self._load[agent] -= 1
+            if not healthy:
+                self._retire(agent)
+            if agent in self._load and agent not in self._agents and not self._load[agent]:
+                # Retired while in use: close it now that the last request is done
+                del self._load[agent]
+                self._spawn(agent.close())
+            async with self._available:
+                self._available.notify_all()
+
+    def _pick(self) -> Optional[AgentService]:
+        """Least busy agent with a free slot, starting after the last one picked"""
+        count = len(self._agents)
+        order = [self._agents[(self._next + i) % count] for i in range(count)]
+        agent = min(order, key=self._load.__getitem__, default=None)
+        if agent is None or self._load[agent] >= self.max_concurrency:
+            return None
+        self._next = (self._agents.index(agent) + 1) % count
+        return agent
+
+    def _spawn(self, coroutine: Awaitable):
+        """Run a background task, keeping a reference until it finishes"""
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _retire(self, agent: AgentService):
+        """Take a broken agent out of rotation and start a replacement.
+
+        Requests already using it run to completion; it is closed after the
+        last one.
+        """
+        if agent not in self._agents:
+            return
+        self._agents.remove(agent)
+        self._spawn(self._replace())
+        if not self._load.get(agent):
+            self._load.pop(agent, None)
+            self._spawn(agent.close())
+
+    async def _replace(self):
+        """Create an agent for the rotation, retrying until it starts"""
+        while self._started:
+            try:
+                fresh = await self.factory()
+            except Exception:
+                await asyncio.sleep(self.health_check_interval or 5.0)
+                continue
+            self._agents.append(fresh)
+            self._load[fresh] = 0
+            async with self._available:
+                self._available.notify_all()
+            return
+
+    async def _health_loop(self):
+        """Periodically ping every agent (in place) and replace unhealthy ones"""
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for agent in list(self._agents):
+                if not await agent.is_healthy():
+                    self._retire(agent)
+
+
+# Singleton instance (started by the application lifespan)
+agent_pool = AgentPool()
+
+
+def _saved_summary_path(messages: list) -> Optional[str]:
+    """Knowledge-base-relative path of the file the agent saved, if it exists"""
+    for message in reversed(messages):
+        for tool_call in reversed(getattr(message, "tool_calls", None) or []):
+            args = tool_call["args"]
+            path = None
+            if tool_call["name"] == "write_summary":
+                path = f"{args.get('category', '')}/{Path(args.get('filename', '')).name}"
+            elif tool_call["name"] == "write_file":
+                path = str(args.get("path", "")).removeprefix("/projects/knowledge_youtube/")
+            if path and (summary_manifest.base_path / path).is_file():
+                return path
+    return None
+
+
+async def _summary_filename(video_id: str, title: str) -> str:
+    """Descriptive_Title.md for a summary, made unique if another video has the name"""
+    stem = "_".join(re.findall(r"[A-Za-z0-9]+", title))[:100] or video_id
+    filename = f"{stem}.md"
+    if await kb_service.stat_summary(filename) is not None:
+        entry = summary_manifest.get(video_id)
+        if entry is None or Path(entry.summary_path).name != filename:
+            filename = f"{stem}_{video_id}.md"
+    return filename
+
+
+def _tool_text(result) -> str:
+    """Text of a tool result (MCP tools may return a list of content blocks)"""
+    if isinstance(result, str):
+        return result
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block) for block in result
+    )
+
+
+def _format_timestamp(seconds: float) -> str:
+    """Format seconds as mm:ss (or h:mm:ss)"""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
 
 def extract_video_id(url: str) -> str | None:
     """Extract video ID from various YouTube URL formats"""
@@ -0,0 +1,201 @@
+import re
+import uuid
+import asyncio
+import urllib.request
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from ..config import settings
+from ..models.schemas import BatchJob, BatchItem
+from .agent import agent_pool, cached_summary
+from .llm_scheduler import Priority, llm_priority
+from .knowledge_base import kb_service
+
+# Item states that will not change any more
+FINISHED_STATES = {"succeeded", "failed", "skipped"}
+
+
+def extract_playlist_id(url: str) -> str | None:
+    """Extract playlist ID from a YouTube playlist or watch URL"""
+    match = re.search(r"[?&]list=([a-zA-Z0-9_-]+)", url)
+    return match.group(1) if match else None
+
+
+async def fetch_playlist_video_ids(playlist_id: str) -> list[str]:
+    """Video IDs listed on a playlist page, in playlist order.
+
+    Reads the public playlist page, which lists the first 100 videos.
+    """
+    url = f"https://www.youtube.com/playlist?list={playlist_id}"
+
+    def fetch() -> str:
+        request = urllib.request.Request(url, headers={"Accept-Language": "en-US"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.read().decode("utf-8", errors="replace")
+
+    html = await asyncio.to_thread(fetch)
+    ids = re.findall(r'"videoId":"([a-zA-Z0-9_-]{11})"', html)
+    return list(dict.fromkeys(ids))
+
+
+class BatchSummarizer:
+    """Queue of batch summarization jobs processed by a fixed set of workers.
+
+    Each submitted video becomes one queue item. Workers borrow agents from
+    the shared agent pool, so throughput is bounded by the worker count and
+    pool capacity rather than by client connections. Fewer workers than the
+    pool has slots run, so one is always left for interactive chat. Videos already in the
+    knowledge base or already queued/running are skipped, and failures are
+    retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.BATCH_WORKERS,
+        max_retries: int = settings.BATCH_MAX_RETRIES,
+        retry_backoff: float = settings.BATCH_RETRY_BACKOFF,
+        max_jobs: int = settings.BATCH_MAX_JOBS,
+    ):
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_jobs = max_jobs
+        self.jobs: OrderedDict[str, BatchJob] = OrderedDict()
+        self._queue: asyncio.Queue[tuple[BatchJob, BatchItem]] = asyncio.Queue()
+        self._in_flight: dict[str, str] = {}  # video_id -> job_id
+        self._summarized: set[str] = set()  # video_ids summarized by this process
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    async def start(self):
+        """Start the worker tasks"""
+        if self._tasks:
+            return
+        # Keep a pool slot free for chat and single summaries (unless there's only one)
+        workers = max(1, min(self.workers, agent_pool.capacity - 1))
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(workers)]
+
+    async def stop(self):
+        """Cancel the worker tasks (queued items are abandoned)"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def submit(self, video_ids: list[str], mode: str = "single") -> BatchJob:
+        """Create a job for a list of video IDs and queue its items"""
+        if not self._tasks:
+            await self.start()
+        await kb_service.refresh()
+        job = BatchJob(job_id=str(uuid.uuid4()), created_at=datetime.now(), mode=mode, items=[])
+        for video_id in dict.fromkeys(video_ids):
+            item = BatchItem(video_id=video_id)
+            job.items.append(item)
+            if video_id in self._in_flight:
+                item.status = "skipped"
+                item.message = f"Already queued in job {self._in_flight[video_id]}"
+            elif (
+                video_id in self._summarized
+                or cached_summary(video_id)
+                or kb_service.has_video(video_id)
+            ):
+                item.status = "skipped"
+                item.message = "Already in knowledge base"
+            else:
+                self._in_flight[video_id] = job.job_id
+                self._queue.put_nowait((job, item))
+        self._update_status(job)
+
+        self.jobs[job.job_id] = job
+        self._prune_jobs()
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        return self.jobs.get(job_id)
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Queue that receives a job snapshot every time one of its items changes"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[job_id]
+
+    async def _worker(self):
+        while True:
+            job, item = await self._queue.get()
+            try:
+                await self._run_item(job, item)
+            finally:
+                self._in_flight.pop(item.video_id, None)
+                self._queue.task_done()
+
+    async def _run_item(self, job: BatchJob, item: BatchItem):
+        """Summarize one video, retrying failures with exponential backoff"""
+        while True:
+            item.status = "running"
+            item.attempts += 1
+            self._notify(job)
+            try:
+                # Background work: LLM calls yield to chat and single summaries
+                with llm_priority(Priority.BATCH):
+                    async with agent_pool.acquire() as agent:
+                        result = await agent.summarize_video(item.video_id, job.mode)
+                if not result.get("summary_path"):
+                    # The agent answered without writing a file
+                    raise RuntimeError("The agent finished without saving a summary")
+            except Exception as e:
+                item.error = str(e)
+                if item.attempts > self.max_retries:
+                    item.status = "failed"
+                    self._notify(job)
+                    return
+                item.status = "retrying"
+                self._notify(job)
+                await asyncio.sleep(self.retry_backoff * 2 ** (item.attempts - 1))
+                continue
+            self._summarized.add(item.video_id)
+            item.status = "succeeded"
+            item.error = None
+            item.message = result.get("message")
+            item.summary_path = result.get("summary_path")
+            item.category = result.get("category")
+            self._notify(job)
+            return
+
+    def _notify(self, job: BatchJob):
+        self._update_status(job)
+        snapshot = job.model_dump(mode="json")
+        for queue in self._subscribers.get(job.job_id, ()):
+            queue.put_nowait(snapshot)
+
+    def _update_status(self, job: BatchJob):
+        states = {item.status for item in job.items}
+        if states <= FINISHED_STATES:
+            job.status = "completed"
+        elif states & (FINISHED_STATES | {"running", "retrying"}):
+            job.status = "running"
+        else:
+            job.status = "queued"
+
+    def _prune_jobs(self):
+        """Forget the oldest completed jobs beyond max_jobs"""
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            if self.jobs[job_id].status == "completed":
+                del self.jobs[job_id]
+
+
+# Singleton instance (workers started by the application lifespan)
+batch_summarizer = BatchSummarizer()
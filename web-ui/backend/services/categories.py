@@ -0,0 +1,61 @@
+import re
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from ..config import settings
+
+# Category names become folder names, so keep them to one path component
+NAME_RE = re.compile(r"[a-z0-9][a-z0-9_-]*")
+
+
+@dataclass(frozen=True)
+class Category:
+    name: str
+    description: str
+
+
+class CategoryRegistry:
+    """Summary categories, in display order, loaded from configuration.
+
+    Each category is a knowledge base subfolder. The registry is the one
+    place the folder names, their prompt descriptions and the fallback for
+    unrecognized classifications are defined.
+    """
+
+    def __init__(self, spec: str = settings.SUMMARY_CATEGORIES, default: str = settings.SUMMARY_DEFAULT_CATEGORY):
+        self._categories: dict[str, Category] = {}
+        for entry in spec.split(";"):
+            name, _, description = entry.partition(":")
+            name = name.strip().lower()
+            if not name:
+                continue
+            if not NAME_RE.fullmatch(name):
+                raise ValueError(f"Invalid category name {name!r} in SUMMARY_CATEGORIES")
+            self._categories[name] = Category(name, description.strip())
+        if not self._categories:
+            raise ValueError("SUMMARY_CATEGORIES defines no categories")
+        # Fall back to the last category when the configured default is missing
+        self.default = default if default in self._categories else list(self._categories)[-1]
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._categories)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._categories
+
+    def __iter__(self) -> Iterator[Category]:
+        return iter(self._categories.values())
+
+    def normalize(self, value: Optional[str]) -> str:
+        """Category named by an LLM answer (eg. "**Tech**"), or the default"""
+        name = (value or "").strip().strip("*`'\".").strip().lower()
+        return name if name in self._categories else self.default
+
+    def prompt_list(self) -> str:
+        """Markdown list of the categories for the summarize prompt"""
+        return "\n".join(f"   - **{c.name}** — {c.description}" for c in self)
+
+
+# Singleton instance
+category_registry = CategoryRegistry()
@@ -0,0 +1,171 @@
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+
+from ..config import settings
+
+
+class ConversationStore:
+    """Chat histories persisted in SQLite with an in-memory LRU of hot sessions.
+
+    Every turn is written through to the database, so a conversation can be
+    resumed by ID after a disconnect or restart. Memory is bounded by the
+    number of cached conversations and their total serialized size, and
+    conversations idle for longer than `idle_timeout` leave the cache
+    (they are reloaded from disk on the next turn).
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path = settings.CONVERSATION_DB_PATH,
+        max_cached: int = settings.CONVERSATION_CACHE_SIZE,
+        max_cached_bytes: int = settings.CONVERSATION_CACHE_MAX_BYTES,
+        idle_timeout: float = settings.CONVERSATION_IDLE_TIMEOUT,
+        retention_days: float = settings.CONVERSATION_RETENTION_DAYS,
+    ):
+        self.db_path = Path(db_path)
+        self.max_cached = max_cached
+        self.max_cached_bytes = max_cached_bytes
+        self.idle_timeout = idle_timeout
+        self.retention_days = retention_days
+        # conversation_id -> (history, serialized size, last used)
+        self._cache: OrderedDict[str, tuple[list[BaseMessage], int, float]] = OrderedDict()
+        self._cached_bytes = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._sweep_task: Optional[asyncio.Task] = None
+
+    @property
+    def cached_count(self) -> int:
+        return len(self._cache)
+
+    @property
+    def cached_bytes(self) -> int:
+        return self._cached_bytes
+
+    async def start(self):
+        """Open the database, drop expired conversations and start idle eviction"""
+        await asyncio.to_thread(self._connect)
+        if self.retention_days > 0:
+            await asyncio.to_thread(self._delete_older_than, time.time() - self.retention_days * 86400)
+        if self.idle_timeout > 0 and self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._sweep())
+
+    async def close(self):
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._sweep_task = None
+        self._cache.clear()
+        self._cached_bytes = 0
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    async def load(self, conversation_id: str) -> Optional[list[BaseMessage]]:
+        """History of a conversation, or None if it does not exist"""
+        entry = self._cache.get(conversation_id)
+        if entry is not None:
+            history, size, _ = entry
+            self._cache[conversation_id] = (history, size, time.monotonic())
+            self._cache.move_to_end(conversation_id)
+            return history
+        row = await asyncio.to_thread(self._select, conversation_id)
+        if row is None:
+            return None
+        history = messages_from_dict(json.loads(row))
+        self._remember(conversation_id, history, len(row))
+        return history
+
+    async def save(self, conversation_id: str, history: list[BaseMessage]):
+        """Persist a conversation and keep it hot in the cache"""
+        data = json.dumps(messages_to_dict(history), ensure_ascii=False)
+        await asyncio.to_thread(self._upsert, conversation_id, data)
+        self._remember(conversation_id, history, len(data))
+
+    async def delete(self, conversation_id: str):
+        self._forget(conversation_id)
+        await asyncio.to_thread(self._execute, "DELETE FROM conversations WHERE id = ?", (conversation_id,))
+
+    def evict_idle(self):
+        """Drop cached conversations not used within the idle timeout"""
+        cutoff = time.monotonic() - self.idle_timeout
+        for conversation_id in [cid for cid, (_, _, used) in self._cache.items() if used < cutoff]:
+            self._forget(conversation_id)
+
+    def _remember(self, conversation_id: str, history: list[BaseMessage], size: int):
+        self._forget(conversation_id)
+        self._cache[conversation_id] = (history, size, time.monotonic())
+        self._cached_bytes += size
+        while self._cache and (
+            len(self._cache) > self.max_cached or self._cached_bytes > self.max_cached_bytes
+        ):
+            _, (_, evicted_size, _) = self._cache.popitem(last=False)
+            self._cached_bytes -= evicted_size
+
+    def _forget(self, conversation_id: str):
+        entry = self._cache.pop(conversation_id, None)
+        if entry is not None:
+            self._cached_bytes -= entry[1]
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(min(self.idle_timeout, 60))
+            self.evict_idle()
+
+    # SQLite access (run in worker threads)
+
+    def _connect(self):
+        if self._db is not None:
+            return
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.db_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            """CREATE TABLE IF NOT EXISTS conversations (
+                id TEXT PRIMARY KEY,
+                messages TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS conversations_updated ON conversations (updated_at)")
+        db.commit()
+        self._db = db
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[tuple]:
+        self._connect()
+        with self._db_lock:
+            rows = self._db.execute(sql, params).fetchall()
+            self._db.commit()
+        return rows
+
+    def _select(self, conversation_id: str) -> Optional[str]:
+        rows = self._execute("SELECT messages FROM conversations WHERE id = ?", (conversation_id,))
+        return rows[0][0] if rows else None
+
+    def _upsert(self, conversation_id: str, data: str):
+        now = time.time()
+        self._execute(
+            """INSERT INTO conversations (id, messages, created_at, updated_at) VALUES (?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET messages = excluded.messages, updated_at = excluded.updated_at""",
+            (conversation_id, data, now, now),
+        )
+
+    def _delete_older_than(self, timestamp: float):
+        self._execute("DELETE FROM conversations WHERE updated_at < ?", (timestamp,))
+
+
+# Singleton instance (opened by the application lifespan)
+conversation_store = ConversationStore()
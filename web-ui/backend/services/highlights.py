@@ -0,0 +1,228 @@
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from ..config import settings
+from ..models.schemas import Highlight
+
+SIDECAR_SUFFIX = ".highlights.json"
+
+
+class HighlightStore:
+    """Highlights of all summaries in one SQLite database.
+
+    Each highlight is a row keyed by the summary's path relative to the
+    knowledge base (summaries with the same filename in different category
+    folders have separate highlights), so single highlights
+    can be added or removed without rewriting the rest, a full replacement
+    is one transaction, and tags can be queried across summaries. Writes
+    from several processes are serialized by SQLite (WAL mode with a busy
+    timeout).
+    """
+
+    def __init__(self, db_path: str | Path = settings.HIGHLIGHTS_DB_PATH):
+        self.db_path = Path(db_path)
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    async def start(self):
+        await asyncio.to_thread(self._connect)
+
+    async def close(self):
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+    async def for_summary(self, path: str) -> list[Highlight]:
+        """Highlights of one summary, in document order"""
+        return await asyncio.to_thread(
+            self._query, "WHERE h.path = ? ORDER BY h.offset, h.id", (path,)
+        )
+
+    async def find(self, tag: Optional[str] = None, color: Optional[str] = None) -> list[Highlight]:
+        """Highlights across all summaries, optionally with a tag and/or color"""
+        clauses, params = [], []
+        if tag:
+            clauses.append("h.id IN (SELECT highlight_id FROM highlight_tags WHERE tag = ?)")
+            params.append(tag)
+        if color:
+            clauses.append("h.color = ?")
+            params.append(color)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return await asyncio.to_thread(
+            self._query, f"{where} ORDER BY h.created_at DESC, h.id DESC", tuple(params)
+        )
+
+    async def add(self, path: str, highlight: Highlight) -> Highlight:
+        """Add one highlight and return it with its ID"""
+        return await asyncio.to_thread(self._add, path, highlight)
+
+    async def remove(self, path: str, highlight_id: int) -> bool:
+        """Delete one highlight; False if it does not exist"""
+        return await asyncio.to_thread(self._remove, path, highlight_id)
+
+    async def replace(self, path: str, highlights: list[Highlight]) -> list[Highlight]:
+        """Atomically replace all highlights of a summary"""
+        return await asyncio.to_thread(self._replace, path, highlights)
+
+    async def migrate(self, base_path: Path) -> int:
+        """Bring highlights from older versions into the database.
+
+        Rows keyed by bare filename are re-keyed by the path of the summary
+        with that name, and legacy .highlights.json sidecar files are
+        imported. Imported sidecars are recorded in the database and left
+        in place, so this is safe to run on every start (on a read-only
+        knowledge base too). Returns the number of sidecars imported.
+        """
+        return await asyncio.to_thread(self._migrate, base_path)
+
+    # SQLite access (run in worker threads)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is not None:
+            return self._db
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA foreign_keys=ON")
+        db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS highlights (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT NOT NULL,
+                text TEXT NOT NULL,
+                color TEXT NOT NULL,
+                offset INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            );
+            """
+        )
+        if "filename" in [row[1] for row in db.execute("PRAGMA table_info(highlights)")]:
+            # Databases from before highlights were keyed by path (migrate() re-keys the rows)
+            db.execute("DROP INDEX IF EXISTS highlights_filename")
+            db.execute("ALTER TABLE highlights RENAME COLUMN filename TO path")
+        db.executescript(
+            """
+            CREATE INDEX IF NOT EXISTS highlights_path ON highlights (path, offset);
+            CREATE TABLE IF NOT EXISTS imported_sidecars (
+                path TEXT PRIMARY KEY,
+                imported_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS highlight_tags (
+                highlight_id INTEGER NOT NULL REFERENCES highlights (id) ON DELETE CASCADE,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (highlight_id, tag)
+            );
+            CREATE INDEX IF NOT EXISTS highlight_tags_tag ON highlight_tags (tag);
+            """
+        )
+        self._db = db
+        return db
+
+    def _query(self, condition: str, params: tuple) -> list[Highlight]:
+        db = self._connect()
+        with self._lock:
+            rows = db.execute(
+                f"""SELECT h.id, h.path, h.text, h.color, h.offset, h.created_at,
+                           (SELECT json_group_array(tag) FROM highlight_tags WHERE highlight_id = h.id)
+                    FROM highlights h {condition}""",
+                params,
+            ).fetchall()
+        return [
+            Highlight(
+                id=row[0],
+                filename=Path(row[1]).name,
+                path=row[1],
+                text=row[2],
+                color=row[3],
+                offset=row[4],
+                created_at=datetime.fromtimestamp(row[5]),
+                tags=json.loads(row[6]),
+            )
+            for row in rows
+        ]
+
+    def _insert(self, db: sqlite3.Connection, path: str, highlight: Highlight) -> Highlight:
+        created_at = highlight.created_at.timestamp() if highlight.created_at else time.time()
+        cursor = db.execute(
+            "INSERT INTO highlights (path, text, color, offset, created_at) VALUES (?, ?, ?, ?, ?)",
+            (path, highlight.text, highlight.color, highlight.offset, created_at),
+        )
+        tags = list(dict.fromkeys(highlight.tags))
+        db.executemany(
+            "INSERT INTO highlight_tags (highlight_id, tag) VALUES (?, ?)",
+            [(cursor.lastrowid, tag) for tag in tags],
+        )
+        return highlight.model_copy(
+            update={
+                "id": cursor.lastrowid,
+                "filename": Path(path).name,
+                "path": path,
+                "tags": tags,
+                "created_at": datetime.fromtimestamp(created_at),
+            }
+        )
+
+    def _add(self, path: str, highlight: Highlight) -> Highlight:
+        db = self._connect()
+        with self._lock, db:
+            return self._insert(db, path, highlight)
+
+    def _remove(self, path: str, highlight_id: int) -> bool:
+        db = self._connect()
+        with self._lock, db:
+            cursor = db.execute("DELETE FROM highlights WHERE id = ? AND path = ?", (highlight_id, path))
+        return cursor.rowcount > 0
+
+    def _replace(self, path: str, highlights: list[Highlight]) -> list[Highlight]:
+        db = self._connect()
+        with self._lock, db:
+            db.execute("DELETE FROM highlights WHERE path = ?", (path,))
+            return [self._insert(db, path, highlight) for highlight in highlights]
+
+    def _migrate(self, base_path: Path) -> int:
+        db = self._connect()
+        with self._lock:
+            rows = db.execute("SELECT DISTINCT path FROM highlights WHERE path NOT LIKE '%/%'")
+            names = [row[0] for row in rows]
+        for name in names:
+            found = sorted(base_path.glob(f"**/{name}"))
+            path = found[0].relative_to(base_path).as_posix() if found else name
+            if path != name:
+                with self._lock, db:
+                    db.execute("UPDATE highlights SET path = ? WHERE path = ?", (path, name))
+
+        imported = 0
+        for sidecar in sorted(base_path.glob(f"**/*{SIDECAR_SUFFIX}")):
+            sidecar_path = sidecar.relative_to(base_path).as_posix()
+            path = sidecar_path[: -len(SIDECAR_SUFFIX)] + ".md"
+            with self._lock:
+                done = db.execute(
+                    "SELECT 1 FROM imported_sidecars WHERE path = ?", (sidecar_path,)
+                ).fetchone()
+            if done is not None:
+                continue
+            try:
+                data = json.loads(sidecar.read_text(encoding="utf-8"))
+                highlights = [Highlight(**item) for item in data]
+            except (OSError, ValueError, TypeError):
+                continue
+            with self._lock, db:
+                # A summary that already has rows was migrated (or edited) before
+                existing = db.execute("SELECT 1 FROM highlights WHERE path = ? LIMIT 1", (path,)).fetchone()
+                if existing is None:
+                    for highlight in highlights:
+                        self._insert(db, path, highlight)
+                db.execute("INSERT INTO imported_sidecars VALUES (?, ?)", (sidecar_path, time.time()))
+            imported += 1
+        return imported
+
+
+# Singleton instance (opened by the application lifespan)
+highlight_store = HighlightStore()
@@ -0,0 +1,165 @@
+import json
+from typing import Optional
+
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+    convert_to_messages,
+)
+
+from ..config import settings
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("o200k_base")
+except Exception:  # pragma: no cover - tiktoken missing or offline
+    _encoding = None
+
+TRUNCATION_NOTE = "[Tool output truncated; call the tool again for the full result]"
+
+# ID of the system message that carries the rolling summary of older turns
+SUMMARY_MESSAGE_ID = "conversation-summary"
+
+SUMMARY_PROMPT = """Summarize the earlier part of a conversation between a user and an assistant that helps them explore YouTube video summaries.
+
+Keep facts, names, file names, numbers, decisions and open questions that later turns might rely on. Write compact prose, no more than 300 words.
+
+{previous}Conversation:
+{transcript}"""
+
+# Process-wide counters (all conversations)
+history_stats = {
+    "compactions": 0,
+    "summaries": 0,
+    "tool_outputs_truncated": 0,
+    "turns_dropped": 0,
+    "tokens_before": 0,
+    "tokens_after": 0,
+    "tokens_saved": 0,
+}
+
+
+def count_tokens(text: str) -> int:
+    """Token count of a string (approximate when tiktoken is unavailable)"""
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+
+def message_tokens(message: BaseMessage) -> int:
+    """Approximate prompt tokens of one message, including tool calls"""
+    content = message.content
+    if not isinstance(content, str):
+        content = json.dumps(content)
+    tokens = 4 + count_tokens(content)  # Per-message overhead
+    for tool_call in getattr(message, "tool_calls", None) or ():
+        tokens += count_tokens(tool_call["name"]) + count_tokens(json.dumps(tool_call["args"]))
+    return tokens
+
+
+class HistoryManager:
+    """Keeps a conversation history within a token budget.
+
+    Before each turn, tool outputs from older turns are cut down to a
+    short excerpt, and when the history is still over budget the oldest
+    turns are folded into a rolling summary (or dropped, without a model).
+    Message structure is preserved, so tool calls stay paired with their
+    results.
+    """
+
+    def __init__(
+        self,
+        llm=None,
+        token_budget: int = settings.CHAT_HISTORY_TOKEN_BUDGET,
+        keep_turns: int = settings.CHAT_HISTORY_KEEP_TURNS,
+        tool_output_max_tokens: int = settings.CHAT_TOOL_OUTPUT_MAX_TOKENS,
+    ):
+        self.llm = llm
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.tool_output_max_tokens = tool_output_max_tokens
+
+    async def compact(self, history: list) -> list[BaseMessage]:
+        """Compact a history in place and return it.
+
+        The last message is the new user message and is always kept.
+        """
+        history[:] = convert_to_messages(history)
+        before = sum(message_tokens(m) for m in history)
+        history_stats["compactions"] += 1
+
+        summary, turns = self._split_turns(history)
+        # Tool outputs are only needed in full for the latest completed turn
+        for turn in turns[:-2]:
+            self._truncate_tool_outputs(turn)
+
+        if self._total(summary, turns) > self.token_budget and len(turns) > self.keep_turns + 1:
+            old, turns = turns[: -(self.keep_turns + 1)], turns[-(self.keep_turns + 1):]
+            summary = await self._summarize(summary, old)
+            history_stats["turns_dropped"] += len(old)
+
+        if self._total(summary, turns) > self.token_budget:
+            for turn in turns[:-1]:
+                self._truncate_tool_outputs(turn)
+        while self._total(summary, turns) > self.token_budget and len(turns) > 1:
+            turns.pop(0)
+            history_stats["turns_dropped"] += 1
+
+        history[:] = ([summary] if summary is not None else []) + [m for t in turns for m in t]
+        after = sum(message_tokens(m) for m in history)
+        history_stats["tokens_before"] += before
+        history_stats["tokens_after"] += after
+        history_stats["tokens_saved"] += max(0, before - after)
+        return history
+
+    def _split_turns(self, history: list[BaseMessage]) -> tuple[Optional[SystemMessage], list[list[BaseMessage]]]:
+        """Separate the rolling summary and group messages into turns"""
+        summary = None
+        turns: list[list[BaseMessage]] = []
+        for message in history:
+            if message.id == SUMMARY_MESSAGE_ID:
+                summary = message
+            elif isinstance(message, HumanMessage) or not turns:
+                turns.append([message])
+            else:
+                turns[-1].append(message)
+        return summary, turns
+
+    def _total(self, summary: Optional[SystemMessage], turns: list[list[BaseMessage]]) -> int:
+        total = message_tokens(summary) if summary is not None else 0
+        return total + sum(message_tokens(m) for turn in turns for m in turn)
+
+    def _truncate_tool_outputs(self, turn: list[BaseMessage]):
+        """Replace long tool results with a short excerpt (keeping tool_call_id)"""
+        limit = self.tool_output_max_tokens
+        for i, message in enumerate(turn):
+            if not isinstance(message, ToolMessage) or not isinstance(message.content, str):
+                continue
+            if message.content.endswith(TRUNCATION_NOTE) or count_tokens(message.content) <= limit:
+                continue
+            excerpt = message.content[: limit * 4]
+            turn[i] = message.model_copy(update={"content": f"{excerpt}\n{TRUNCATION_NOTE}"})
+            history_stats["tool_outputs_truncated"] += 1
+
+    async def _summarize(
+        self, summary: Optional[SystemMessage], turns: list[list[BaseMessage]]
+    ) -> Optional[SystemMessage]:
+        """Fold turns into the rolling summary; without a model they are dropped"""
+        if self.llm is None:
+            return summary
+        lines = []
+        for message in (m for turn in turns for m in turn):
+            content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+            if content:
+                lines.append(f"{message.type}: {content}")
+        previous = f"Summary so far:\n{summary.content}\n\n" if summary is not None else ""
+        prompt = SUMMARY_PROMPT.format(previous=previous, transcript="\n".join(lines))
+        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+        history_stats["summaries"] += 1
+        return SystemMessage(
+            content=f"Summary of the earlier conversation:\n{response.content}",
+            id=SUMMARY_MESSAGE_ID,
+        )
@@ -1,68 +1,383 @@
+import os
 import json
+import time
+import base64
+import hashlib
+import asyncio
 import aiofiles
+from bisect import bisect_left, bisect_right, insort
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 
-from ..config import settings
-from ..models.schemas import SummaryMetadata, SummaryDetail
-
-VALID_CATEGORIES = {"tech", "science", "business", "culture", "general"}
+try:
+    # Installed with uvicorn[standard]; falls back to periodic mtime scans
+    from watchfiles import awatch, Change
+except ImportError:  # pragma: no cover
+    awatch = None
+    Change = None
 
+from ..config import settings
+from ..models.schemas import SummaryMetadata, SummaryDetail, RetrievedPassage, Highlight
+from .categories import category_registry
+from .highlights import highlight_store
+from .summary_cache import summary_manifest
+from .metrics import span
+from .search_index import SearchIndex
+from .retrieval import RetrievalIndex
 
 class KnowledgeBaseService:
-    """Service for reading and searching the knowledge base"""
+    """Service for reading and searching the knowledge base.
+
+    Summary metadata is kept in an in-process index keyed by path and
+    (mtime, size), alongside a full-text search index and newest-first
+    sort orders (overall and per category) used for paging. Only new or
+    changed files are re-read; a directory watcher (or, without one, a
+    throttled mtime scan) keeps everything current.
+    """
 
     def __init__(self):
-        self.base_path = Path(settings.KNOWLEDGE_BASE_PATH)
+        self.base_path = Path(settings.KNOWLEDGE_BASE_PATH).resolve()
+        self.refresh_interval = settings.KB_INDEX_REFRESH_INTERVAL
+        # path -> ((mtime_ns, size), metadata)
+        self._index: dict[Path, tuple[tuple[int, int], SummaryMetadata]] = {}
+        # Sorted (-mtime_ns, path) keys: newest first, ties broken by path
+        self._order: list[tuple[int, str]] = []
+        self._order_by_category: dict[Optional[str], list[tuple[int, str]]] = {}
+        # filename -> path, so lookups by name need no filesystem probing
+        self._by_name: dict[str, Path] = {}
+        self.search_index = SearchIndex()
+        self.retrieval_index = RetrievalIndex(
+            index_dir=settings.RETRIEVAL_INDEX_DIR or None,
+            chunk_chars=settings.RETRIEVAL_CHUNK_CHARS,
+            ann_min_size=settings.RETRIEVAL_ANN_MIN_SIZE,
+            nprobe=settings.RETRIEVAL_NPROBE,
+        )
+        self._lock = asyncio.Lock()
+        self._last_scan = 0.0
+        self._dirty = True
+        self._watching = False
+        self._watch_task: Optional[asyncio.Task] = None
+        # Bumped on every index change; with the instance ID it versions
+        # list/search responses for HTTP caching
+        self.version = 0
+        self._instance_id = f"{time.time_ns():x}"
+        self._content_version: Optional[tuple[int, str]] = None  # (version, hash)
 
     async def list_all(self) -> list[SummaryMetadata]:
         """List all markdown files in knowledge base (including subfolders)"""
-        summaries = []
-        for file_path in self.base_path.glob("**/*.md"):
-            meta = await self._extract_metadata(file_path)
-            summaries.append(meta)
-        # Sort by modified date, newest first
-        return sorted(summaries, key=lambda x: x.modified_date, reverse=True)
-
-    async def search(self, query: str) -> list[SummaryMetadata]:
-        """Search summaries by title or content"""
-        query_lower = query.lower()
-        results = []
-        for file_path in self.base_path.glob("**/*.md"):
-            async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
-                content = await f.read()
-            # Search in filename and content
-            if query_lower in file_path.stem.lower() or query_lower in content.lower():
-                meta = await self._extract_metadata(file_path, content)
+        await self.refresh()
+        # Already sorted by modified date, newest first
+        return [self._index[Path(key[1])][1] for key in self._order]
+
+    async def list_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        category: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+    ) -> tuple[list[SummaryMetadata], int, Optional[str]]:
+        """Return one page of summaries, newest first.
+
+        Pages are sliced straight out of the maintained sort order, so no
+        request sorts or materializes the whole collection. Returns the
+        page, the total number of matching summaries and the cursor for
+        the next page (None on the last page).
+        """
+        await self.refresh()
+        order = self._order if category is None else self._order_by_category.get(category, [])
+
+        lo, hi = 0, len(order)
+        if date_to is not None:
+            lo = bisect_left(order, (-_timestamp_ns(date_to), ""))
+        if date_from is not None:
+            hi = bisect_left(order, (-_timestamp_ns(date_from) + 1, ""))
+        total = max(0, hi - lo)
+
+        start = lo
+        if cursor:
+            start = max(start, bisect_right(order, self._decode_cursor(cursor)))
+        keys = order[start:min(start + limit, hi)]
+        page = [self._index[Path(key[1])][1] for key in keys]
+
+        next_cursor = None
+        if keys and start + len(keys) < hi:
+            next_cursor = self._encode_cursor(keys[-1])
+        return page, total, next_cursor
+
+    def _encode_cursor(self, key: tuple[int, str]) -> str:
+        rel_path = Path(key[1]).relative_to(self.base_path).as_posix()
+        raw = json.dumps([-key[0], rel_path]).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    def _decode_cursor(self, cursor: str) -> tuple[int, str]:
+        try:
+            mtime_ns, rel_path = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return (-int(mtime_ns), str(self.base_path / rel_path))
+        except (ValueError, TypeError) as e:
+            raise ValueError("Invalid cursor") from e
+
+    async def refresh(self, force: bool = False):
+        """Bring the index up to date with the filesystem.
+
+        While the watcher is running this is a no-op unless it reported a
+        change; otherwise a full mtime scan runs at most once per
+        refresh interval.
+        """
+        if not (force or self._needs_scan()):
+            return
+        async with self._lock:
+            if not (force or self._needs_scan()):
+                return  # Another caller refreshed while we waited
+            with span("kb.scan"):
+                seen = set()
+                for file_path in self.base_path.glob("**/*.md"):
+                    seen.add(file_path)
+                    await self._refresh_file(file_path)
+                for file_path in set(self._index) - seen:
+                    self._remove_entry(file_path)
+                self.retrieval_index.retain({str(p) for p in self._index})
+                self._last_scan = time.monotonic()
+                self._dirty = False
+
+    def invalidate(self):
+        """Mark the index stale so the next read rescans the filesystem"""
+        self._dirty = True
+
+    def _needs_scan(self) -> bool:
+        if self._dirty:
+            return True
+        if self._watching:
+            return False
+        return time.monotonic() - self._last_scan >= self.refresh_interval
+
+    async def start_watching(self):
+        """Start the background directory watcher, if available"""
+        if awatch is None or self._watch_task is not None:
+            return
+        await self.refresh(force=True)
+        self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop_watching(self):
+        """Stop the background directory watcher"""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+        self._watching = False
+
+    async def _watch(self):
+        """Apply filesystem change events to the index incrementally"""
+        try:
+            self._watching = True
+            async for changes in awatch(self.base_path):
+                async with self._lock:
+                    for change, raw_path in changes:
+                        file_path = Path(raw_path)
+                        if file_path.suffix != ".md":
+                            if change == Change.deleted:
+                                # A removed folder takes its files with it
+                                self._dirty = True
+                            continue
+                        if change == Change.deleted or not file_path.exists():
+                            self._remove_entry(file_path)
+                        else:
+                            await self._refresh_file(file_path)
+        finally:
+            self._watching = False
+            self._dirty = True
+
+    async def _refresh_file(self, file_path: Path):
+        """Re-read a file only if its (mtime, size) changed since indexing"""
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            self._remove_entry(file_path)
+            return
+        key = (stat.st_mtime_ns, stat.st_size)
+        entry = self._index.get(file_path)
+        if entry is not None and entry[0] == key:
+            return
+        async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
+            content = await f.read()
+        meta = await self._extract_metadata(file_path, content)
+        if entry is not None:
+            self._unorder(file_path, entry[0], entry[1].category)
+        self._index[file_path] = (key, meta)
+        self._by_name.setdefault(file_path.name, file_path)
+        self.search_index.add(file_path, f"{file_path.stem} {meta.title}", content)
+        self.retrieval_index.add(str(file_path), meta.title, content)
+        order_key = (-key[0], str(file_path))
+        insort(self._order, order_key)
+        insort(self._order_by_category.setdefault(meta.category, []), order_key)
+        self.version += 1
+
+    def _remove_entry(self, file_path: Path):
+        """Drop a file from the index"""
+        entry = self._index.pop(file_path, None)
+        if entry is not None:
+            self.search_index.remove(file_path)
+            self.retrieval_index.remove(str(file_path))
+            self._unorder(file_path, entry[0], entry[1].category)
+            if self._by_name.get(file_path.name) == file_path:
+                del self._by_name[file_path.name]
+                # Another folder may hold a file of the same name
+                for other in self._index:
+                    if other.name == file_path.name:
+                        self._by_name[other.name] = other
+                        break
+            self.version += 1
+
+    def _unorder(self, file_path: Path, key: tuple[int, int], category: Optional[str]):
+        """Remove a file's key from the sort orders"""
+        order_key = (-key[0], str(file_path))
+        for order in (self._order, self._order_by_category.get(category, [])):
+            i = bisect_left(order, order_key)
+            if i < len(order) and order[i] == order_key:
+                del order[i]
+
+    async def search(self, query: str, limit: int = 50) -> list[SummaryMetadata]:
+        """Search summaries by title, headings and content, best match first"""
+        await self.refresh()
+        with span("kb.search"):
+            results = []
+            for hit in self.search_index.search(query, limit):
+                entry = self._index.get(hit.key)
+                snippet = self.search_index.snippet(hit.key, hit.position)
+                if entry is None or snippet is None:
+                    continue
+                meta = entry[1].model_copy(update={"snippet": snippet, "score": hit.score})
                 results.append(meta)
-        return sorted(results, key=lambda x: x.modified_date, reverse=True)
+        return results
+
+    async def retrieve(self, query: str, k: int = 5) -> list[RetrievedPassage]:
+        """Passages of summaries most similar to a query (semantic search)"""
+        await self.refresh()
+        with span("kb.retrieve"):
+            passages = []
+            for chunk in await self.retrieval_index.search(query, k):
+                entry = self._index.get(Path(chunk.key))
+                if entry is None:
+                    continue
+                meta = entry[1]
+                passages.append(
+                    RetrievedPassage(
+                        filename=meta.filename,
+                        title=meta.title,
+                        category=meta.category,
+                        heading=chunk.heading,
+                        text=chunk.text,
+                        score=chunk.score,
+                    )
+                )
+        return passages
+
+    async def write_summary(self, category: str, filename: str, content: str) -> Path:
+        """Write a summary into a category folder and index it immediately.
+
+        The filename is reduced to its final component and must end in .md,
+        so writes cannot escape the knowledge base folder.
+        """
+        if category not in category_registry:
+            raise ValueError(
+                f"Unknown category {category!r}; use one of {', '.join(category_registry.names)}"
+            )
+        file_path = self._resolve(Path(category) / Path(filename).name)
+        if file_path.suffix != ".md":
+            raise ValueError("Summary filenames must end in .md")
+
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = file_path.with_name(f".{file_path.name}.tmp")
+        async with aiofiles.open(tmp_path, "w", encoding="utf-8") as f:
+            await f.write(content)
+        os.replace(tmp_path, file_path)
+
+        async with self._lock:
+            await self._refresh_file(file_path)
+        return file_path
+
+    def _resolve(self, relative_path: Path) -> Path:
+        """Resolve a path inside the knowledge base, rejecting escapes"""
+        base = self.base_path.resolve()
+        file_path = (base / relative_path).resolve()
+        if not file_path.is_relative_to(base):
+            raise ValueError("Path is outside the knowledge base")
+        return file_path
+
+    def has_video(self, video_id: str) -> bool:
+        """Whether the summary manifest maps the video to an indexed summary.
+
+        Filenames are title-based, so the manifest is the only reliable
+        record of which videos have been summarized (with any prompt).
+        """
+        entry = summary_manifest.get(video_id)
+        return entry is not None and self.base_path / entry.summary_path in self._index
+
+    @property
+    def index_version(self) -> str:
+        """Identifies the current index contents (changes whenever a summary does)"""
+        return f"{self._instance_id}-{self.version}"
+
+    @property
+    def content_version(self) -> str:
+        """Hash of the indexed files and their (mtime, size).
+
+        Unlike index_version it stays the same across restarts while the
+        files are unchanged, so persisted caches can be validated against it.
+        """
+        if self._content_version is None or self._content_version[0] != self.version:
+            digest = hashlib.sha1()
+            for path, (key, _) in sorted(self._index.items()):
+                digest.update(f"{path}\0{key[0]}\0{key[1]}\n".encode("utf-8"))
+            self._content_version = (self.version, digest.hexdigest()[:16])
+        return self._content_version[1]
+
+    async def stat_summary(self, filename: str) -> Optional[os.stat_result]:
+        """File status of a summary (for cache validators), or None if missing"""
+        file_path = await self._find_md_file(filename)
+        if not file_path:
+            return None
+        try:
+            return file_path.stat()
+        except FileNotFoundError:
+            return None
 
     async def get_by_filename(self, filename: str) -> Optional[SummaryDetail]:
         """Get full summary by filename (searches across all category subfolders)"""
-        file_path = self._find_md_file(filename)
+        file_path = await self._find_md_file(filename)
         if not file_path:
             return None
 
-        async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
-            content = await f.read()
+        with span("kb.read"):
+            try:
+                async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
+                    content = await f.read()
+            except FileNotFoundError:
+                return None  # Deleted since the index last saw it
 
-        category = self._get_category(file_path)
+        entry = self._index.get(file_path)
+        if entry is None:
+            return None
+        meta = entry[1]
         return SummaryDetail(
             filename=file_path.name,
             title=self._extract_title(content),
             content=content,
-            modified_date=datetime.fromtimestamp(file_path.stat().st_mtime),
-            category=category,
+            modified_date=meta.modified_date,
+            category=meta.category,
         )
 
-    def list_categories(self) -> list[str]:
-        """Return available category folders"""
-        categories = []
-        for d in self.base_path.iterdir():
-            if d.is_dir() and d.name in VALID_CATEGORIES:
-                categories.append(d.name)
-        return sorted(categories)
+    async def list_categories(self) -> list[tuple[str, int]]:
+        """Configured categories in display order, with their summary counts"""
+        await self.refresh()
+        return [
+            (name, len(self._order_by_category.get(name, [])))
+            for name in category_registry.names
+        ]
 
     async def _extract_metadata(
         self, file_path: Path, content: Optional[str] = None
@@ -91,51 +406,53 @@ class KnowledgeBaseService:
     def _get_category(self, file_path: Path) -> Optional[str]:
         """Derive category from the file's parent folder name"""
         parent = file_path.parent.name
-        if parent in VALID_CATEGORIES:
+        if parent in category_registry:
             return parent
         return None
 
-    def _find_md_file(self, filename: str) -> Optional[Path]:
-        """Find a markdown file by filename across root and category subfolders"""
-        safe_filename = Path(filename).name
-        candidates = [self.base_path / safe_filename]
-        for category in VALID_CATEGORIES:
-            candidates.append(self.base_path / category / safe_filename)
-        for file_path in candidates:
-            if file_path.exists() and file_path.suffix == ".md":
-                return file_path
-        return None
+    async def _find_md_file(self, filename: str) -> Optional[Path]:
+        """Find an indexed markdown file by path relative to the knowledge
+        base, or by filename in any folder"""
+        await self.refresh()
+        file_path = self.base_path / filename
+        if file_path in self._index:
+            return file_path
+        return self._by_name.get(Path(filename).name)
 
-    def _highlights_path(self, md_path: Path) -> Path:
-        """Get the highlights JSON path for a given markdown file"""
-        return md_path.with_suffix(".highlights.json")
+    async def _highlights_key(self, filename: str) -> Optional[str]:
+        """Highlight store key (relative path) of a summary, None if it does not exist"""
+        file_path = await self._find_md_file(filename)
+        if file_path is None:
+            return None
+        return file_path.relative_to(self.base_path).as_posix()
 
-    async def get_highlights(self, filename: str) -> list[dict]:
+    async def get_highlights(self, filename: str) -> list[Highlight]:
         """Load highlights for a summary file"""
-        md_path = self._find_md_file(filename)
-        if not md_path:
+        key = await self._highlights_key(filename)
+        if key is None:
             return []
-        hl_path = self._highlights_path(md_path)
-        if not hl_path.exists():
-            return []
-        async with aiofiles.open(hl_path, "r", encoding="utf-8") as f:
-            data = await f.read()
-        return json.loads(data)
-
-    async def save_highlights(self, filename: str, highlights: list[dict]) -> bool:
-        """Save highlights for a summary file"""
-        md_path = self._find_md_file(filename)
-        if not md_path:
+        return await highlight_store.for_summary(key)
+
+    async def save_highlights(self, filename: str, highlights: list[Highlight]) -> Optional[list[Highlight]]:
+        """Replace all highlights of a summary file (None if it does not exist)"""
+        key = await self._highlights_key(filename)
+        if key is None:
+            return None
+        return await highlight_store.replace(key, highlights)
+
+    async def add_highlight(self, filename: str, highlight: Highlight) -> Optional[Highlight]:
+        """Add one highlight to a summary file (None if it does not exist)"""
+        key = await self._highlights_key(filename)
+        if key is None:
+            return None
+        return await highlight_store.add(key, highlight)
+
+    async def remove_highlight(self, filename: str, highlight_id: int) -> bool:
+        """Delete one highlight of a summary file"""
+        key = await self._highlights_key(filename)
+        if key is None:
             return False
-        hl_path = self._highlights_path(md_path)
-        if not highlights:
-            # Remove file if no highlights
-            if hl_path.exists():
-                hl_path.unlink()
-            return True
-        async with aiofiles.open(hl_path, "w", encoding="utf-8") as f:
-            await f.write(json.dumps(highlights, indent=2))
-        return True
+        return await highlight_store.remove(key, highlight_id)
 
     def _extract_title(self, content: str) -> str:
         """Extract title from H1 heading"""
@@ -146,5 +463,10 @@ class KnowledgeBaseService:
         return "Untitled"
 
 
+def _timestamp_ns(value: datetime) -> int:
+    """Datetime to epoch nanoseconds (naive values are local time, like mtimes)"""
+    return int(value.timestamp() * 1_000_000_000)
+
+
 # Singleton instance
 kb_service = KnowledgeBaseService()
@@ -0,0 +1,371 @@
+import re
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import threading
+import contextvars
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import AIMessage, BaseMessage, messages_from_dict, messages_to_dict
+from langchain_core.outputs import ChatGeneration
+
+from ..config import settings
+from .knowledge_base import kb_service
+from .metrics import cache_requests
+from .retrieval import Embedder, embedder_from_settings
+
+# Tools that read the knowledge base (native and mcp/filesystem). A prompt
+# containing their output is only valid while the knowledge base is unchanged.
+KB_READ_TOOLS = {
+    "list_summaries",
+    "read_summary",
+    "search_summaries",
+    "retrieve_summary_passages",
+    "read_file",
+    "read_text_file",
+    "read_multiple_files",
+    "list_directory",
+    "directory_tree",
+    "search_files",
+}
+
+# Words that name something specific (video IDs, filenames, URLs, numbers):
+# anything with a digit, "_", ".", "/" or a capital after the first letter
+_WORD = re.compile(r"[\w][\w\-./:?=&]*")
+_IDENTIFIER = re.compile(r"[\d_./]|.[A-Z]")
+
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_bypass", default=False)
+_exact_only: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_exact_only", default=False)
+
+
+@contextmanager
+def bypass_llm_cache():
+    """Skip cache lookups for LLM calls made inside the block (results are still stored)"""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+@contextmanager
+def exact_llm_cache_only():
+    """Only serve identical prompts from the cache inside the block.
+
+    For summarization: its prompts differ from another video's only in the
+    video ID, so a semantic match would replay the other video's tool calls.
+    """
+    token = _exact_only.set(True)
+    try:
+        yield
+    finally:
+        _exact_only.reset(token)
+
+
+def identifiers(text: str) -> list[str]:
+    """Identifier-like words of a question, which a semantic match must share"""
+    words = (word.rstrip(".?:/") for word in _WORD.findall(text))
+    return sorted({word for word in words if _IDENTIFIER.search(word)})
+
+
+def normalize_prompt(prompt: str) -> list[dict[str, Any]]:
+    """Messages of a serialized prompt reduced to what determines the answer.
+
+    IDs, tool call IDs and response metadata are dropped and whitespace is
+    collapsed. Case is kept: video IDs and filenames are case-sensitive, so
+    differently cased questions are only matched by the semantic tier.
+    """
+    normalized = []
+    for item in json.loads(prompt):
+        kwargs = item.get("kwargs", item) if isinstance(item, dict) else {}
+        kind = kwargs.get("type", "")
+        content = kwargs.get("content", "")
+        if isinstance(content, str):
+            content = " ".join(content.split())
+        message: dict[str, Any] = {"type": kind, "content": content}
+        if kwargs.get("tool_calls"):
+            message["tool_calls"] = [
+                [call.get("name"), call.get("args")] for call in kwargs["tool_calls"]
+            ]
+        if kind == "tool":
+            message["name"] = kwargs.get("name")
+        normalized.append(message)
+    return normalized
+
+
+def _digest(*parts: Any) -> str:
+    data = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _replayable(message: BaseMessage) -> BaseMessage:
+    update: dict[str, Any] = {"id": None}
+    if isinstance(message, AIMessage):
+        update["usage_metadata"] = None
+        update["response_metadata"] = {
+            k: v for k, v in message.response_metadata.items() if k != "token_usage"
+        }
+    return message.model_copy(update=update)
+
+
+class LLMCache(BaseCache):
+    """LangChain LLM cache with an exact and an optional semantic tier.
+
+    The exact tier is keyed by the normalized messages, the model and the
+    bound tools (LangChain's llm_string). The semantic tier also matches a
+    conversation whose last user message is merely similar (cosine
+    similarity of local embeddings at or above `semantic_threshold`), as
+    long as everything else in the prompt and the identifiers in the
+    question are identical; it is skipped inside exact_llm_cache_only(). Entries whose
+    prompt contains knowledge base tool output remember the knowledge base
+    version and are dropped once it changes. Entries expire after `ttl`
+    seconds, and the least recently used ones are evicted beyond
+    `max_entries` or `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path = settings.LLM_CACHE_DB_PATH,
+        semantic: bool = settings.LLM_CACHE_MODE == "semantic",
+        semantic_threshold: float = settings.LLM_CACHE_SEMANTIC_THRESHOLD,
+        ttl: float = settings.LLM_CACHE_TTL,
+        max_entries: int = settings.LLM_CACHE_MAX_ENTRIES,
+        max_bytes: int = settings.LLM_CACHE_MAX_BYTES,
+        kb_version: Optional[Callable[[], str]] = None,
+        embedder: Optional[Embedder] = None,
+    ):
+        self.db_path = Path(db_path)
+        self.semantic = semantic
+        self.semantic_threshold = semantic_threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.kb_version = kb_version or (lambda: "")
+        self._embedder = embedder
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    @property
+    def embedder(self) -> Embedder:
+        if self._embedder is None:
+            self._embedder = embedder_from_settings()
+        return self._embedder
+
+    async def start(self):
+        """Open the database and drop expired and excess entries"""
+        await asyncio.to_thread(self._prune)
+
+    async def close(self):
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+    # BaseCache interface. The async variants read the knowledge base
+    # version on the event loop, then do the SQLite work in a thread.
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if _bypass.get():
+            return None
+        return self._lookup(prompt, llm_string, self.kb_version(), self._semantic())
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if _bypass.get():
+            return None
+        return await asyncio.to_thread(
+            self._lookup, prompt, llm_string, self.kb_version(), self._semantic()
+        )
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE):
+        self._update(prompt, llm_string, return_val, self.kb_version(), self._semantic())
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE):
+        await asyncio.to_thread(
+            self._update, prompt, llm_string, return_val, self.kb_version(), self._semantic()
+        )
+
+    def clear(self, **kwargs: Any):
+        self._execute("DELETE FROM llm_cache")
+
+    # Keys
+
+    def _semantic(self) -> bool:
+        return self.semantic and not _exact_only.get()
+
+    def _keys(
+        self, messages: list[dict[str, Any]], llm_string: str, semantic: bool
+    ) -> tuple[str, Optional[str], Optional[str]]:
+        """Exact key, plus the semantic scope and question (None if not applicable)"""
+        key = _digest(llm_string, messages)
+        last_human = next(
+            (i for i in range(len(messages) - 1, -1, -1) if messages[i]["type"] == "human"), None
+        )
+        if not semantic or last_human is None:
+            return key, None, None
+        question = messages[last_human]["content"]
+        if not isinstance(question, str) or not question:
+            return key, None, None
+        # Everything but the question has to match exactly, and so do the
+        # video IDs, filenames and numbers in it, which embeddings blur
+        scope = _digest(
+            llm_string,
+            self.embedder.name,
+            messages[:last_human],
+            messages[last_human + 1 :],
+            identifiers(question),
+        )
+        return key, scope, question
+
+    # SQLite access (run in worker threads)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is not None:
+            return self._db
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                scope TEXT,
+                embedding BLOB,
+                kb_version TEXT,
+                generations TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS llm_cache_scope ON llm_cache (scope);
+            CREATE INDEX IF NOT EXISTS llm_cache_used ON llm_cache (used_at);
+            """
+        )
+        self._db = db
+        return db
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[tuple]:
+        db = self._connect()
+        with self._lock, db:
+            return db.execute(sql, params).fetchall()
+
+    def _lookup(
+        self, prompt: str, llm_string: str, kb_version: str, semantic: bool
+    ) -> Optional[RETURN_VAL_TYPE]:
+        key, scope, question = self._keys(normalize_prompt(prompt), llm_string, semantic)
+        row = self._execute(
+            "SELECT key, kb_version, generations, created_at FROM llm_cache WHERE key = ?", (key,)
+        )
+        result = self._valid(row[0] if row else None, kb_version)
+        cache_requests.inc(cache="llm_exact", result="miss" if result is None else "hit")
+        if result is None and scope is not None:
+            result = self._semantic_lookup(scope, question, kb_version)
+            cache_requests.inc(cache="llm_semantic", result="miss" if result is None else "hit")
+        return result
+
+    def _semantic_lookup(self, scope: str, question: str, kb_version: str) -> Optional[RETURN_VAL_TYPE]:
+        rows = self._execute(
+            "SELECT key, kb_version, generations, created_at, embedding FROM llm_cache WHERE scope = ?",
+            (scope,),
+        )
+        if not rows:
+            return None
+        query = self.embedder.embed([question])[0]
+        vectors = np.stack([np.frombuffer(row[4], dtype=np.float32) for row in rows])
+        scores = vectors @ query
+        for i in np.argsort(-scores):
+            if scores[i] < self.semantic_threshold:
+                break
+            result = self._valid(rows[i][:4], kb_version)
+            if result is not None:
+                return result
+        return None
+
+    def _valid(self, row: Optional[tuple], kb_version: str) -> Optional[RETURN_VAL_TYPE]:
+        """Generations of a row, or None (deleting it) if expired or stale"""
+        if row is None:
+            return None
+        key, entry_kb_version, generations, created_at = row
+        now = time.time()
+        if (self.ttl and now - created_at > self.ttl) or (
+            entry_kb_version is not None and entry_kb_version != kb_version
+        ):
+            self._execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            return None
+        self._execute("UPDATE llm_cache SET used_at = ? WHERE key = ?", (now, key))
+        stored = json.loads(generations)
+        return [
+            # Also covers entries stored with their token usage
+            ChatGeneration(message=_replayable(message), generation_info=info)
+            for message, info in zip(messages_from_dict(stored["messages"]), stored["info"])
+        ]
+
+    def _update(
+        self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE, kb_version: str, semantic: bool
+    ):
+        if not all(isinstance(g, ChatGeneration) for g in return_val):
+            return
+        messages = normalize_prompt(prompt)
+        key, scope, question = self._keys(messages, llm_string, semantic)
+        reads_kb = any(m["type"] == "tool" and m.get("name") in KB_READ_TOOLS for m in messages)
+        embedding = self.embedder.embed([question])[0].tobytes() if question is not None else None
+        # Without IDs, so replayed messages get fresh ones, and without token
+        # usage, so hits don't count as spent tokens in llm_tokens_total
+        replies = [_replayable(g.message) for g in return_val]
+        generations = json.dumps(
+            {"messages": messages_to_dict(replies), "info": [g.generation_info for g in return_val]},
+            ensure_ascii=False,
+            default=str,
+        )
+        now = time.time()
+        self._execute(
+            """INSERT OR REPLACE INTO llm_cache
+               (key, scope, embedding, kb_version, generations, size, created_at, used_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                key,
+                scope,
+                embedding,
+                kb_version if reads_kb else None,
+                generations,
+                len(generations) + len(embedding or b""),
+                now,
+                now,
+            ),
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._prune()
+
+    def _prune(self):
+        """Drop expired entries, then the least recently used beyond the limits"""
+        if self.ttl:
+            self._execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl,))
+        self._execute(
+            """DELETE FROM llm_cache WHERE key IN (
+                   SELECT key FROM (
+                       SELECT key,
+                              SUM(size) OVER (ORDER BY used_at DESC, key) AS total,
+                              ROW_NUMBER() OVER (ORDER BY used_at DESC, key) AS n
+                       FROM llm_cache
+                   ) WHERE total > ? OR n > ?
+               )""",
+            (self.max_bytes, self.max_entries),
+        )
+
+
+def llm_cache_from_settings() -> Optional[LLMCache]:
+    """The configured cache, or None with LLM_CACHE_MODE=off"""
+    if settings.LLM_CACHE_MODE == "off":
+        return None
+    return LLMCache(kb_version=lambda: kb_service.content_version)
+
+
+# Singleton instance (opened by the application lifespan; None when disabled)
+llm_cache = llm_cache_from_settings()
@@ -0,0 +1,295 @@
+import json
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import contextvars
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from ..config import settings
+from .metrics import llm_queue_wait, llm_throttled
+
+# Completion allowance for requests without max_tokens. Azure counts the
+# prompt plus max_tokens against the tokens-per-minute quota up front.
+DEFAULT_COMPLETION_TOKENS = 1000
+
+# Server errors worth retrying; 429s are handled separately
+RETRY_STATUSES = {500, 502, 503, 504}
+
+# Azure enforces per-minute quotas over short (1-10 second) windows, so
+# don't burst more than a second's worth of quota at once
+BURST_FRACTION = 1 / 60
+
+
+class Priority(IntEnum):
+    """LLM call classes, most urgent first"""
+
+    CHAT = 0
+    SUMMARIZE = 1
+    BATCH = 2
+
+
+_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar("llm_priority", default=Priority.CHAT)
+
+
+@contextmanager
+def llm_priority(priority: Priority):
+    """Schedule LLM calls made inside the block at `priority`.
+
+    Nested blocks can only lower the priority, so summaries run by a batch
+    job stay background work.
+    """
+    token = _priority.set(max(_priority.get(), priority))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def retry_after(headers: httpx.Headers) -> Optional[float]:
+    """Seconds the server asked to wait (retry-after-ms or Retry-After), if any"""
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(request: httpx.Request) -> int:
+    """Tokens a chat completion request counts against the quota.
+
+    Roughly four bytes of request body (messages and tool schemas) per
+    prompt token, plus max_tokens or DEFAULT_COMPLETION_TOKENS.
+    """
+    try:
+        body = json.loads(request.content)
+    except (ValueError, httpx.RequestNotRead):
+        return DEFAULT_COMPLETION_TOKENS
+    completion = body.get("max_completion_tokens") or body.get("max_tokens") or DEFAULT_COMPLETION_TOKENS
+    return len(request.content) // 4 + completion
+
+
+class TokenBucket:
+    """Refills at `per_minute` units per minute up to `capacity` (0: unlimited).
+
+    Requests larger than the bucket wait for a full bucket and then take
+    their whole size, leaving the level negative: later requests wait off
+    that debt, so the long-run rate holds for any request size.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None, now: float = 0.0):
+        self.rate = per_minute / 60
+        self.capacity = capacity or max(1.0, per_minute * BURST_FRACTION)
+        self.level = self.capacity
+        self.updated = now
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available"""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        # Larger requests than the bucket holds only wait for a full bucket
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float, now: float):
+        if self.rate:
+            self._refill(now)
+            self.level -= amount
+
+    def refund(self, amount: float, now: float):
+        """Give back units a rejected request didn't use"""
+        if self.rate:
+            self._refill(now)
+            self.level = min(self.capacity, self.level + amount)
+
+    def limit(self, remaining: float, now: float):
+        """Never assume more quota than the server says is left"""
+        if self.rate:
+            self._refill(now)
+            self.level = min(self.level, remaining)
+
+
+class LLMScheduler:
+    """Process-wide gate for Azure OpenAI requests.
+
+    Requests and tokens per minute are metered with token buckets. Callers
+    wait in one queue ordered by Priority (then arrival), so chat is never
+    stuck behind a backlog of batch summaries. A 429 pauses the whole queue
+    for the Retry-After the server sent (or a jittered exponential backoff)
+    and the rejected request retries ahead of later arrivals of its class.
+    Server errors, timeouts and connection failures are retried with the
+    same backoff, without pausing other requests.
+    Remaining-quota headers in responses tighten the buckets when other
+    clients share the deployment.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = settings.LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = settings.LLM_TOKENS_PER_MINUTE,
+        max_retries: int = settings.LLM_MAX_RETRIES,
+        backoff: float = settings.LLM_RETRY_BACKOFF,
+        max_backoff: float = settings.LLM_RETRY_MAX_BACKOFF,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        self._requests = TokenBucket(requests_per_minute, now=clock())
+        self._tokens = TokenBucket(tokens_per_minute, now=clock())
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._paused_until = 0.0
+        self._waiting: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._changed: Optional[asyncio.Condition] = None
+
+    def queue_depth(self, priority: Optional[Priority] = None) -> int:
+        """Requests waiting for capacity (of one priority, or all)"""
+        return sum(1 for p, _ in self._waiting if priority is None or p == priority)
+
+    async def send(self, send: Callable[[], Awaitable[httpx.Response]], tokens: int) -> httpx.Response:
+        """Run `send` when capacity allows, retrying 429s, server errors,
+        timeouts and connection failures.
+
+        The last error response (or exception) is passed on once
+        max_retries are used up, for the client to raise.
+        """
+        priority = _priority.get()
+        ticket = next(self._sequence)
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            await self._acquire(priority, ticket, tokens)
+            llm_queue_wait.observe(time.perf_counter() - start, priority=priority.name.lower())
+            try:
+                response = await send()
+            except httpx.TransportError:  # Includes timeouts
+                if attempt >= self.max_retries:
+                    raise
+                await self._retry_later(httpx.Headers(), attempt)
+                attempt += 1
+                continue
+            now = self._clock()
+            for bucket, header in (
+                (self._requests, "x-ratelimit-remaining-requests"),
+                (self._tokens, "x-ratelimit-remaining-tokens"),
+            ):
+                try:
+                    bucket.limit(float(response.headers[header]), now)
+                except (KeyError, ValueError):
+                    pass
+            retry = response.status_code == 429 or response.status_code in RETRY_STATUSES
+            if not retry or attempt >= self.max_retries:
+                return response
+            await response.aclose()
+            if response.status_code == 429:
+                llm_throttled.inc(priority=priority.name.lower())
+                # Rejected requests use no tokens; the retry is charged again
+                self._tokens.refund(tokens, now)
+                self._paused_until = max(self._paused_until, now + self._retry_delay(response.headers, attempt))
+            else:
+                await self._retry_later(response.headers, attempt)
+            attempt += 1
+
+    async def _retry_later(self, headers: httpx.Headers, attempt: int):
+        """Back off before retrying a failed request (other requests go ahead).
+
+        Its tokens aren't refunded: the server may have started on it.
+        """
+        await asyncio.sleep(self._retry_delay(headers, attempt))
+
+    def _retry_delay(self, headers: httpx.Headers, attempt: int) -> float:
+        backoff = min(self.max_backoff, self.backoff * 2**attempt)
+        delay = random.uniform(backoff / 2, backoff)
+        requested = retry_after(headers)
+        if requested is not None:
+            # Never before the server said; jitter spreads out the retries
+            delay = max(delay, requested + random.uniform(0, self.backoff))
+        return delay
+
+    async def _acquire(self, priority: Priority, ticket: int, tokens: int):
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        entry = (int(priority), ticket)
+        async with self._changed:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    # Only the head of the queue may take capacity
+                    delay = self._delay(tokens) if self._waiting[0] == entry else None
+                    if delay == 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                now = self._clock()
+                self._requests.take(1, now)
+                self._tokens.take(tokens, now)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._changed.notify_all()
+
+    def _delay(self, tokens: int) -> float:
+        now = self._clock()
+        return max(
+            self._paused_until - now,
+            self._requests.delay(1, now),
+            self._tokens.delay(tokens, now),
+            0.0,
+        )
+
+
+class ScheduledTransport(httpx.AsyncBaseTransport):
+    """httpx transport that sends every request through an LLMScheduler"""
+
+    def __init__(self, scheduler: LLMScheduler, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.scheduler = scheduler
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.scheduler.send(
+            lambda: self._transport.handle_async_request(request), estimate_tokens(request)
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def scheduled_http_client(scheduler: Optional[LLMScheduler] = None) -> httpx.AsyncClient:
+    """HTTP client for AzureChatOpenAI(http_async_client=...) that goes
+    through `scheduler` (the process-wide one by default). Pair it with
+    max_retries=0 so 429s, server errors and connection failures are
+    retried here, by the scheduler, only.
+    """
+    return httpx.AsyncClient(
+        transport=ScheduledTransport(scheduler or llm_scheduler),
+        timeout=httpx.Timeout(600, connect=10),
+    )
+
+
+# Singleton instance shared by all agents
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,254 @@
+import json
+import time
+import logging
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from ..config import settings
+
+logger = logging.getLogger("backend.metrics")
+
+# Latency buckets in seconds, from KB reads (ms) to agent runs (minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _label_key(labels: dict[str, str]) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key: tuple[tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # label key -> (per-bucket counts incl. +Inf, sum)
+        self._values: dict[tuple, tuple[list[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = _label_key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = _format_labels(key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total:g}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time.
+
+    Also used with metric_type="counter" to expose totals that are kept
+    elsewhere (eg. history_stats).
+    """
+
+    def __init__(self, name: str, help: str, read: Callable[[], float], metric_type: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.read = read
+        self.metric_type = metric_type
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.metric_type}",
+            f"{self.name} {self.read():g}",
+        ]
+
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text exposition format"""
+
+    def __init__(self, prefix: str = "webui_"):
+        self.prefix = prefix
+        self._metrics: dict[str, Any] = {}
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._register(Counter(self.prefix + name, help))
+
+    def histogram(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self.prefix + name, help, buckets))
+
+    def gauge(
+        self, name: str, help: str, read: Callable[[], float], metric_type: str = "gauge"
+    ) -> Gauge:
+        return self._register(Gauge(self.prefix + name, help, read, metric_type))
+
+    def _register(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception:  # A failing gauge callback must not break the scrape
+                logger.exception("Failed to render metric %s", metric.name)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+span_duration = registry.histogram("span_duration_seconds", "Duration of instrumented operations")
+span_errors = registry.counter("span_errors_total", "Instrumented operations that raised")
+node_duration = registry.histogram("graph_node_duration_seconds", "Duration of LangGraph node runs")
+tool_duration = registry.histogram("tool_duration_seconds", "Duration of agent tool calls")
+tool_calls = registry.counter("tool_calls_total", "Agent tool calls by outcome")
+llm_duration = registry.histogram("llm_duration_seconds", "Duration of LLM calls")
+llm_tokens = registry.counter("llm_tokens_total", "LLM tokens by kind (prompt, completion)")
+http_duration = registry.histogram("http_request_duration_seconds", "HTTP request latency by route")
+cache_requests = registry.counter("cache_requests_total", "Cache lookups by cache and result (hit, miss)")
+llm_queue_wait = registry.histogram("llm_queue_wait_seconds", "Time LLM calls waited for rate limit capacity")
+llm_throttled = registry.counter("llm_throttled_total", "LLM calls rejected with 429 by priority")
+
+
+def log_event(event: str, **fields: Any):
+    """Emit one structured (JSON) log line when METRICS_LOG_SPANS is enabled"""
+    if settings.METRICS_LOG_SPANS:
+        logger.info(json.dumps({"event": event, **fields}, default=str))
+
+
+@contextmanager
+def span(name: str, **fields: Any):
+    """Time a block, recording its duration (and failure) under `name`"""
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        span_errors.inc(span=name)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        span_duration.observe(elapsed, span=name)
+        log_event("span", span=name, status=status, duration_ms=round(elapsed * 1000, 1), **fields)
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """LangChain callbacks recording graph node, tool and LLM latency and tokens.
+
+    Runs are matched up by run_id, so one handler can be shared by every
+    agent and concurrent run.
+    """
+
+    def __init__(self):
+        self._starts: dict[UUID, tuple[str, str, float]] = {}  # run_id -> (kind, name, start)
+
+    def _start(self, run_id: UUID, kind: str, name: str):
+        self._starts[run_id] = (kind, name, time.perf_counter())
+
+    def _finish(self, run_id: UUID, error: bool = False) -> Optional[tuple[str, str, float]]:
+        started = self._starts.pop(run_id, None)
+        if started is None:
+            return None
+        kind, name, start = started
+        elapsed = time.perf_counter() - start
+        if kind == "node":
+            node_duration.observe(elapsed, node=name)
+        elif kind == "tool":
+            tool_duration.observe(elapsed, tool=name)
+            tool_calls.inc(tool=name, status="error" if error else "ok")
+        elif kind == "llm":
+            llm_duration.observe(elapsed, model=name)
+        log_event(kind, name=name, status="error" if error else "ok", duration_ms=round(elapsed * 1000, 1))
+        return started
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        # Only the node's own run, not the runnables nested inside it
+        if node and kwargs.get("name") == node:
+            self._start(run_id, "node", node)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=True)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id, "tool", kwargs.get("name") or (serialized or {}).get("name", "unknown"))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=True)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, "llm", (metadata or {}).get("ls_model_name") or "unknown")
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._start(run_id, "llm", (metadata or {}).get("ls_model_name") or "unknown")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id)
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    llm_tokens.inc(usage.get("input_tokens", 0), kind="prompt")
+                    llm_tokens.inc(usage.get("output_tokens", 0), kind="completion")
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=True)
+
+
+# Shared handler, attached to the agents' LLM and graph
+metrics_callbacks = MetricsCallbackHandler()
+
+if settings.METRICS_LOG_SPANS and not logger.handlers:
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
@@ -0,0 +1,460 @@
+import os
+import re
+import zlib
+import sqlite3
+import asyncio
+import hashlib
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional, Protocol
+
+import numpy as np
+
+from ..config import settings
+from .search_index import tokenize
+
+
+def chunk_markdown(content: str, max_chars: int) -> list[tuple[str, str]]:
+    """Split markdown into (heading, text) chunks of at most max_chars.
+
+    Paragraphs are kept whole where possible and never merged across a
+    heading, so each chunk stays within one section.
+    """
+    chunks: list[tuple[str, str]] = []
+    heading = ""
+    buffer: list[str] = []
+
+    def flush():
+        text = "\n\n".join(buffer).strip()
+        if text:
+            chunks.append((heading, text))
+        buffer.clear()
+
+    for block in re.split(r"\n\s*\n", content):
+        block = block.strip()
+        if block.startswith("#"):
+            first, _, block = block.partition("\n")
+            flush()
+            heading = first.lstrip("#").strip()
+            block = block.strip()
+        if not block:
+            continue
+        if buffer and sum(len(b) for b in buffer) + len(block) > max_chars:
+            flush()
+        while len(block) > max_chars:
+            buffer.append(block[:max_chars])
+            flush()
+            block = block[max_chars:]
+        buffer.append(block)
+    flush()
+    return chunks
+
+
+class Embedder(Protocol):
+    name: str
+    dim: int
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Unit-length float32 vectors, one row per text"""
+        ...
+
+
+class HashingEmbedder:
+    """Feature-hashing embedder over word unigrams and bigrams.
+
+    Needs no model download and is deterministic, so it works offline and
+    in tests; it captures lexical rather than semantic similarity.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[i, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        return _normalize(vectors)
+
+
+class SentenceTransformerEmbedder:
+    """Local CPU embedding model via the optional sentence-transformers package"""
+
+    def __init__(self, model_name: str):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                "EMBEDDING_BACKEND=sentence-transformers requires the "
+                "sentence-transformers package"
+            ) from e
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+        return vectors.astype(np.float32)
+
+
+def embedder_from_settings() -> Embedder:
+    if settings.EMBEDDING_BACKEND == "sentence-transformers":
+        return SentenceTransformerEmbedder(settings.EMBEDDING_MODEL)
+    return HashingEmbedder(settings.EMBEDDING_DIM)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class VectorIndex:
+    """Matrix of unit vectors with exact or IVF approximate search.
+
+    Rows live in a float32 matrix, memory-mapped from `path` when given.
+    Removed rows are reused by later additions. Below `ann_min_size`
+    vectors every search is an exact scan; above it a k-means coarse
+    quantizer is trained (by train(), in a worker thread) and searches only
+    scan the `nprobe` closest clusters. The quantizer is retrained whenever
+    the index doubles.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        path: Optional[Path] = None,
+        ann_min_size: int = 20000,
+        nprobe: int = 8,
+    ):
+        self.dim = dim
+        self.path = path
+        self.ann_min_size = ann_min_size
+        self.nprobe = nprobe
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._live = np.zeros(0, dtype=bool)
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._free: list[int] = []
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return int(self._live.sum())
+
+    def load(self, live_rows: list[int]) -> bool:
+        """Map an existing matrix file, marking the given rows as in use"""
+        if self.path is None or not self.path.exists():
+            return False
+        vectors = np.load(self.path, mmap_mode="r+")
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            return False
+        self._vectors = vectors
+        self._live = np.zeros(len(vectors), dtype=bool)
+        self._live[live_rows] = True
+        self._assign = np.full(len(vectors), -1, dtype=np.int32)
+        self._free = sorted(set(range(len(vectors))) - set(live_rows), reverse=True)
+        return True
+
+    def flush(self):
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+
+    def add(self, vectors: np.ndarray) -> list[int]:
+        """Store vectors, returning their row numbers"""
+        needed = len(vectors) - len(self._free)
+        if needed > 0:
+            self._grow(len(self._live) + needed)
+        rows = [self._free.pop() for _ in range(len(vectors))]
+        self._vectors[rows] = vectors
+        self._live[rows] = True
+        if self._centroids is not None:
+            self._assign[rows] = np.argmax(vectors @ self._centroids.T, axis=1)
+        return rows
+
+    def remove(self, rows: list[int]):
+        self._live[rows] = False
+        self._assign[rows] = -1
+        self._free.extend(rows)
+
+    def search(self, query: np.ndarray, k: int) -> list[tuple[int, float]]:
+        """Rows of the k vectors with the highest cosine similarity"""
+        if self._centroids is None:
+            candidates = np.flatnonzero(self._live)
+        else:
+            probe = np.argsort(-(self._centroids @ query))[: self.nprobe]
+            candidates = np.flatnonzero(self._live & np.isin(self._assign, probe))
+        if len(candidates) == 0:
+            return []
+        scores = self._vectors[candidates] @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    def _grow(self, needed: int):
+        capacity = len(self._live)
+        new_capacity = max(needed, capacity * 2, 1024)
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.stem + ".tmp.npy")
+            vectors = np.lib.format.open_memmap(
+                tmp_path, mode="w+", dtype=np.float32, shape=(new_capacity, self.dim)
+            )
+            vectors[:capacity] = self._vectors
+            vectors.flush()
+            os.replace(tmp_path, self.path)
+        else:
+            vectors = np.zeros((new_capacity, self.dim), dtype=np.float32)
+            vectors[:capacity] = self._vectors
+        self._vectors = vectors
+        self._live = np.concatenate([self._live, np.zeros(new_capacity - capacity, dtype=bool)])
+        self._assign = np.concatenate(
+            [self._assign, np.full(new_capacity - capacity, -1, dtype=np.int32)]
+        )
+        self._free.extend(range(new_capacity - 1, capacity - 1, -1))
+
+    async def train(self):
+        """(Re)train the coarse quantizer if due, off the event loop.
+
+        Searches keep using the previous quantizer until the new one is
+        ready. Callers must not add or remove vectors meanwhile.
+        """
+        size = len(self)
+        if size < self.ann_min_size or (self._centroids is not None and size < 2 * self._trained_size):
+            return
+        centroids, assign = await asyncio.to_thread(self._fit, size)
+        self._centroids, self._assign, self._trained_size = centroids, assign, size
+
+    def _fit(self, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """k-means centroids and every row's cluster (runs in a worker thread)"""
+        rng = np.random.default_rng(0)
+        rows = np.flatnonzero(self._live)
+        nlist = max(1, int(np.sqrt(size)))
+        sample = np.asarray(self._vectors[rng.choice(rows, min(size, nlist * 40), replace=False)])
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)]
+        for _ in range(10):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+        assign = np.full(len(self._live), -1, dtype=np.int32)
+        for start in range(0, len(rows), 10000):
+            batch = rows[start:start + 10000]
+            assign[batch] = np.argmax(self._vectors[batch] @ centroids.T, axis=1)
+        return centroids, assign
+
+
+@dataclass
+class RetrievedChunk:
+    key: str  # Document path
+    heading: str
+    text: str
+    score: float
+
+
+@dataclass
+class _Chunk:
+    key: str
+    heading: str
+    text: str
+
+
+class RetrievalIndex:
+    """Chunked embedding index over knowledge base documents.
+
+    Documents are reported as they change; embedding happens lazily (in a
+    worker thread) before the next search, and only for documents whose
+    content hash changed. With an index directory the vectors (a memory
+    mapped matrix) and chunk metadata (SQLite, written per changed
+    document) persist across restarts.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        index_dir: Optional[str | Path] = None,
+        chunk_chars: int = 1200,
+        ann_min_size: int = 20000,
+        nprobe: int = 8,
+    ):
+        self._embedder = embedder
+        self.index_dir = Path(index_dir) if index_dir else None
+        self.chunk_chars = chunk_chars
+        self.ann_min_size = ann_min_size
+        self.nprobe = nprobe
+        self._vectors: Optional[VectorIndex] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._docs: dict[str, tuple[str, list[int]]] = {}  # key -> (content hash, rows)
+        self._chunks: dict[int, _Chunk] = {}
+        self._pending: dict[str, Optional[tuple[str, str]]] = {}  # key -> (title, content) or None
+        self._retained: Optional[set[str]] = None  # Applied once persisted documents are loaded
+        self._lock = asyncio.Lock()
+
+    @property
+    def embedder(self) -> Embedder:
+        if self._embedder is None:
+            self._embedder = embedder_from_settings()
+        return self._embedder
+
+    def add(self, key: str, title: str, content: str):
+        """Queue a new or changed document for (re-)embedding"""
+        self._pending[key] = (title, content)
+
+    def remove(self, key: str):
+        """Queue a document for removal"""
+        self._pending[key] = None
+
+    def retain(self, keys: set[str]):
+        """Queue removal of every indexed document not in `keys`, including
+        persisted ones that are not loaded yet"""
+        if self._vectors is None:
+            self._retained = keys
+            return
+        for key in set(self._docs) - keys:
+            self._pending.setdefault(key, None)
+
+    async def search(self, query: str, k: int = 5) -> list[RetrievedChunk]:
+        """Top-k chunks most similar to the query"""
+        await self.sync()
+        if self._vectors is None or not len(self._vectors):
+            return []
+        query_vector = (await asyncio.to_thread(self.embedder.embed, [query]))[0]
+        return [
+            RetrievedChunk(score=score, **asdict(self._chunks[row]))
+            for row, score in self._vectors.search(query_vector, k)
+        ]
+
+    async def sync(self):
+        """Apply queued document changes to the vector index"""
+        if self._vectors is not None and not self._pending:
+            return
+        async with self._lock:
+            if self._vectors is None:
+                await asyncio.to_thread(self._open)
+                if self._retained is not None:
+                    # Documents deleted while the server was down
+                    for key in set(self._docs) - self._retained:
+                        self._pending.setdefault(key, None)
+                    self._retained = None
+            if not self._pending:
+                await self._vectors.train()
+                return
+            pending, self._pending = self._pending, {}
+
+            texts: list[str] = []
+            dropped: list[str] = []
+            updates: list[tuple[str, str, list[_Chunk]]] = []
+            for key, document in pending.items():
+                if document is None:
+                    if self._drop(key):
+                        dropped.append(key)
+                    continue
+                title, content = document
+                digest = hashlib.sha1(content.encode("utf-8")).hexdigest()
+                if key in self._docs and self._docs[key][0] == digest:
+                    continue
+                chunks = [_Chunk(key, h, t) for h, t in chunk_markdown(content, self.chunk_chars)]
+                texts.extend(f"{title}\n{c.heading}\n{c.text}" for c in chunks)
+                updates.append((key, digest, chunks))
+
+            vectors = await asyncio.to_thread(self.embedder.embed, texts) if texts else None
+            offset = 0
+            for key, digest, chunks in updates:
+                self._drop(key)
+                rows = self._vectors.add(vectors[offset:offset + len(chunks)]) if chunks else []
+                offset += len(chunks)
+                self._docs[key] = (digest, rows)
+                self._chunks.update(zip(rows, chunks))
+            await self._vectors.train()
+            if dropped or updates:
+                await asyncio.to_thread(self._save, dropped, [key for key, _, _ in updates])
+
+    def _drop(self, key: str) -> bool:
+        entry = self._docs.pop(key, None)
+        if entry is None:
+            return False
+        self._vectors.remove(entry[1])
+        for row in entry[1]:
+            self._chunks.pop(row, None)
+        return True
+
+    def _open(self):
+        """Create the vector index, loading persisted state if compatible
+        (runs in a worker thread)"""
+        path = self.index_dir / "vectors.npy" if self.index_dir else None
+        vectors = VectorIndex(self.embedder.dim, path, self.ann_min_size, self.nprobe)
+        if self.index_dir is not None:
+            self._load(vectors)
+        # Last, so searches don't see a half-loaded index
+        self._vectors = vectors
+
+    def _load(self, vectors: VectorIndex):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        # Metadata used to be rewritten to chunks.json on every sync
+        (self.index_dir / "chunks.json").unlink(missing_ok=True)
+        db = sqlite3.connect(self.index_dir / "chunks.sqlite3", check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS docs (key TEXT PRIMARY KEY, digest TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS chunks (
+                row INTEGER PRIMARY KEY,
+                key TEXT NOT NULL,
+                heading TEXT NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS chunks_key ON chunks (key);
+            """
+        )
+        self._db = db
+        stored = db.execute("SELECT value FROM meta WHERE name = 'embedder'").fetchone()
+        if stored is None or stored[0] != self.embedder.name:
+            # Different model (or a new index): start over
+            with db:
+                db.execute("DELETE FROM docs")
+                db.execute("DELETE FROM chunks")
+                db.execute("INSERT OR REPLACE INTO meta VALUES ('embedder', ?)", (self.embedder.name,))
+            return
+        chunks = {
+            row: _Chunk(key, heading, text)
+            for row, key, heading, text in db.execute("SELECT row, key, heading, text FROM chunks")
+        }
+        if not vectors.load(list(chunks)):
+            with db:
+                db.execute("DELETE FROM docs")
+                db.execute("DELETE FROM chunks")
+            return
+        rows: dict[str, list[int]] = {}
+        for row, chunk in chunks.items():
+            rows.setdefault(chunk.key, []).append(row)
+        self._chunks = chunks
+        self._docs = {
+            key: (digest, sorted(rows.get(key, [])))
+            for key, digest in db.execute("SELECT key, digest FROM docs")
+        }
+
+    def _save(self, dropped: list[str], updated: list[str]):
+        """Persist the vectors and the rows of changed documents (runs in a
+        worker thread)"""
+        if self._db is None:
+            return
+        self._vectors.flush()
+        with self._db:
+            for key in dropped + updated:
+                self._db.execute("DELETE FROM docs WHERE key = ?", (key,))
+                self._db.execute("DELETE FROM chunks WHERE key = ?", (key,))
+            for key in updated:
+                digest, rows = self._docs[key]
+                self._db.execute("INSERT INTO docs VALUES (?, ?)", (key, digest))
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?)",
+                    [(row, key, self._chunks[row].heading, self._chunks[row].text) for row in rows],
+                )
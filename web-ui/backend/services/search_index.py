@@ -0,0 +1,238 @@
+import re
+import math
+import heapq
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Hashable, Optional
+
+# Words split on punctuation and underscores, so filename stems like
+# "Is_the_AI_Bubble_Popping" tokenize the same way as their titles
+TOKEN_RE = re.compile(r"[^\W_]+")
+PHRASE_RE = re.compile(r'"([^"]+)"')
+
+# Field weights applied to term frequency (BM25F-style)
+TITLE_WEIGHT = 3.0
+HEADING_WEIGHT = 2.0
+BODY_WEIGHT = 1.0
+
+# Weight of terms matched only by prefix-expanding the last query word
+PREFIX_WEIGHT = 0.5
+MAX_PREFIX_EXPANSIONS = 50
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens of a text"""
+    return [m.group(0).lower() for m in TOKEN_RE.finditer(text)]
+
+
+@dataclass
+class Posting:
+    """Occurrences of one term in one document"""
+    positions: list[int] = field(default_factory=list)  # Body token positions
+    weight: float = 0.0  # Field-weighted term frequency
+
+
+@dataclass
+class SearchHit:
+    key: Hashable
+    score: float
+    position: Optional[int]  # Body token position of the first match
+
+
+@dataclass
+class _Doc:
+    key: Hashable
+    length: int
+    terms: set[str]
+    content: str  # For snippets, so results need no file reads
+
+
+class SearchIndex:
+    """In-memory inverted index with BM25 ranking.
+
+    Each document is indexed from its title, markdown headings and body.
+    Postings keep body token positions so quoted phrases can be matched,
+    and documents can be added, replaced or removed individually. The body
+    text is kept too, to build result snippets from memory.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, dict[int, Posting]] = {}
+        self._docs: dict[int, _Doc] = {}
+        self._doc_ids: dict[Hashable, int] = {}
+        self._next_id = 0
+        self._total_length = 0
+        self._vocabulary: Optional[list[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, key: Hashable, title: str, content: str):
+        """Index a document, replacing any previous version with this key"""
+        self.remove(key)
+        doc_id = self._next_id
+        self._next_id += 1
+
+        body = tokenize(content)
+        postings: dict[str, Posting] = {}
+        for position, term in enumerate(body):
+            posting = postings.setdefault(term, Posting())
+            posting.positions.append(position)
+            posting.weight += BODY_WEIGHT
+        for line in content.splitlines():
+            if line.startswith("#"):
+                for term in tokenize(line):
+                    postings.setdefault(term, Posting()).weight += HEADING_WEIGHT
+        for term in tokenize(title):
+            postings.setdefault(term, Posting()).weight += TITLE_WEIGHT
+
+        for term, posting in postings.items():
+            if term not in self._postings:
+                self._vocabulary = None
+            self._postings.setdefault(term, {})[doc_id] = posting
+
+        self._docs[doc_id] = _Doc(key=key, length=len(body), terms=set(postings), content=content)
+        self._doc_ids[key] = doc_id
+        self._total_length += len(body)
+
+    def remove(self, key: Hashable):
+        """Remove a document from the index, if present"""
+        doc_id = self._doc_ids.pop(key, None)
+        if doc_id is None:
+            return
+        doc = self._docs.pop(doc_id)
+        self._total_length -= doc.length
+        for term in doc.terms:
+            term_postings = self._postings[term]
+            del term_postings[doc_id]
+            if not term_postings:
+                del self._postings[term]
+                self._vocabulary = None
+
+    def search(self, query: str, limit: Optional[int] = None) -> list[SearchHit]:
+        """Return documents matching every term and phrase, best first.
+
+        Quoted text is matched as an exact phrase. The last unquoted word
+        also matches as a prefix, so partially typed words still find
+        results.
+        """
+        phrases = [tokenize(p) for p in PHRASE_RE.findall(query)]
+        phrases = [p for p in phrases if p]
+        words = tokenize(PHRASE_RE.sub(" ", query))
+        if not phrases and not words:
+            return []
+
+        # Each clause is a {term: weight} alternative set; a document must
+        # match at least one term of every clause.
+        clauses: list[dict[str, float]] = [{w: 1.0} for w in words]
+        if words and not query.rstrip().endswith('"'):
+            last = words[-1]
+            for term in self._expand_prefix(last):
+                clauses[-1].setdefault(term, PREFIX_WEIGHT)
+        for phrase in phrases:
+            clauses.extend({term: 1.0} for term in phrase)
+
+        candidates: Optional[set[int]] = None
+        for clause in sorted(clauses, key=self._clause_size):
+            matched = set()
+            for term in clause:
+                matched.update(self._postings.get(term, ()))
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return []
+
+        phrase_positions: dict[int, int] = {}
+        for phrase in phrases:
+            for doc_id in list(candidates):
+                position = self._phrase_position(phrase, doc_id)
+                if position is None:
+                    candidates.discard(doc_id)
+                else:
+                    phrase_positions.setdefault(doc_id, position)
+
+        avg_length = self._total_length / len(self._docs) if self._docs else 0.0
+        hits = []
+        for doc_id in candidates:
+            doc = self._docs[doc_id]
+            score = 0.0
+            first_position = phrase_positions.get(doc_id)
+            for clause in clauses:
+                for term, weight in clause.items():
+                    posting = self._postings.get(term, {}).get(doc_id)
+                    if posting is None:
+                        continue
+                    score += weight * self._bm25(term, posting.weight, doc.length, avg_length)
+                    if doc_id not in phrase_positions and posting.positions:
+                        position = posting.positions[0]
+                        if first_position is None or position < first_position:
+                            first_position = position
+            hits.append(SearchHit(key=doc.key, score=score, position=first_position))
+
+        if limit is not None:
+            return heapq.nlargest(limit, hits, key=lambda h: h.score)
+        return sorted(hits, key=lambda h: h.score, reverse=True)
+
+    def snippet(self, key: Hashable, position: Optional[int], width: int = 200) -> Optional[str]:
+        """Snippet of an indexed document around a body token position
+        (None if the document is not indexed)"""
+        doc_id = self._doc_ids.get(key)
+        if doc_id is None:
+            return None
+        return make_snippet(self._docs[doc_id].content, position, width)
+
+    def _bm25(self, term: str, tf: float, length: int, avg_length: float) -> float:
+        df = len(self._postings[term])
+        idf = math.log(1 + (len(self._docs) - df + 0.5) / (df + 0.5))
+        norm = 1 - self.b + self.b * (length / avg_length if avg_length else 0.0)
+        return idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+
+    def _clause_size(self, clause: dict[str, float]) -> int:
+        return sum(len(self._postings.get(term, ())) for term in clause)
+
+    def _phrase_position(self, phrase: list[str], doc_id: int) -> Optional[int]:
+        """Body position where the phrase starts in a document, if anywhere"""
+        position_sets = []
+        for term in phrase:
+            posting = self._postings.get(term, {}).get(doc_id)
+            if posting is None or not posting.positions:
+                return None
+            position_sets.append(posting.positions)
+        rest = [set(p) for p in position_sets[1:]]
+        for start in position_sets[0]:
+            if all(start + i + 1 in positions for i, positions in enumerate(rest)):
+                return start
+        return None
+
+    def _expand_prefix(self, prefix: str) -> list[str]:
+        """Vocabulary terms that start with a prefix (excluding itself)"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        expansions = []
+        i = bisect_left(self._vocabulary, prefix)
+        while i < len(self._vocabulary) and len(expansions) < MAX_PREFIX_EXPANSIONS:
+            term = self._vocabulary[i]
+            if not term.startswith(prefix):
+                break
+            if term != prefix:
+                expansions.append(term)
+            i += 1
+        return expansions
+
+
+def make_snippet(content: str, position: Optional[int], width: int = 200) -> str:
+    """Text around a body token position, trimmed to roughly `width` chars"""
+    start = 0
+    if position is not None:
+        for i, match in enumerate(TOKEN_RE.finditer(content)):
+            if i == position:
+                start = max(0, match.start() - width // 4)
+                break
+    end = min(len(content), start + width)
+    snippet = content[start:end].replace("\n", " ").strip()
+    if start > 0:
+        snippet = "..." + snippet
+    if end < len(content):
+        snippet += "..."
+    return snippet
@@ -0,0 +1,83 @@
+import os
+import json
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from ..config import settings
+
+
+@dataclass
+class ManifestEntry:
+    video_id: str
+    summary_path: str  # Relative to the knowledge base
+    category: Optional[str]
+    prompt_version: str
+    model: str
+    created_at: str  # ISO timestamp
+
+
+class SummaryManifest:
+    """Persistent record of which summary file each video was saved to.
+
+    Entries remember the prompt version and model that produced them, so a
+    lookup only hits while both are unchanged and the file still exists.
+    """
+
+    def __init__(self, path: Path, base_path: Path):
+        self.path = path
+        self.base_path = base_path
+        self._entries: Optional[dict[str, ManifestEntry]] = None
+
+    def _load(self) -> dict[str, ManifestEntry]:
+        if self._entries is None:
+            try:
+                raw = json.loads(self.path.read_text(encoding="utf-8"))
+                self._entries = {vid: ManifestEntry(**entry) for vid, entry in raw.items()}
+            except (FileNotFoundError, ValueError, TypeError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, video_id: str) -> Optional[ManifestEntry]:
+        return self._load().get(video_id)
+
+    def lookup(self, video_id: str, prompt_version: str) -> Optional[ManifestEntry]:
+        """Entry for a video if it is current and its summary file exists"""
+        entry = self.get(video_id)
+        if entry is None or entry.prompt_version != prompt_version:
+            return None
+        if not (self.base_path / entry.summary_path).is_file():
+            return None
+        return entry
+
+    def record(
+        self,
+        video_id: str,
+        summary_path: str,
+        category: Optional[str],
+        prompt_version: str,
+        model: str,
+    ) -> ManifestEntry:
+        entry = ManifestEntry(
+            video_id=video_id,
+            summary_path=summary_path,
+            category=category,
+            prompt_version=prompt_version,
+            model=model,
+            created_at=datetime.now().isoformat(timespec="seconds"),
+        )
+        self._load()[video_id] = entry
+        self._save()
+        return entry
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        data = {vid: asdict(entry) for vid, entry in self._load().items()}
+        tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+# Singleton instance
+summary_manifest = SummaryManifest(Path(settings.SUMMARY_MANIFEST_PATH), Path(settings.KNOWLEDGE_BASE_PATH))
@@ -0,0 +1,96 @@
+from typing import Optional
+
+from langchain_core.tools import tool
+
+from ..config import settings
+from .knowledge_base import kb_service
+
+
+@tool
+async def retrieve_summary_passages(query: str, k: int = 5) -> str:
+    """Find the passages of saved video summaries most relevant to a question.
+
+    Use this first when answering questions about the knowledge base; it
+    returns the best matching sections from all summaries in one call.
+
+    Args:
+        query: The question or topic to look up
+        k: Number of passages to return (default 5)
+    """
+    passages = await kb_service.retrieve(query, k)
+    if not passages:
+        return "No matching passages found."
+    return "\n\n---\n\n".join(
+        f"[{p.filename} | {p.category or 'uncategorized'} | {p.heading or p.title}]\n{p.text}"
+        for p in passages
+    )
+
+
+@tool
+async def list_summaries(category: Optional[str] = None, limit: int = 50) -> str:
+    """List saved video summaries, newest first.
+
+    Args:
+        category: Only list this category (one of the configured summary categories)
+        limit: Maximum number of summaries to list (default 50)
+    """
+    summaries, total, _ = await kb_service.list_page(limit, category=category)
+    if not summaries:
+        return "No summaries found."
+    lines = [
+        f"{s.filename} | {s.category or 'uncategorized'} | {s.title} | {s.modified_date:%Y-%m-%d}"
+        for s in summaries
+    ]
+    if total > len(summaries):
+        lines.append(f"... {total - len(summaries)} more")
+    return "\n".join(lines)
+
+
+@tool
+async def read_summary(filename: str) -> str:
+    """Read the full markdown of a saved summary.
+
+    Args:
+        filename: Summary filename as shown by list_summaries, e.g. Building_AI_Agents.md
+    """
+    summary = await kb_service.get_by_filename(filename)
+    if not summary:
+        raise ValueError(f"Summary {filename!r} not found")
+    return summary.content
+
+
+@tool
+async def write_summary(category: str, filename: str, content: str) -> str:
+    """Save a summary as markdown in the knowledge base (overwrites an existing file).
+
+    Args:
+        category: One of the summary categories given in the instructions
+        filename: Descriptive filename ending in .md, e.g. Building_AI_Agents.md
+        content: Full markdown content of the summary
+    """
+    file_path = await kb_service.write_summary(category, filename, content)
+    return f"Saved {file_path.relative_to(kb_service.base_path).as_posix()}"
+
+
+@tool
+async def search_summaries(query: str, limit: int = 10) -> str:
+    """Keyword search over summary titles, headings and text, best match first.
+
+    Args:
+        query: Words to search for; wrap text in double quotes to match a phrase
+        limit: Maximum number of results (default 10)
+    """
+    results = await kb_service.search(query, limit)
+    if not results:
+        return "No matching summaries found."
+    return "\n".join(
+        f"{r.filename} | {r.category or 'uncategorized'} | {r.title}\n  {r.snippet}" for r in results
+    )
+
+
+def local_tools() -> list:
+    """In-process tools added to every agent alongside the MCP tools"""
+    tools = [retrieve_summary_passages]
+    if settings.KB_TOOLS_MODE != "docker":
+        tools.extend([list_summaries, read_summary, write_summary, search_summaries])
+    return tools
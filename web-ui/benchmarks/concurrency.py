@@ -0,0 +1,103 @@
+"""Load check: concurrent chats must not serialize.
+
+Runs N chat turns at once the way the chat route does, each borrowing an
+agent from the application's agent pool (AGENT_POOL_SIZE agents, or
+--pool-size). The agents' model takes a fixed `latency` per call, on the
+async path and, like a blocking HTTP request, on the sync one. The graph
+awaits the model and the pool shares agents between requests, so the turns
+should take about as long as one turn (two model calls: search, then
+answer), not N / pool size times that. Reports how long turns waited for
+an agent, and exits 1 if they take more than `--tolerance` times one turn.
+
+    cd web-ui
+    uv run python -m benchmarks.concurrency --chats 8 --latency 0.5
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+# Model calls per chat turn with the scripted model (search, then answer)
+CALLS_PER_TURN = 2
+
+
+async def run(args: argparse.Namespace, workdir: Path) -> tuple[float, list[float]]:
+    """Elapsed seconds for the concurrent turns, and each turn's wait for an agent"""
+    from backend.services.agent import AgentService, agent_pool
+    from backend.services.tools import local_tools
+    from benchmarks.fakes import ScriptedChatModel, generate_knowledge_base
+
+    class FixedLatencyModel(ScriptedChatModel):
+        """Scripted model whose sync path blocks for `latency`, like a real client"""
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            time.sleep(self.latency)
+            return super()._generate(messages)
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            await asyncio.sleep(self.latency)
+            return ScriptedChatModel._generate(self, messages)
+
+    async def scripted_agent() -> AgentService:
+        return AgentService.from_components(FixedLatencyModel(latency=args.latency), local_tools())
+
+    generate_knowledge_base(workdir / "knowledge", 20)
+    agent_pool.factory = scripted_agent
+    await agent_pool.start()
+    waits: list[float] = []
+
+    async def turn(message: str):
+        start = time.perf_counter()
+        async with agent_pool.acquire() as agent:
+            waits.append(time.perf_counter() - start)
+            await agent.chat(message, [])
+
+    try:
+        await turn("Warm up the knowledge base index")
+        waits.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(turn(f"What do my summaries say about topic {n}?") for n in range(args.chats)))
+        return time.perf_counter() - start, waits
+    finally:
+        await agent_pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=8, help="Concurrent chat turns")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per model call")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed multiple of one turn's time")
+    parser.add_argument("--pool-size", type=int, default=None, help="Pooled agents (default: AGENT_POOL_SIZE)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="webui-concurrency-") as tmp:
+        workdir = Path(tmp)
+        os.environ.update(
+            {
+                "KNOWLEDGE_BASE_PATH": str(workdir / "knowledge"),
+                "RETRIEVAL_INDEX_DIR": str(workdir / "retrieval_index"),
+                "SUMMARY_MANIFEST_PATH": str(workdir / "manifest.json"),
+                "LLM_CACHE_MODE": "off",
+                "AGENT_POOL_HEALTH_CHECK_INTERVAL": "0",
+            }
+        )
+        if args.pool_size is not None:
+            os.environ["AGENT_POOL_SIZE"] = str(args.pool_size)
+        (workdir / "knowledge").mkdir()
+        elapsed, waits = asyncio.run(run(args, workdir))
+
+    one_turn = CALLS_PER_TURN * args.latency
+    ratio = elapsed / one_turn
+    print(f"{args.chats} concurrent chats: {elapsed:.3f}s ({ratio:.2f}x one turn of {one_turn:.3f}s)")
+    print(f"Waited for an agent: mean {sum(waits) / len(waits):.3f}s, max {max(waits):.3f}s")
+    if ratio > args.tolerance:
+        print(f"Chats serialized: expected at most {args.tolerance:g}x, about {args.chats}x means one at a time")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Deterministic stand-ins for Azure OpenAI, YouTube and the knowledge base"""
+
+import os
+import json
+import random
+import asyncio
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import tool
+
+CATEGORIES = ["tech", "science", "business", "culture", "general"]
+
+WORDS = (
+    "agent model transcript video summary python memory latency cache index search "
+    "startup market research experiment history culture energy design network data "
+    "learning context prompt token stream pipeline vector query planet climate growth "
+    "founder product interview story science protein health policy economy music"
+).split()
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that follows the app's prompts with canned tool calls.
+
+    Summarize prompts fetch the transcript and save a summary through
+    write_summary; map prompts return notes; chat messages search the
+    knowledge base once and then answer; structured-output calls return a
+    summary built from the transcript in the prompt. `latency` seconds are
+    slept per call to model LLM time (0 measures pure pipeline overhead).
+    `calls` and `prompt_tokens` count the requests and their input size.
+    """
+
+    latency: float = 0.0
+    calls: int = 0
+    prompt_tokens: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def with_structured_output(self, schema, **kwargs):
+        async def respond(messages: list) -> dict:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            text = messages[-1]["content"]
+            self.calls += 1
+            self.prompt_tokens += len(text) // 4
+            video_id = text.split(":", 1)[1].split()[0]
+            body = " ".join(text.split("## Transcript", 1)[-1].split()[:300])
+            return {
+                "title": f"Benchmark {video_id}",
+                "video_type": "Educational/Explainer",
+                "category": "tech",
+                "body": f"## Overview\n\n{body}",
+            }
+
+        return RunnableLambda(respond)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._generate(messages)
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message = self._respond(messages)
+        if message.tool_calls:
+            call = message.tool_calls[0]
+            chunk = AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0}
+                ],
+            )
+            yield ChatGenerationChunk(message=chunk)
+            return
+        for i, word in enumerate(message.content.split(" ")):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else f" {word}"))
+
+    def _respond(self, messages: list[BaseMessage]) -> AIMessage:
+        self.calls += 1
+        last = messages[-1]
+        request = next((m for m in reversed(messages) if isinstance(m, HumanMessage)), last)
+        text = request.content if isinstance(request.content, str) else json.dumps(request.content)
+        usage = {"input_tokens": sum(len(str(m.content)) for m in messages) // 4, "output_tokens": 0}
+        self.prompt_tokens += usage["input_tokens"]
+
+        if text.startswith("Please summarize the YouTube video with ID:"):
+            video_id = text.split(":", 1)[1].split()[0]
+            if not isinstance(last, ToolMessage):
+                if "## Section Notes" in text:
+                    return self._save_call(video_id, text.split("## Section Notes", 1)[1], usage)
+                return self._tool_call("fetch_youtube_transcript", {"video_id": video_id}, usage)
+            if last.name == "fetch_youtube_transcript":
+                return self._save_call(video_id, last.content, usage)
+            return AIMessage(content="Summary saved.\nCATEGORY: tech", usage_metadata=_usage(usage, 8))
+
+        if text.startswith("Below is part"):
+            notes = " ".join(text.split()[-60:])
+            return AIMessage(content=f"- Notes: {notes}", usage_metadata=_usage(usage, 60))
+
+        if isinstance(last, HumanMessage):
+            query = " ".join(text.split()[:6])
+            return self._tool_call("search_summaries", {"query": query}, usage)
+        answer = f"Here is what the knowledge base says about that: {str(last.content)[:400]}"
+        return AIMessage(content=answer, usage_metadata=_usage(usage, len(answer) // 4))
+
+    def _tool_call(self, name: str, args: dict, usage: dict) -> AIMessage:
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": name, "args": args, "id": f"call_{self.calls}"}],
+            usage_metadata=_usage(usage, 20),
+        )
+
+    def _save_call(self, video_id: str, source: str, usage: dict) -> AIMessage:
+        body = " ".join(source.split()[:300])
+        content = f"# Benchmark {video_id}\n\n*Video Type: Educational/Explainer*\n\n## Overview\n\n{body}\n"
+        return self._tool_call(
+            "write_summary",
+            {"category": "tech", "filename": f"Benchmark_{video_id}.md", "content": content},
+            usage,
+        )
+
+
+def _usage(usage: dict, output_tokens: int) -> dict:
+    return {
+        "input_tokens": usage["input_tokens"],
+        "output_tokens": output_tokens,
+        "total_tokens": usage["input_tokens"] + output_tokens,
+    }
+
+
+def synthetic_transcript(minutes: float = 30, seed: int = 0) -> list[dict[str, Any]]:
+    """Transcript snippets (text, start, duration) about 4 seconds apart"""
+    rng = random.Random(seed)
+    snippets = []
+    start = 0.0
+    while start < minutes * 60:
+        duration = round(rng.uniform(2.5, 5.5), 2)
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14)))
+        snippets.append({"text": text, "start": round(start, 2), "duration": duration})
+        start += duration
+    return snippets
+
+
+def load_transcript(path: Optional[Path], minutes: float) -> list[dict[str, Any]]:
+    """Snippets from a JSON fixture file, or a synthetic transcript"""
+    if path is not None:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data["snippets"] if isinstance(data, dict) else data
+    return synthetic_transcript(minutes)
+
+
+def transcript_tools(snippets: list[dict[str, Any]]) -> list:
+    """Local replacements for the youtube_server MCP tools, serving one fixture"""
+
+    @tool
+    async def fetch_youtube_transcript(video_id: str, language: str = "en") -> str:
+        """Fetch the youtube transcript given a video_id"""
+        return " ".join(s["text"] for s in snippets)
+
+    @tool
+    async def fetch_youtube_transcript_chunks(
+        video_id: str, language: str = "en", max_tokens: int = 6000, max_seconds: float = 900
+    ) -> str:
+        """Fetch the youtube transcript split into time- and token-bounded chunks"""
+        chunks: list[dict[str, Any]] = []
+        current: list[dict[str, Any]] = []
+        tokens = 0
+        for snippet in [*snippets, None]:
+            snippet_tokens = len(snippet["text"]) // 4 if snippet else 0
+            if current and (
+                snippet is None
+                or tokens + snippet_tokens > max_tokens
+                or snippet["start"] + snippet["duration"] - current[0]["start"] > max_seconds
+            ):
+                chunks.append(
+                    {
+                        "index": len(chunks),
+                        "start": current[0]["start"],
+                        "end": current[-1]["start"] + current[-1]["duration"],
+                        "tokens": tokens,
+                        "text": " ".join(s["text"] for s in current),
+                    }
+                )
+                current, tokens = [], 0
+            if snippet is not None:
+                current.append(snippet)
+                tokens += snippet_tokens
+        return json.dumps(chunks)
+
+    return [fetch_youtube_transcript, fetch_youtube_transcript_chunks]
+
+
+def generate_knowledge_base(base_path: Path, count: int, seed: int = 0) -> list[str]:
+    """Write `count` synthetic summaries across the category folders.
+
+    Returns the filenames. Modification times are spread over a year so
+    date filters and ordering behave as with a real knowledge base.
+    """
+    rng = random.Random(seed)
+    filenames = []
+    for i in range(count):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        topic = [rng.choice(WORDS) for _ in range(3)]
+        filename = f"{'_'.join(w.title() for w in topic)}_{i:05d}.md"
+        sections = []
+        for heading in ("Overview", rng.choice(WORDS).title(), "Key Takeaways"):
+            paragraph = " ".join(rng.choice(WORDS) for _ in range(rng.randint(80, 160)))
+            sections.append(f"## {heading}\n\n{paragraph}\n")
+        content = f"# {' '.join(topic).title()}\n\n*Video Type: Educational/Explainer*\n\n" + "\n".join(sections)
+        path = base_path / category / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+        mtime = 1_700_000_000 + rng.randint(0, 365 * 24 * 3600)
+        os.utime(path, (mtime, mtime))
+        filenames.append(filename)
+    return filenames
@@ -0,0 +1,264 @@
+"""Offline benchmarks for the web-ui backend.
+
+Runs the real FastAPI app under uvicorn with a scripted chat model, a local
+transcript fixture and a synthetic knowledge base, so no Azure OpenAI,
+YouTube or Docker access is needed. Measures knowledge base endpoints,
+WebSocket chat under concurrency and the summarize pipeline, prints
+latency percentiles and compares them with a stored baseline.
+
+    cd web-ui
+    uv run python -m benchmarks.run --save-baseline      # record a baseline
+    uv run python -m benchmarks.run                      # compare against it
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+# Metrics where larger is better; everything else is a latency
+HIGHER_IS_BETTER = {"throughput_per_s"}
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """p50/p95/p99/mean of latencies given in seconds, reported in ms"""
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        "n": len(ordered),
+        "p50_ms": round(pick(0.50), 3),
+        "p95_ms": round(pick(0.95), 3),
+        "p99_ms": round(pick(0.99), 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+async def timed(samples: list[float], call: Callable[[], Awaitable[Any]]) -> Any:
+    start = time.perf_counter()
+    result = await call()
+    samples.append(time.perf_counter() - start)
+    return result
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def bench_knowledge_base(client, filenames: list[str], iterations: int) -> dict[str, Any]:
+    """List (first page, category filter, next page), search and get latency"""
+    queries = ["agent memory", "market growth", "protein health", '"vector query"', "clim"]
+    results = {}
+    samples: dict[str, list[float]] = {
+        name: [] for name in ("list_first_page", "list_category", "list_next_page", "search", "retrieve", "get")
+    }
+    for i in range(iterations):
+        response = await timed(samples["list_first_page"], lambda: client.get("/api/summaries?limit=50"))
+        cursor = response.json().get("next_cursor")
+        await timed(samples["list_category"], lambda: client.get("/api/summaries?limit=50&category=science"))
+        if cursor:
+            await timed(
+                samples["list_next_page"],
+                lambda: client.get("/api/summaries", params={"limit": 50, "cursor": cursor}),
+            )
+        query = queries[i % len(queries)]
+        await timed(samples["search"], lambda: client.get("/api/summaries/search", params={"q": query}))
+        await timed(samples["retrieve"], lambda: client.get("/api/summaries/retrieve", params={"q": query}))
+        filename = filenames[(i * 7919) % len(filenames)]
+        await timed(samples["get"], lambda: client.get(f"/api/summaries/{filename}"))
+    for name, values in samples.items():
+        if values:
+            results[f"kb.{name}"] = percentiles(values)
+    return results
+
+
+async def bench_chat(url: str, concurrency: int, turns: int) -> dict[str, Any]:
+    """Concurrent WebSocket conversations, each sending `turns` messages"""
+    import websockets
+
+    samples: list[float] = []
+
+    async def conversation(n: int):
+        async with websockets.connect(url) as ws:
+            json.loads(await ws.recv())  # connected
+            for turn in range(turns):
+                start = time.perf_counter()
+                await ws.send(json.dumps({"message": f"What do my summaries say about agent memory {n} {turn}?"}))
+                while True:
+                    event = json.loads(await ws.recv())
+                    if event["type"] == "error":
+                        raise RuntimeError(event["content"])
+                    if event["type"] == "message":
+                        break
+                samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(conversation(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    result = percentiles(samples)
+    result["throughput_per_s"] = round(len(samples) / elapsed, 3)
+    return {"chat.turn": result}
+
+
+async def bench_summarize(client, models: list, iterations: int) -> dict[str, Any]:
+    """POST /api/summarize in every mode (forced, so nothing is served from cache).
+
+    Besides latency, reports the LLM calls and prompt tokens per summary
+    counted by the scripted `models`.
+    """
+    results = {}
+    for mode in ("single", "map_reduce", "pipeline"):
+        samples: list[float] = []
+        calls = sum(m.calls for m in models)
+        tokens = sum(m.prompt_tokens for m in models)
+        for i in range(iterations):
+            body = {
+                "youtube_url": f"https://www.youtube.com/watch?v=bench{i:06d}",
+                "mode": mode,
+                "force_refresh": True,
+            }
+            response = await timed(samples, lambda: client.post("/api/summarize", json=body))
+            response.raise_for_status()
+            if response.json()["status"] != "success":
+                raise RuntimeError(f"Summarize failed: {response.text}")
+        result = percentiles(samples)
+        result["llm_calls"] = round((sum(m.calls for m in models) - calls) / iterations, 2)
+        result["prompt_tokens"] = round((sum(m.prompt_tokens for m in models) - tokens) / iterations)
+        results[f"summarize.{mode}"] = result
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Metrics more than `tolerance` (fraction) worse than the baseline"""
+    regressions = []
+    for name, metrics in results.items():
+        for key in ("p50_ms", "p95_ms", "throughput_per_s"):
+            if key not in metrics or key not in baseline.get(name, {}):
+                continue
+            current, previous = metrics[key], baseline[name][key]
+            if not previous:
+                continue
+            ratio = current / previous
+            worse = ratio < 1 - tolerance if key in HIGHER_IS_BETTER else ratio > 1 + tolerance
+            marker = "  REGRESSION" if worse else ""
+            print(f"  {name:<26} {key:<17} {previous:>10.3f} -> {current:>10.3f} ({ratio:5.2f}x){marker}")
+            if worse:
+                regressions.append(f"{name} {key}")
+    return regressions
+
+
+async def run(args: argparse.Namespace, workdir: Path) -> dict[str, Any]:
+    # Imported after the environment points the app at the work directory
+    import httpx
+    import uvicorn
+
+    from backend.main import app
+    from backend.services.agent import AgentService, agent_pool
+    from backend.services.tools import local_tools
+    from benchmarks.fakes import ScriptedChatModel, generate_knowledge_base, load_transcript, transcript_tools
+
+    print(f"Generating {args.kb_size} summaries in {workdir}")
+    filenames = generate_knowledge_base(workdir / "knowledge", args.kb_size)
+    snippets = load_transcript(args.transcript, args.transcript_minutes)
+
+    models: list[ScriptedChatModel] = []
+
+    async def scripted_agent() -> AgentService:
+        llm = ScriptedChatModel(latency=args.llm_latency)
+        models.append(llm)
+        return AgentService.from_components(llm, transcript_tools(snippets) + local_tools())
+
+    agent_pool.factory = scripted_agent
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    results: dict[str, Any] = {}
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=300) as client:
+            start = time.perf_counter()
+            await client.get("/api/summaries?limit=1")  # First read waits for the initial index
+            results["kb.first_read"] = percentiles([time.perf_counter() - start])
+            results.update(await bench_knowledge_base(client, filenames, args.iterations))
+            results.update(await bench_summarize(client, models, args.summarize_iterations))
+        results.update(await bench_chat(f"ws://127.0.0.1:{port}/api/chat/ws", args.concurrency, args.turns))
+    finally:
+        server.should_exit = True
+        await serve_task
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kb-size", type=int, default=2000, help="Synthetic summaries to generate")
+    parser.add_argument("--iterations", type=int, default=200, help="Requests per knowledge base benchmark")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent chat connections")
+    parser.add_argument("--turns", type=int, default=10, help="Messages per chat connection")
+    parser.add_argument("--pool-size", type=int, default=4, help="Agents in the pool")
+    parser.add_argument("--summarize-iterations", type=int, default=10, help="Summaries per mode")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds slept per scripted LLM call")
+    parser.add_argument("--transcript", type=Path, help="JSON fixture of transcript snippets (text, start, duration)")
+    parser.add_argument("--transcript-minutes", type=float, default=30, help="Length of the synthetic transcript")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before failing (0.2 = 20%%)")
+    parser.add_argument("--output", type=Path, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="webui-bench-") as tmp:
+        workdir = Path(tmp)
+        os.environ.update(
+            {
+                "KNOWLEDGE_BASE_PATH": str(workdir / "knowledge"),
+                "RETRIEVAL_INDEX_DIR": str(workdir / "retrieval_index"),
+                "SUMMARY_MANIFEST_PATH": str(workdir / "manifest.json"),
+                "CONVERSATION_DB_PATH": str(workdir / "conversations.sqlite3"),
+                "HIGHLIGHTS_DB_PATH": str(workdir / "highlights.sqlite3"),
+                # Measure real (scripted) LLM calls, never cached replies
+                "LLM_CACHE_MODE": "off",
+                "LLM_CACHE_DB_PATH": str(workdir / "llm_cache.sqlite3"),
+                "KB_TOOLS_MODE": "native",
+                "AGENT_POOL_SIZE": str(args.pool_size),
+                "AGENT_POOL_HEALTH_CHECK_INTERVAL": "0",
+            }
+        )
+        (workdir / "knowledge").mkdir()
+        results = asyncio.run(run(args, workdir))
+
+    print()
+    for name, metrics in results.items():
+        line = "  ".join(f"{key}={value}" for key, value in metrics.items())
+        print(f"{name:<26} {line}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+    if args.baseline.exists():
+        print(f"\nCompared with {args.baseline} (tolerance {args.tolerance:.0%}):")
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Azure OpenAI chat completions stub that enforces a quota.
+
+Answers POST /openai/deployments/{deployment}/chat/completions (plain and
+streaming) with a canned reply after `latency` seconds. Like the real
+service, each request is charged its prompt size plus max_tokens, and once
+the requests or tokens of the current window are used up it responds 429
+with Retry-After and retry-after-ms. Point AzureChatOpenAI's azure_endpoint
+at it to exercise rate limiting without a deployment:
+
+    uv run python -m benchmarks.stub_openai --rpm 60 --tpm 20000
+"""
+
+import json
+import time
+import asyncio
+import argparse
+from collections import deque
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_COMPLETION_TOKENS = 1000
+REPLY = "This is a stub answer from the throttling test endpoint."
+
+
+class Quota:
+    """Requests and tokens per minute, enforced over sliding `window` seconds"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, window: float = 10):
+        self.window = window
+        self.max_requests = requests_per_minute * window / 60
+        self.max_tokens = tokens_per_minute * window / 60
+        self._charges: deque[tuple[float, int]] = deque()
+        self.accepted = 0
+        self.throttled = 0
+
+    def charge(self, tokens: int) -> float:
+        """0 if the request fits in the window (and is charged), else seconds to wait"""
+        now = time.monotonic()
+        while self._charges and self._charges[0][0] <= now - self.window:
+            self._charges.popleft()
+        used = sum(t for _, t in self._charges)
+        # A request as large as the whole window's quota waits for an empty window
+        tokens_needed = min(tokens, self.max_tokens) if self.max_tokens else 0
+        wait = 0.0
+        if self.max_requests and len(self._charges) + 1 > self.max_requests:
+            index = int(len(self._charges) - self.max_requests)
+            wait = self._charges[index][0] + self.window - now
+        if self.max_tokens and used + tokens_needed > self.max_tokens:
+            freed = 0
+            for at, charged in self._charges:
+                freed += charged
+                if used - freed + tokens_needed <= self.max_tokens:
+                    wait = max(wait, at + self.window - now)
+                    break
+        if wait > 0:
+            self.throttled += 1
+            return wait
+        self._charges.append((now, tokens))
+        self.accepted += 1
+        return 0.0
+
+    def remaining(self) -> dict[str, str]:
+        headers = {}
+        if self.max_requests:
+            headers["x-ratelimit-remaining-requests"] = str(int(self.max_requests - len(self._charges)))
+        if self.max_tokens:
+            headers["x-ratelimit-remaining-tokens"] = str(
+                int(self.max_tokens - sum(t for _, t in self._charges))
+            )
+        return headers
+
+
+def create_app(
+    requests_per_minute: int = 60, tokens_per_minute: int = 0, latency: float = 0.05, window: float = 10
+) -> FastAPI:
+    app = FastAPI(title="Azure OpenAI stub")
+    app.state.quota = Quota(requests_per_minute, tokens_per_minute, window)
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def chat_completions(deployment: str, request: Request):
+        raw = await request.body()
+        body = json.loads(raw)
+        completion = body.get("max_completion_tokens") or body.get("max_tokens") or DEFAULT_COMPLETION_TOKENS
+        prompt_tokens = len(raw) // 4
+        quota: Quota = app.state.quota
+        wait = quota.charge(prompt_tokens + completion)
+        if wait:
+            return JSONResponse(
+                {"error": {"code": "429", "message": "Rate limit exceeded. Try again later."}},
+                status_code=429,
+                headers={"retry-after": str(max(1, round(wait))), "retry-after-ms": str(round(wait * 1000))},
+            )
+        await asyncio.sleep(latency)
+        base = {"id": "chatcmpl-stub", "created": int(time.time()), "model": body.get("model", deployment)}
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(REPLY) // 4,
+            "total_tokens": prompt_tokens + len(REPLY) // 4,
+        }
+        if not body.get("stream"):
+            message = {"role": "assistant", "content": REPLY}
+            return JSONResponse(
+                {
+                    **base,
+                    "object": "chat.completion",
+                    "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+                    "usage": usage,
+                },
+                headers=quota.remaining(),
+            )
+
+        async def events():
+            for i, word in enumerate(REPLY.split(" ")):
+                delta = {"content": word if i == 0 else f" {word}"}
+                if i == 0:
+                    delta["role"] = "assistant"
+                chunk = {**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": delta}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            last = {
+                **base,
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+            yield f"data: {json.dumps(last)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=quota.remaining())
+
+    @app.get("/stats")
+    async def stats():
+        return {"accepted": app.state.quota.accepted, "throttled": app.state.quota.throttled}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rpm", type=int, default=60, help="Requests per minute (0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=0, help="Tokens per minute (0 = unlimited)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per completion")
+    parser.add_argument("--window", type=float, default=10, help="Seconds over which the quota is enforced")
+    parser.add_argument("--port", type=int, default=8790)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.rpm, args.tpm, args.latency, args.window), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
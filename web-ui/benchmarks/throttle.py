@@ -0,0 +1,156 @@
+"""Rate limiting benchmark against the quota-enforcing Azure OpenAI stub.
+
+Starts benchmarks.stub_openai with a small quota, queues a backlog of large
+background (batch priority) completions and, while it drains, sends chat
+completions through a real AzureChatOpenAI client. Reports chat latency,
+how long the backlog took, the 429s the stub returned and the calls that
+failed. --no-scheduler repeats the run with the OpenAI client's own
+retries instead of the LLM scheduler, for comparison.
+
+Before that, a check on a simulated clock makes sure the tokens-per-minute
+bucket spreads requests larger than its burst size out at the configured
+rate (it exits 1 otherwise).
+
+    cd web-ui
+    uv run python -m benchmarks.throttle
+    uv run python -m benchmarks.throttle --no-scheduler
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from typing import Any
+
+from benchmarks.run import free_port, percentiles
+
+
+def check_token_bucket(requests: int = 10, amount: int = 5700, per_minute: int = 60000) -> list[str]:
+    """Problems with the admission times of `requests` requests of `amount`
+    tokens, each larger than the bucket's burst, on a simulated clock.
+
+    Admitted back to back, they must span about (requests - 1) * amount / rate
+    seconds, so no more than a minute's quota is sent in any minute.
+    """
+    from backend.services.llm_scheduler import TokenBucket
+
+    bucket = TokenBucket(per_minute)
+    now = 0.0
+    admitted = []
+    for _ in range(requests):
+        now += bucket.delay(amount, now)
+        bucket.take(amount, now)
+        admitted.append(now)
+    expected = (requests - 1) * amount / bucket.rate
+    problems = []
+    # The initial burst (a full bucket) may be spent early
+    if admitted[-1] < expected - bucket.capacity / bucket.rate:
+        problems.append(
+            f"{requests} requests of {amount} tokens admitted in {admitted[-1]:.1f}s, expected ~{expected:.1f}s"
+        )
+    for start in admitted:
+        sent = sum(amount for t in admitted if start <= t < start + 60)
+        if sent > per_minute + bucket.capacity:
+            problems.append(f"{sent} tokens admitted in the minute from {start:.1f}s (limit {per_minute})")
+            break
+    return problems
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    import uvicorn
+    from langchain_openai import AzureChatOpenAI
+
+    from backend.services.llm_scheduler import LLMScheduler, Priority, llm_priority, scheduled_http_client
+    from benchmarks.stub_openai import create_app
+
+    stub = create_app(args.rpm, args.tpm, args.latency, args.window)
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=port, log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    options: dict[str, Any] = {
+        "azure_endpoint": f"http://127.0.0.1:{port}",
+        "azure_deployment": "stub",
+        "openai_api_version": "2024-12-01-preview",
+        "openai_api_key": "stub",
+        "max_tokens": 200,
+    }
+    if args.no_scheduler:
+        llm = AzureChatOpenAI(**options)
+    else:
+        scheduler = LLMScheduler(args.rpm, args.tpm, backoff=0.5, max_backoff=10)
+        llm = AzureChatOpenAI(**options, http_async_client=scheduled_http_client(scheduler), max_retries=0)
+
+    failures = 0
+
+    async def call(prompt: str, samples: list[float]):
+        nonlocal failures
+        start = time.perf_counter()
+        try:
+            await llm.ainvoke(prompt)
+        except Exception:
+            failures += 1
+            return
+        samples.append(time.perf_counter() - start)
+
+    async def backlog() -> float:
+        start = time.perf_counter()
+        with llm_priority(Priority.BATCH):
+            await asyncio.gather(*(call("transcript " * 2000, batch_samples) for _ in range(args.batch)))
+        return time.perf_counter() - start
+
+    async def chats():
+        await asyncio.sleep(0.2)  # Let the backlog fill the queue first
+        for i in range(args.chats):
+            await call(f"What do my summaries say about topic {i}?", chat_samples)
+            await asyncio.sleep(args.chat_interval)
+
+    chat_samples: list[float] = []
+    batch_samples: list[float] = []
+    try:
+        batch_elapsed, _ = await asyncio.gather(backlog(), chats())
+    finally:
+        server.should_exit = True
+        await serve_task
+
+    results = {
+        "throttle.chat": percentiles(chat_samples) if chat_samples else {"n": 0},
+        "throttle.batch": {"n": len(batch_samples), "elapsed_s": round(batch_elapsed, 3)},
+        "throttle.stub": {
+            "accepted": stub.state.quota.accepted,
+            "throttled_429": stub.state.quota.throttled,
+            "failed_calls": failures,
+        },
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rpm", type=int, default=120, help="Stub requests per minute")
+    parser.add_argument("--tpm", type=int, default=60000, help="Stub tokens per minute")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per stub completion")
+    parser.add_argument("--window", type=float, default=10, help="Seconds over which the stub enforces its quota")
+    parser.add_argument("--batch", type=int, default=20, help="Background completions queued at once")
+    parser.add_argument("--chats", type=int, default=5, help="Chat completions sent during the backlog")
+    parser.add_argument("--chat-interval", type=float, default=0.5, help="Seconds between chat completions")
+    parser.add_argument("--no-scheduler", action="store_true", help="Use the OpenAI client's own retries")
+    args = parser.parse_args()
+
+    problems = check_token_bucket(per_minute=args.tpm) if args.tpm else []
+    for problem in problems:
+        print(f"Token bucket: {problem}")
+    if problems:
+        sys.exit(1)
+
+    results = asyncio.run(run(args))
+    print()
+    for name, metrics in results.items():
+        line = "  ".join(f"{key}={value}" for key, value in metrics.items())
+        print(f"{name:<26} {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -27,7 +27,8 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     });
 
-    // Initialize summaries on load
+    // Initialize categories and summaries on load
+    loadCategories();
     loadSummaries();
 });
 
@@ -1,9 +1,15 @@
 // Chat WebSocket functionality
 
 let ws = null;
-let conversationId = null;
+// Kept across reconnects (and page reloads) so the server resumes the conversation
+let conversationId = sessionStorage.getItem('conversationId');
 window.chatInitialized = false;
 
+// Assistant message currently being streamed (element + raw markdown)
+let streamingEl = null;
+let streamingText = '';
+let renderPending = false;
+
 function initChat() {
     if (window.chatInitialized) return;
 
@@ -12,7 +18,8 @@ function initChat() {
     statusEl.className = 'chat-status';
 
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-    ws = new WebSocket(`${protocol}//${window.location.host}/api/chat/ws`);
+    const query = conversationId ? `?conversation_id=${encodeURIComponent(conversationId)}` : '';
+    ws = new WebSocket(`${protocol}//${window.location.host}/api/chat/ws${query}`);
 
     ws.onopen = () => {
         console.log('WebSocket connected');
@@ -25,18 +32,30 @@ function initChat() {
         switch (data.type) {
             case 'connected':
                 conversationId = data.conversation_id;
+                sessionStorage.setItem('conversationId', conversationId);
+                restoreMessages(data.messages || []);
                 statusEl.textContent = 'Connected';
                 statusEl.className = 'chat-status connected';
                 break;
             case 'typing':
                 showTypingIndicator();
                 break;
+            case 'token':
+                appendToken(data.content);
+                break;
+            case 'tool_start':
+                showTypingIndicator(`Running ${data.name}...`);
+                break;
+            case 'tool_end':
+                showTypingIndicator(`${data.name} finished in ${(data.duration_ms / 1000).toFixed(1)}s, thinking...`);
+                break;
             case 'message':
                 hideTypingIndicator();
-                addMessage('assistant', data.content);
+                finishStreaming(data.content);
                 break;
             case 'error':
                 hideTypingIndicator();
+                finishStreaming(null);
                 addMessage('error', data.content);
                 break;
         }
@@ -79,14 +98,67 @@ function addMessage(role, content) {
     scrollToBottom();
 }
 
-function showTypingIndicator() {
+function restoreMessages(messages) {
+    // Only after a page reload; on a reconnect the messages are still shown
+    const container = document.getElementById('chat-messages');
+    if (!messages.length || container.querySelectorAll('.message.user').length) return;
+    messages.forEach(msg => addMessage(msg.role, msg.content));
+}
+
+function appendToken(token) {
+    if (!streamingEl) {
+        hideTypingIndicator();
+        const container = document.getElementById('chat-messages');
+        streamingEl = document.createElement('div');
+        streamingEl.className = 'message assistant';
+        container.appendChild(streamingEl);
+        streamingText = '';
+    }
+    streamingText += token;
+
+    // Re-render markdown at most once per animation frame
+    if (!renderPending) {
+        renderPending = true;
+        requestAnimationFrame(() => {
+            renderPending = false;
+            if (streamingEl) {
+                streamingEl.innerHTML = marked.parse(streamingText);
+                scrollToBottom();
+            }
+        });
+    }
+}
+
+function finishStreaming(content) {
+    if (streamingEl) {
+        if (content !== null) {
+            streamingEl.innerHTML = marked.parse(content);
+        } else if (!streamingText) {
+            streamingEl.remove();
+        }
+        streamingEl = null;
+        streamingText = '';
+        scrollToBottom();
+    } else if (content !== null) {
+        addMessage('assistant', content);
+    }
+}
+
+function showTypingIndicator(text = 'Thinking...') {
     hideTypingIndicator(); // Remove any existing indicator
 
+    // Text streamed before a tool call is not the final answer
+    if (streamingEl) {
+        streamingEl.remove();
+        streamingEl = null;
+        streamingText = '';
+    }
+
     const container = document.getElementById('chat-messages');
     const indicator = document.createElement('div');
     indicator.id = 'typing-indicator';
     indicator.className = 'message assistant typing-indicator';
-    indicator.innerHTML = '<p>Thinking...</p>';
+    indicator.innerHTML = `<p>${escapeHtml(text)}</p>`;
     container.appendChild(indicator);
     scrollToBottom();
 }
@@ -113,7 +185,7 @@ function sendMessage() {
     addMessage('user', message);
 
     // Send to server
-    ws.send(JSON.stringify({ message }));
+    ws.send(JSON.stringify({ message, conversation_id: conversationId }));
 
     // Clear input
     input.value = '';
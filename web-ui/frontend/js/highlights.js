@@ -30,6 +30,16 @@ function hideHighlightToolbar() {
     document.getElementById('highlight-toolbar').classList.add('hidden');
 }
 
+// Create the <mark> element for a highlight (id is set once it is saved)
+function createMark(color, id = null) {
+    const mark = document.createElement('mark');
+    mark.className = 'user-highlight';
+    mark.dataset.color = color;
+    mark.style.backgroundColor = color;
+    if (id !== null) mark.dataset.highlightId = id;
+    return mark;
+}
+
 // Apply highlight to current selection
 function applyHighlight(color) {
     const selection = window.getSelection();
@@ -46,10 +56,7 @@ function applyHighlight(color) {
     trimRange(range);
 
     // Wrap selection in a mark element
-    const mark = document.createElement('mark');
-    mark.className = 'user-highlight';
-    mark.dataset.color = color;
-    mark.style.backgroundColor = color;
+    const mark = createMark(color);
 
     try {
         range.surroundContents(mark);
@@ -62,7 +69,7 @@ function applyHighlight(color) {
 
     selection.removeAllRanges();
     hideHighlightToolbar();
-    saveHighlights();
+    addHighlight(mark);
 }
 
 // Trim whitespace from start/end of a range
@@ -85,16 +92,55 @@ function trimRange(range) {
 
 // Remove a highlight on click
 function removeHighlight(markEl) {
+    const id = markEl.dataset.highlightId;
     const parent = markEl.parentNode;
     while (markEl.firstChild) {
         parent.insertBefore(markEl.firstChild, markEl);
     }
     parent.removeChild(markEl);
     parent.normalize(); // Merge adjacent text nodes
-    saveHighlights();
+    if (id) {
+        deleteHighlight(id);
+    } else {
+        saveHighlights();
+    }
+}
+
+// Save one new highlight and remember its ID on the mark
+async function addHighlight(mark) {
+    if (!currentSummaryFilename) return;
+
+    const contentEl = document.getElementById('summary-content');
+    const highlight = {
+        text: mark.textContent.trim(),
+        color: mark.dataset.color,
+        offset: getTextOffset(contentEl, mark),
+    };
+    try {
+        const response = await fetch(`${HIGHLIGHT_API}/${encodeURIComponent(currentSummaryFilename)}/highlights`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(highlight),
+        });
+        if (response.ok) {
+            mark.dataset.highlightId = (await response.json()).id;
+        }
+    } catch (error) {
+        console.error('Error saving highlight:', error);
+    }
 }
 
-// Collect all highlights from the DOM and save to backend
+async function deleteHighlight(id) {
+    try {
+        await fetch(`${HIGHLIGHT_API}/${encodeURIComponent(currentSummaryFilename)}/highlights/${id}`, {
+            method: 'DELETE',
+        });
+    } catch (error) {
+        console.error('Error removing highlight:', error);
+    }
+}
+
+// Collect all highlights from the DOM and replace the saved set
 async function saveHighlights() {
     if (!currentSummaryFilename) return;
 
@@ -111,11 +157,16 @@ async function saveHighlights() {
     });
 
     try {
-        await fetch(`${HIGHLIGHT_API}/${encodeURIComponent(currentSummaryFilename)}/highlights`, {
+        const response = await fetch(`${HIGHLIGHT_API}/${encodeURIComponent(currentSummaryFilename)}/highlights`, {
             method: 'PUT',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ highlights }),
         });
+        if (response.ok) {
+            // Saved in document order, like the marks
+            const saved = (await response.json()).highlights;
+            marks.forEach((mark, i) => { mark.dataset.highlightId = saved[i].id; });
+        }
     } catch (error) {
         console.error('Error saving highlights:', error);
     }
@@ -151,7 +202,7 @@ async function loadHighlights(filename) {
         // (applying from end first prevents offset shifts)
         const sorted = [...data.highlights].sort((a, b) => b.offset - a.offset);
         sorted.forEach(hl => {
-            applyHighlightToText(contentEl, hl.text.trim(), hl.color, hl.offset);
+            applyHighlightToText(contentEl, hl.text.trim(), hl.color, hl.offset, hl.id);
         });
     } catch (error) {
         console.error('Error loading highlights:', error);
@@ -159,7 +210,7 @@ async function loadHighlights(filename) {
 }
 
 // Find and wrap matching text in the rendered HTML
-function applyHighlightToText(root, text, color, targetOffset) {
+function applyHighlightToText(root, text, color, targetOffset, id = null) {
     // Strategy: walk text nodes, build cumulative offset, find the node(s) containing
     // the target text. Use a tolerance window for offset matching.
     const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
@@ -174,19 +225,19 @@ function applyHighlightToText(root, text, color, targetOffset) {
     }
 
     // Try exact offset match first, then fuzzy search
-    if (tryApplyAtOffset(nodes, text, color, targetOffset)) return true;
+    if (tryApplyAtOffset(nodes, text, color, targetOffset, id)) return true;
 
     // Fuzzy: search nearby offsets (within 50 chars tolerance)
     for (let tolerance = 1; tolerance <= 50; tolerance++) {
-        if (tryApplyAtOffset(nodes, text, color, targetOffset + tolerance)) return true;
-        if (tryApplyAtOffset(nodes, text, color, targetOffset - tolerance)) return true;
+        if (tryApplyAtOffset(nodes, text, color, targetOffset + tolerance, id)) return true;
+        if (tryApplyAtOffset(nodes, text, color, targetOffset - tolerance, id)) return true;
     }
 
     // Last resort: find the text anywhere by content matching
-    return tryApplyByContent(nodes, text, color);
+    return tryApplyByContent(nodes, text, color, id);
 }
 
-function tryApplyAtOffset(nodes, text, color, offset) {
+function tryApplyAtOffset(nodes, text, color, offset, id = null) {
     for (const { node, start, end } of nodes) {
         if (offset >= start && offset < end) {
             const localStart = offset - start;
@@ -194,7 +245,7 @@ function tryApplyAtOffset(nodes, text, color, offset) {
 
             if (localStart + text.length <= nodeText.length) {
                 if (nodeText.substring(localStart, localStart + text.length) === text) {
-                    wrapTextNode(node, localStart, text.length, color);
+                    wrapTextNode(node, localStart, text.length, color, id);
                     return true;
                 }
             }
@@ -203,12 +254,12 @@ function tryApplyAtOffset(nodes, text, color, offset) {
     return false;
 }
 
-function tryApplyByContent(nodes, text, color) {
+function tryApplyByContent(nodes, text, color, id = null) {
     // First try single-node match
     for (const { node } of nodes) {
         const idx = node.textContent.indexOf(text);
         if (idx !== -1) {
-            wrapTextNode(node, idx, text.length, color);
+            wrapTextNode(node, idx, text.length, color, id);
             return true;
         }
     }
@@ -248,10 +299,7 @@ function tryApplyByContent(nodes, text, color) {
             range.setStart(startNode, startOffset);
             range.setEnd(endNode, endOffset);
 
-            const mark = document.createElement('mark');
-            mark.className = 'user-highlight';
-            mark.dataset.color = color;
-            mark.style.backgroundColor = color;
+            const mark = createMark(color, id);
 
             const fragment = range.extractContents();
             mark.appendChild(fragment);
@@ -264,16 +312,11 @@ function tryApplyByContent(nodes, text, color) {
     return false;
 }
 
-function wrapTextNode(node, startIdx, length, color) {
+function wrapTextNode(node, startIdx, length, color, id = null) {
     const range = document.createRange();
     range.setStart(node, startIdx);
     range.setEnd(node, startIdx + length);
-
-    const mark = document.createElement('mark');
-    mark.className = 'user-highlight';
-    mark.dataset.color = color;
-    mark.style.backgroundColor = color;
-    range.surroundContents(mark);
+    range.surroundContents(createMark(color, id));
 }
 
 // Event: show toolbar on text selection within summary content
@@ -2,25 +2,72 @@
 
 const API_BASE = '/api';
 
-// Store all summaries for client-side category filtering
+const PAGE_SIZE = 50;
+
+// Summaries loaded so far (list pages or search results)
 let allSummaries = [];
 let activeCategory = 'all';
+let nextCursor = null;
+let searchActive = false;
+// Configured categories in display order (from /api/summaries/categories)
+let categoryOrder = ['tech', 'business', 'science', 'culture', 'general'];
+
+function categoryLabel(category) {
+    return category === 'uncategorized' ? 'Uncategorized' : category.charAt(0).toUpperCase() + category.slice(1);
+}
+
+async function loadCategories() {
+    try {
+        const response = await fetch(`${API_BASE}/summaries/categories`);
+        if (!response.ok) throw new Error('Failed to load categories');
+        const data = await response.json();
+        categoryOrder = data.categories.map(c => c.name);
+    } catch (error) {
+        console.error('Error loading categories:', error);
+    }
+    const filters = document.getElementById('category-filters');
+    filters.querySelectorAll('.category-pill:not([data-category="all"])').forEach(p => p.remove());
+    for (const cat of categoryOrder) {
+        const pill = document.createElement('button');
+        pill.className = 'category-pill';
+        pill.dataset.category = cat;
+        pill.textContent = categoryLabel(cat);
+        filters.appendChild(pill);
+    }
+}
 
-async function loadSummaries() {
+async function loadSummaries(append = false) {
     const container = document.getElementById('summaries-list');
-    container.innerHTML = '<div class="empty-state"><p>Loading summaries...</p></div>';
+    if (!append) {
+        container.innerHTML = '<div class="empty-state"><p>Loading summaries...</p></div>';
+        allSummaries = [];
+        nextCursor = null;
+    }
+    searchActive = false;
+
+    // Category filtering and paging are done server-side for the list view
+    const params = new URLSearchParams({ limit: PAGE_SIZE });
+    if (activeCategory !== 'all') params.set('category', activeCategory);
+    if (append && nextCursor) params.set('cursor', nextCursor);
 
     try {
-        const response = await fetch(`${API_BASE}/summaries`);
+        const response = await fetch(`${API_BASE}/summaries?${params}`);
         if (!response.ok) throw new Error('Failed to load summaries');
 
         const data = await response.json();
-        allSummaries = data.summaries;
-        renderSummaries(filterByCategory(allSummaries, activeCategory));
+        allSummaries = allSummaries.concat(data.summaries);
+        nextCursor = data.next_cursor || null;
+        renderSummaries(allSummaries);
     } catch (error) {
         console.error('Error loading summaries:', error);
         container.innerHTML = `<div class="empty-state"><h3>Error loading summaries</h3><p>${error.message}</p></div>`;
+        nextCursor = null;
     }
+    updateLoadMore();
+}
+
+function updateLoadMore() {
+    document.getElementById('load-more-btn').classList.toggle('hidden', searchActive || !nextCursor);
 }
 
 function filterByCategory(summaries, category) {
@@ -44,30 +91,22 @@ function renderSummaries(summaries) {
         grouped[cat].push(summary);
     });
 
-    // Define category display order and labels
-    const categoryOrder = ['tech', 'business', 'science', 'culture', 'general', 'uncategorized'];
-    const categoryLabels = {
-        tech: 'Tech',
-        business: 'Business',
-        science: 'Science',
-        culture: 'Culture',
-        general: 'General',
-        uncategorized: 'Uncategorized'
-    };
+    // Configured categories first, then any others (eg. removed from the config)
+    const order = [...categoryOrder, ...Object.keys(grouped).filter(c => !categoryOrder.includes(c) && c !== 'uncategorized').sort(), 'uncategorized'];
 
     let html = '';
-    for (const cat of categoryOrder) {
+    for (const cat of order) {
         if (!grouped[cat] || grouped[cat].length === 0) continue;
 
         html += `<div class="category-section">`;
-        html += `<h2 class="category-heading"><span class="category-badge badge-${cat}">${categoryLabels[cat]}</span> <span class="category-count">${grouped[cat].length}</span></h2>`;
+        html += `<h2 class="category-heading"><span class="category-badge badge-${escapeHtml(cat)}">${escapeHtml(categoryLabel(cat))}</span> <span class="category-count">${grouped[cat].length}</span></h2>`;
         html += `<div class="category-grid">`;
         html += grouped[cat].map(summary => `
             <div class="summary-card" data-filename="${escapeHtml(summary.filename)}">
                 <h3>${escapeHtml(summary.title)}</h3>
-                <p class="preview">${escapeHtml(summary.preview)}</p>
+                <p class="preview">${escapeHtml(summary.snippet || summary.preview)}</p>
                 <div class="card-footer">
-                    <span class="category-badge badge-${summary.category || 'uncategorized'}">${categoryLabels[summary.category || 'uncategorized']}</span>
+                    <span class="category-badge badge-${escapeHtml(cat)}">${escapeHtml(categoryLabel(cat))}</span>
                     <span class="date">${formatDate(summary.modified_date)}</span>
                 </div>
             </div>
@@ -94,6 +133,7 @@ async function viewSummary(filename) {
         contentEl.innerHTML = '<p>Loading...</p>';
         listContainer.classList.add('hidden');
         filterContainer.classList.add('hidden');
+        document.getElementById('load-more-btn').classList.add('hidden');
         viewer.classList.remove('hidden');
 
         const response = await fetch(`${API_BASE}/summaries/${encodeURIComponent(filename)}`);
@@ -112,16 +152,23 @@ async function viewSummary(filename) {
     }
 }
 
-// Category filter handlers
-document.querySelectorAll('.category-pill').forEach(pill => {
-    pill.addEventListener('click', () => {
-        document.querySelectorAll('.category-pill').forEach(p => p.classList.remove('active'));
-        pill.classList.add('active');
-        activeCategory = pill.dataset.category;
+// Category filter handlers (pills are added once the categories load)
+document.getElementById('category-filters').addEventListener('click', (e) => {
+    const pill = e.target.closest('.category-pill');
+    if (!pill) return;
+    document.querySelectorAll('.category-pill').forEach(p => p.classList.remove('active'));
+    pill.classList.add('active');
+    activeCategory = pill.dataset.category;
+    if (searchActive) {
         renderSummaries(filterByCategory(allSummaries, activeCategory));
-    });
+    } else {
+        loadSummaries();
+    }
 });
 
+// Load the next page of summaries
+document.getElementById('load-more-btn').addEventListener('click', () => loadSummaries(true));
+
 // Search functionality
 document.getElementById('search-btn').addEventListener('click', async () => {
     const query = document.getElementById('search-input').value.trim();
@@ -132,6 +179,8 @@ document.getElementById('search-btn').addEventListener('click', async () => {
 
     const container = document.getElementById('summaries-list');
     container.innerHTML = '<div class="empty-state"><p>Searching...</p></div>';
+    searchActive = true;
+    updateLoadMore();
 
     try {
         const response = await fetch(`${API_BASE}/summaries/search?q=${encodeURIComponent(query)}`);
@@ -168,4 +217,5 @@ document.getElementById('back-btn').addEventListener('click', () => {
     document.getElementById('summaries-list').classList.remove('hidden');
     document.getElementById('category-filters').classList.remove('hidden');
     document.getElementById('summary-viewer').classList.add('hidden');
+    updateLoadMore();
 });
@@ -5,6 +5,7 @@ document.getElementById('summarize-btn').addEventListener('click', async () => {
     const statusEl = document.getElementById('summarize-status');
     const btn = document.getElementById('summarize-btn');
     const url = urlInput.value.trim();
+    const mode = document.getElementById('long-video-mode').checked ? 'map_reduce' : 'pipeline';
 
     // Validate URL
     if (!url) {
@@ -28,7 +29,7 @@ document.getElementById('summarize-btn').addEventListener('click', async () => {
         const response = await fetch('/api/summarize', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ youtube_url: url })
+            body: JSON.stringify({ youtube_url: url, mode })
         });
 
         const result = await response.json();
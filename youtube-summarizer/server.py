@@ -1,40 +1,445 @@
+import os
+import json
+import bisect
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from mcp.server.fastmcp import FastMCP
 from youtube_transcript_api import YouTubeTranscriptApi
 
+from transcript_cache import cache_from_env
+
 # initialize the MCP server
 mcp = FastMCP("youtube_server")
 
+# transcript cache (disk + in-memory LRU); with TRANSCRIPT_CACHE_OFFLINE=1
+# a cache miss is an error instead of a request to YouTube
+transcript_cache = cache_from_env()
+CACHE_OFFLINE = os.environ.get("TRANSCRIPT_CACHE_OFFLINE", "") not in ("", "0", "false")
+
+# transcripts are downloaded by a fixed pool of worker threads, so at most
+# TRANSCRIPT_FETCH_CONCURRENCY requests run at once across all tool calls
+FETCH_CONCURRENCY = int(os.environ.get("TRANSCRIPT_FETCH_CONCURRENCY", "4"))
+BATCH_MAX_VIDEOS = int(os.environ.get("TRANSCRIPT_BATCH_MAX_VIDEOS", "50"))
+fetch_executor = ThreadPoolExecutor(
+    max_workers=FETCH_CONCURRENCY, thread_name_prefix="transcript-fetch"
+)
+
+
+class YouTubeTranscriptBackend:
+    """
+    Fetches transcripts from YouTube. YouTubeTranscriptApi (and its
+    requests.Session) is not thread-safe, so each fetch worker thread
+    keeps one of its own and reuses its connections across fetches.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _api(self) -> YouTubeTranscriptApi:
+        api = getattr(self._local, "api", None)
+        if api is None:
+            api = self._local.api = YouTubeTranscriptApi()
+        return api
+
+    def fetch(
+        self, video_id: str, language: str = "en", translate_to: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Transcript snippets (text, start, duration) of one video"""
+        if translate_to:
+            transcript = self._api().list(video_id).find_transcript([language])
+            fetched_transcript = transcript.translate(translate_to).fetch()
+        else:
+            fetched_transcript = self._api().fetch(video_id, languages=[language])
+        return fetched_transcript.to_raw_data()
+
+    def list_languages(self, video_id: str) -> list[dict[str, Any]]:
+        """Transcripts available for a video and their translation languages"""
+        return [
+            {
+                "language": transcript.language,
+                "language_code": transcript.language_code,
+                "is_generated": transcript.is_generated,
+                "is_translatable": transcript.is_translatable,
+                "translation_languages": [
+                    t.language_code for t in transcript.translation_languages
+                ],
+            }
+            for transcript in self._api().list(video_id)
+        ]
+
+
+# where transcripts come from; tests can assign any object with the same
+# fetch/list_languages methods to run offline
+transcript_backend = YouTubeTranscriptBackend()
+
 
 # Helper functions
-def format_transcript_response(transcript_object: str) -> str:
+def format_transcript_response(transcript_object: list[dict[str, Any]]) -> str:
     """
-    Formats the youtube transcript response
+    Formats the youtube transcript response as plain text, one space
+    between segments
     """
-    transcripts: list[str] = []
-    for snippet in transcript_object:
-        transcripts.append(snippet.text)
-    final_transcript = "".join(transcripts)
-    return final_transcript
+    return " ".join(snippet["text"] for snippet in transcript_object)
+
+
+async def run_fetch(func, *args):
+    """
+    Runs a blocking transcript backend call on the fetch worker pool
+    """
+    return await asyncio.get_running_loop().run_in_executor(fetch_executor, func, *args)
+
+
+async def get_transcript_snippets(
+    video_id: str, language: str = "en", translate_to: str | None = None
+) -> list[dict[str, Any]]:
+    """
+    Return raw transcript snippets (text, start, duration), from the cache
+    when possible and from the transcript backend otherwise. With
+    `translate_to`, the `language` transcript is machine-translated by
+    YouTube. Cache hits never wait for the fetch workers.
+    """
+    cache_language = f"{language}>{translate_to}" if translate_to else language
+    snippets = await asyncio.to_thread(transcript_cache.get, video_id, cache_language)
+    if snippets is not None:
+        return snippets
+    if CACHE_OFFLINE:
+        raise LookupError(f"Transcript for {video_id} ({cache_language}) is not cached")
+    snippets = await run_fetch(transcript_backend.fetch, video_id, language, translate_to)
+    await asyncio.to_thread(transcript_cache.put, video_id, cache_language, snippets)
+    return snippets
+
+
+def describe_error(error: Exception) -> str:
+    """
+    One-line description of a failed fetch (transcript API errors span
+    several paragraphs)
+    """
+    lines = str(error).strip().splitlines()
+    return f"{type(error).__name__}: {lines[0]}" if lines else type(error).__name__
+
+
+def select_range(
+    snippets: list[dict[str, Any]],
+    start_seconds: float | None = None,
+    end_seconds: float | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Snippets overlapping [start_seconds, end_seconds), found by binary
+    search over the (sorted) start times. Snippet dicts are shared, not
+    copied.
+    """
+    lo, hi = 0, len(snippets)
+    if start_seconds is not None:
+        lo = bisect.bisect_right(snippets, start_seconds, key=lambda s: s["start"])
+        if lo and snippets[lo - 1]["start"] + snippets[lo - 1]["duration"] > start_seconds:
+            lo -= 1
+    if end_seconds is not None:
+        hi = bisect.bisect_left(snippets, end_seconds, key=lambda s: s["start"])
+    return snippets[lo:hi]
+
+
+def serialize_segments(
+    video_id: str,
+    language: str,
+    snippets: list[dict[str, Any]],
+    output_format: str = "compact",
+) -> str:
+    """
+    Serializes transcript segments:
+    - "compact": JSON with [start, duration, text] rows and no whitespace
+    - "json": JSON with {start, duration, text} objects
+    - "text": one "[mm:ss] text" line per segment, for quoting with timestamps
+    """
+    if output_format == "text":
+        return "\n".join(f"[{format_timestamp(s['start'])}] {s['text']}" for s in snippets)
+    if output_format == "json":
+        segments: list[Any] = [
+            {"start": s["start"], "duration": s["duration"], "text": s["text"]} for s in snippets
+        ]
+    elif output_format == "compact":
+        segments = [[round(s["start"], 2), round(s["duration"], 2), s["text"]] for s in snippets]
+    else:
+        raise ValueError(f"Unknown format {output_format!r}; use compact, json or text")
+    payload: dict[str, Any] = {
+        "video_id": video_id,
+        "language": language,
+        "start": snippets[0]["start"] if snippets else None,
+        "end": snippets[-1]["start"] + snippets[-1]["duration"] if snippets else None,
+    }
+    if output_format == "compact":
+        payload["fields"] = ["start", "duration", "text"]
+        return json.dumps({**payload, "segments": segments}, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps({**payload, "segments": segments}, ensure_ascii=False)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (about four characters per token for English text)
+    """
+    return max(1, len(text) // 4)
+
+
+def format_timestamp(seconds: float) -> str:
+    """
+    Formats seconds as mm:ss (or h:mm:ss)
+    """
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def chunk_transcript(
+    snippets: list[dict[str, Any]],
+    max_tokens: int = 6000,
+    max_seconds: float = 900,
+    marker_interval: float = 60,
+) -> list[dict[str, Any]]:
+    """
+    Splits transcript snippets into chunks bounded by both token count and
+    duration. Chunk text carries a [mm:ss] marker roughly every
+    `marker_interval` seconds so timestamps survive summarization.
+    """
+    chunks: list[dict[str, Any]] = []
+    current: list[dict[str, Any]] = []
+    tokens = 0
+
+    def flush():
+        parts: list[str] = []
+        next_marker = current[0]["start"]
+        for snippet in current:
+            if snippet["start"] >= next_marker:
+                parts.append(f"[{format_timestamp(snippet['start'])}]")
+                next_marker = snippet["start"] + marker_interval
+            parts.append(snippet["text"])
+        last = current[-1]
+        chunks.append(
+            {
+                "index": len(chunks),
+                "start": current[0]["start"],
+                "end": last["start"] + last["duration"],
+                "tokens": tokens,
+                "text": " ".join(parts),
+            }
+        )
+
+    for snippet in snippets:
+        snippet_tokens = estimate_tokens(snippet["text"])
+        if current and (
+            tokens + snippet_tokens > max_tokens
+            or snippet["start"] + snippet["duration"] - current[0]["start"] > max_seconds
+        ):
+            flush()
+            current, tokens = [], 0
+        current.append(snippet)
+        tokens += snippet_tokens
+    if current:
+        flush()
+    return chunks
 
 
 # tool execution handler
 @mcp.tool()
-def fetch_youtube_transcript(video_id: str) -> str:
+async def fetch_youtube_transcript(
+    video_id: str,
+    language: str = "en",
+    start_seconds: float | None = None,
+    end_seconds: float | None = None,
+) -> str:
     """
     Fetch the youtube transcipt give a video_id
     Args:
         video_id: For eg: https://www.youtube.com/watch?v=12345 the ID is 12345
+        language: Transcript language code, defaults to "en"
+        start_seconds: Only return text from this point of the video on
+        end_seconds: Only return text before this point of the video
 
     Returns:
         Transcript of the given video_id
     """
-    ytt_api = YouTubeTranscriptApi()
-    fetched_transcript = ytt_api.fetch(video_id)
-    final_transcript = format_transcript_response(fetched_transcript)
+    snippets = await get_transcript_snippets(video_id, language)
+    final_transcript = format_transcript_response(select_range(snippets, start_seconds, end_seconds))
     return final_transcript
 
 
+@mcp.tool()
+async def fetch_youtube_transcripts(video_ids: list[str], language: str = "en") -> str:
+    """
+    Fetch the transcripts of several videos in one call (eg. the videos of
+    a playlist, or videos to compare). Videos are fetched concurrently and
+    a video that fails does not fail the others
+    Args:
+        video_ids: Video IDs, for eg: https://www.youtube.com/watch?v=12345 the ID is 12345
+        language: Transcript language code, defaults to "en"
+
+    Returns:
+        JSON list in the order given, with {"video_id", "transcript"} for
+        each fetched video and {"video_id", "error"} for each failed one
+    """
+    video_ids = list(dict.fromkeys(video_ids))
+    if len(video_ids) > BATCH_MAX_VIDEOS:
+        raise ValueError(f"At most {BATCH_MAX_VIDEOS} videos per call, got {len(video_ids)}")
+    results = await asyncio.gather(
+        *(get_transcript_snippets(video_id, language) for video_id in video_ids),
+        return_exceptions=True,
+    )
+    items: list[dict[str, str]] = []
+    for video_id, result in zip(video_ids, results):
+        if isinstance(result, Exception):
+            items.append({"video_id": video_id, "error": describe_error(result)})
+        else:
+            items.append({"video_id": video_id, "transcript": format_transcript_response(result)})
+    return json.dumps(items, ensure_ascii=False)
+
+
+@mcp.tool()
+async def fetch_youtube_transcript_segments(
+    video_id: str,
+    language: str = "en",
+    translate_to: str | None = None,
+    start_seconds: float | None = None,
+    end_seconds: float | None = None,
+    format: str = "compact",
+) -> str:
+    """
+    Fetch the youtube transcript as timed segments, optionally for a time
+    range only (eg. minutes 10-20 is start_seconds=600, end_seconds=1200)
+    Args:
+        video_id: For eg: https://www.youtube.com/watch?v=12345 the ID is 12345
+        language: Transcript language code, defaults to "en"
+        translate_to: Language code to machine-translate the transcript into
+        start_seconds: Only return segments from this point of the video on
+        end_seconds: Only return segments before this point of the video
+        format: "compact" (JSON [start, duration, text] rows), "json"
+            (JSON objects) or "text" ("[mm:ss] text" lines)
+
+    Returns:
+        The segments in the requested format
+    """
+    snippets = await get_transcript_snippets(video_id, language, translate_to)
+    selected = select_range(snippets, start_seconds, end_seconds)
+    return serialize_segments(video_id, translate_to or language, selected, format)
+
+
+@mcp.tool()
+async def list_youtube_transcript_languages(video_id: str) -> str:
+    """
+    List the transcripts available for a video and the languages each can
+    be translated into
+    Args:
+        video_id: For eg: https://www.youtube.com/watch?v=12345 the ID is 12345
+
+    Returns:
+        JSON list of transcripts with language, language_code, is_generated,
+        is_translatable and translation_languages (codes)
+    """
+    languages = await run_fetch(transcript_backend.list_languages, video_id)
+    return json.dumps(languages, ensure_ascii=False)
+
+
+@mcp.tool()
+async def fetch_youtube_transcript_chunks(
+    video_id: str,
+    language: str = "en",
+    max_tokens: int = 6000,
+    max_seconds: float = 900,
+) -> str:
+    """
+    Fetch the youtube transcript split into time- and token-bounded chunks,
+    for videos too long to read in one pass
+    Args:
+        video_id: For eg: https://www.youtube.com/watch?v=12345 the ID is 12345
+        language: Transcript language code, defaults to "en"
+        max_tokens: Approximate maximum tokens per chunk
+        max_seconds: Maximum seconds of video per chunk
+
+    Returns:
+        JSON list of chunks with index, start, end (seconds), tokens and text
+    """
+    snippets = await get_transcript_snippets(video_id, language)
+    return json.dumps(chunk_transcript(snippets, max_tokens, max_seconds))
+
+
+@mcp.resource("cache://transcripts/stats")
+def transcript_cache_stats() -> str:
+    """Transcript cache hit/miss/eviction counters"""
+    return json.dumps(transcript_cache.stats)
+
+
+async def serve_http(
+    transport: str,
+    host: str,
+    port: int,
+    max_concurrency: int,
+    shutdown_timeout: float,
+):
+    """
+    Serves the tools over streamable HTTP (or SSE) from this one process to
+    any number of clients. Beyond `max_concurrency` open connections and
+    requests new ones get 503 (each connected client keeps one stream
+    open); on SIGINT/SIGTERM in-flight requests get `shutdown_timeout`
+    seconds to finish.
+    """
+    import uvicorn
+
+    mcp.settings.host = host
+    mcp.settings.port = port
+    if host not in ("127.0.0.1", "localhost", "::1"):
+        # DNS rebinding protection only allows localhost Host headers
+        mcp.settings.transport_security = None
+    app = mcp.streamable_http_app() if transport == "streamable-http" else mcp.sse_app()
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        limit_concurrency=max_concurrency,
+        timeout_graceful_shutdown=shutdown_timeout,
+        log_level="info",
+    )
+    await uvicorn.Server(config).serve()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YouTube transcript MCP server")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "streamable-http", "sse"],
+        default=os.environ.get("MCP_TRANSPORT", "stdio"),
+        help="stdio (one process per client) or an HTTP transport shared by all clients",
+    )
+    parser.add_argument("--host", default=os.environ.get("MCP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MCP_PORT", "8765")))
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=int(os.environ.get("MCP_MAX_CONCURRENCY", "64")),
+        help="Connections and requests served at once over HTTP",
+    )
+    parser.add_argument(
+        "--shutdown-timeout",
+        type=float,
+        default=float(os.environ.get("MCP_SHUTDOWN_TIMEOUT", "10")),
+        help="Seconds in-flight HTTP requests get to finish on shutdown",
+    )
+    args = parser.parse_args()
+
+    try:
+        if args.transport == "stdio":
+            mcp.run(transport="stdio")
+        else:
+            asyncio.run(
+                serve_http(
+                    args.transport, args.host, args.port, args.max_concurrency, args.shutdown_timeout
+                )
+            )
+    finally:
+        fetch_executor.shutdown(wait=False, cancel_futures=True)
+
+
 if __name__ == "__main__":
-    # Initialize and run the server
-    mcp.run(transport="stdio")
\ No newline at end of file
+    main()
\ No newline at end of file
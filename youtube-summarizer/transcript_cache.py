@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Optional
+
+# Full scans of the disk tier (expiry, and resyncing the size total with
+# other processes sharing the directory) happen every this many writes
+SCAN_EVERY = 100
+
+# Eviction frees space down to this share of max_bytes, so a full cache
+# isn't rescanned on every write
+EVICT_TO = 0.9
+
+
+class TranscriptCache:
+    """
+    Two-tier cache for fetched transcripts.
+
+    Transcripts are stored on disk as JSON files named by the SHA-256 of
+    (video_id, language), with a bounded in-memory LRU in front. Entries
+    older than `ttl` seconds are treated as misses, and the oldest files
+    are evicted once the disk tier grows past `max_bytes`. The disk tier's
+    size is tracked in memory, so writes only scan the directory when it
+    is over the limit or every SCAN_EVERY writes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        ttl: float = 30 * 24 * 3600,
+        max_bytes: int = 500 * 1024 * 1024,
+        memory_entries: int = 32,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._disk_bytes: Optional[int] = None  # unknown until the first scan
+        self._writes = 0
+
+    @staticmethod
+    def key(video_id: str, language: str) -> str:
+        """Content address of a transcript"""
+        return hashlib.sha256(f"{video_id}\0{language}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _expired(self, entry: dict[str, Any]) -> bool:
+        return bool(self.ttl) and time.time() - entry["fetched_at"] > self.ttl
+
+    def get(self, video_id: str, language: str) -> Optional[list[dict[str, Any]]]:
+        """Return cached snippets, or None on a miss"""
+        key = self.key(video_id, language)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry):
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry["snippets"]
+
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            entry = None
+        with self._lock:
+            if entry is None or self._expired(entry):
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._remember(key, entry)
+        return entry["snippets"]
+
+    def put(self, video_id: str, language: str, snippets: list[dict[str, Any]]):
+        """Store snippets in both tiers"""
+        key = self.key(video_id, language)
+        entry = {
+            "video_id": video_id,
+            "language": language,
+            "fetched_at": time.time(),
+            "snippets": snippets,
+        }
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        # Write to a temp file and rename so readers never see partial JSON
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._remember(key, entry)
+            self._writes += 1
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data) - replaced
+            scan = (
+                self._disk_bytes is None
+                or self._writes % SCAN_EVERY == 0
+                or bool(self.max_bytes) and self._disk_bytes > self.max_bytes
+            )
+        if scan:
+            self._evict_disk()
+
+    def _remember(self, key: str, entry: dict[str, Any]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Delete expired files, then the oldest ones until under max_bytes"""
+        files = []
+        total = 0
+        now = time.time()
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if self.ttl and now - stat.st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                self.stats["evictions"] += 1
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        if self.max_bytes and total > self.max_bytes:
+            for _, size, path in sorted(files):
+                path.unlink(missing_ok=True)
+                self.stats["evictions"] += 1
+                total -= size
+                if total <= self.max_bytes * EVICT_TO:
+                    break
+        with self._lock:
+            self._disk_bytes = total
+
+
+def cache_from_env() -> TranscriptCache:
+    """Build the cache from TRANSCRIPT_CACHE_* environment variables"""
+    return TranscriptCache(
+        cache_dir=os.environ.get(
+            "TRANSCRIPT_CACHE_DIR", str(Path(__file__).parent / ".transcript_cache")
+        ),
+        ttl=float(os.environ.get("TRANSCRIPT_CACHE_TTL", str(30 * 24 * 3600))),
+        max_bytes=int(os.environ.get("TRANSCRIPT_CACHE_MAX_BYTES", str(500 * 1024 * 1024))),
+        memory_entries=int(os.environ.get("TRANSCRIPT_CACHE_MEMORY_ENTRIES", "32")),
+    )